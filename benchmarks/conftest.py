@@ -0,0 +1,53 @@
+import json
+import os
+import pathlib
+import typing
+from functools import lru_cache
+
+import numpy as np
+import pytest
+
+
+BUILDINGS_PATH = pathlib.Path(__file__).parent.parent / 'tests' / 'test_data' / 'buildings.json'
+
+# Synthetic dataset sizes, e.g. FNT_BENCH_SIZES=10000,100000,1000000
+SIZES = [int(size) for size in os.environ.get('FNT_BENCH_SIZES', '10000,100000').split(',') if size]
+# Israel, roughly: where the bundled buildings are and where EPSG:2039 is valid
+BOUNDS = (34.3, 29.5, 35.9, 33.3)
+
+
+def synthetic_features(size: int, seed: int = 0) -> typing.Dict[str, typing.Any]:
+    rng = np.random.default_rng(seed)
+    xs = rng.uniform(BOUNDS[0], BOUNDS[2], size)
+    ys = rng.uniform(BOUNDS[1], BOUNDS[3], size)
+    floors = rng.integers(1, 40, size)
+    return {
+        'type': 'FeatureCollection',
+        'features': [
+            {
+                'type': 'Feature',
+                'geometry': {'type': 'Point', 'coordinates': [x, y]},
+                'properties': {'layer': 'building', 'handle': str(i), 'floors': int(f)},
+            }
+            for i, (x, y, f) in enumerate(zip(xs.tolist(), ys.tolist(), floors.tolist()))
+        ],
+    }
+
+
+@pytest.fixture(scope='session')
+def buildings_raw() -> typing.Dict[str, typing.Any]:
+    with BUILDINGS_PATH.open(encoding='utf-8') as fp:
+        return json.load(fp)
+
+
+@lru_cache(maxsize=None)
+def _synthetic(size: int) -> typing.Dict[str, typing.Any]:
+    return synthetic_features(size)
+
+
+@pytest.fixture(params=['buildings', *(f'synthetic-{size}' for size in SIZES)])
+def raw(request: pytest.FixtureRequest) -> typing.Dict[str, typing.Any]:
+    """The bundled buildings layer plus one synthetic point layer per configured size."""
+    if request.param == 'buildings':
+        return request.getfixturevalue('buildings_raw')
+    return _synthetic(int(request.param.split('-')[1]))
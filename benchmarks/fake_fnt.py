@@ -0,0 +1,144 @@
+"""In-process fake of the FNT business gateway for benchmarks, served through httpx mock transports."""
+import asyncio
+import itertools
+import json
+import random
+import threading
+import time
+import typing
+from collections import Counter
+
+import httpx
+
+
+SOAP_RESPONSE = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>'
+    '<response><elid>{elid}</elid><status>OK</status></response>'
+    '</soapenv:Body></soapenv:Envelope>'
+)
+SOAP_FAULT = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>'
+    '<soapenv:Fault><faultcode>Server</faultcode><faultstring>injected fault</faultstring></soapenv:Fault>'
+    '</soapenv:Body></soapenv:Envelope>'
+)
+
+
+class FakeFNT:
+    """Answers login/logout, REST entity create/update/query and SOAP calls.
+
+    `latency` is the per-request service time in seconds, or a (min, max) range to draw it from; `error_rate` is the
+    fraction of entity requests answered with `error_status`, and `expire_every` expires the gateway session after
+    that many requests.
+    """
+
+    def __init__(
+        self,
+        latency: typing.Union[float, typing.Tuple[float, float]] = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        expire_every: typing.Union[int, None] = None,
+        seed: int = 0,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.expire_every = expire_every
+        self.calls: typing.Counter[str] = Counter()
+        self.entities: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        self._random = random.Random(seed)
+        self._elids = itertools.count(1)
+        self._sessions = itertools.count(1)
+        self._session: typing.Union[str, None] = None
+        self._served = 0
+        self._lock = threading.Lock()
+
+    def async_transport(self) -> httpx.MockTransport:
+        async def handler(request: httpx.Request) -> httpx.Response:
+            delay = self._delay()
+            if delay:
+                await asyncio.sleep(delay)
+            return self.handle(request)
+
+        return httpx.MockTransport(handler)
+
+    def sync_transport(self) -> httpx.MockTransport:
+        def handler(request: httpx.Request) -> httpx.Response:
+            delay = self._delay()
+            if delay:
+                time.sleep(delay)
+            return self.handle(request)
+
+        return httpx.MockTransport(handler)
+
+    def _delay(self) -> float:
+        if isinstance(self.latency, tuple):
+            with self._lock:
+                return self._random.uniform(*self.latency)
+        return self.latency
+
+    def handle(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path
+        with self._lock:
+            if path.endswith('/login'):
+                self.calls['login'] += 1
+                self._session = f'session-{next(self._sessions)}'
+                return httpx.Response(200, json={'sessionId': self._session})
+            if path.endswith('/logout'):
+                self.calls['logout'] += 1
+                return httpx.Response(200, json={})
+            if request.method == 'HEAD':
+                return httpx.Response(200)
+            self._served += 1
+            if self.expire_every and self._served % self.expire_every == 0:
+                self._session = f'session-{next(self._sessions)}'
+            if self.error_rate and self._random.random() < self.error_rate:
+                self.calls['injected_error'] += 1
+                return httpx.Response(self.error_status, json={'status': {'message': 'injected error'}})
+            if path.startswith('/axis/services/'):
+                return self._soap(request)
+            return self._rest(request)
+
+    def expire_session(self) -> None:
+        with self._lock:
+            self._session = f'session-{next(self._sessions)}'
+
+    def _session_valid(self, session_id: typing.Union[str, None]) -> bool:
+        return session_id == self._session
+
+    def _rest(self, request: httpx.Request) -> httpx.Response:
+        if not self._session_valid(request.url.params.get('sessionId')):
+            self.calls['expired'] += 1
+            return httpx.Response(401, json={'status': {'message': 'session expired'}})
+        parts = request.url.path.split('/')
+        entity, operation = parts[5], parts[-1]
+        body = json.loads(request.content or b'{}')
+        self.calls[f'{entity}.{operation}'] += 1
+        if operation == 'query':
+            return httpx.Response(200, json={'returnData': self._query(body)})
+        if operation == 'update':
+            return httpx.Response(200, json={'returnData': {}})
+        elid = f'E{next(self._elids):012d}'
+        self.entities[elid] = {'elid': elid, **body}
+        return httpx.Response(200, json={'returnData': {'elid': elid}})
+
+    def _query(self, body: typing.Dict[str, typing.Any]) -> typing.List[typing.Dict[str, typing.Any]]:
+        # Supports the '=' and 'in' restriction operators and returnAttributes
+        rows = []
+        for entity in self.entities.values():
+            for attribute, restriction in body.get('restrictions', {}).items():
+                value = entity.get(attribute)
+                if restriction['operator'] == 'in' and value not in restriction['value']:
+                    break
+                if restriction['operator'] == '=' and value != restriction['value']:
+                    break
+            else:
+                attributes = body.get('returnAttributes')
+                rows.append({key: entity.get(key) for key in attributes} if attributes else entity)
+        return rows
+
+    def _soap(self, request: httpx.Request) -> httpx.Response:
+        content = request.content.decode('utf-8')
+        self.calls['soap'] += 1
+        if self._session is None or self._session not in content:
+            return httpx.Response(200, text=SOAP_FAULT.replace('injected fault', 'session expired'))
+        return httpx.Response(200, text=SOAP_RESPONSE.format(elid=f'E{next(self._elids):012d}'))
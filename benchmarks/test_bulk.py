@@ -0,0 +1,104 @@
+import asyncio
+import typing
+
+import pytest
+from fake_fnt import FakeFNT
+
+from fnt_auto._async_api import AsyncFntAPI, RequestScheduler, RetryPolicy
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.models.zones.building import BuildingCreate
+from fnt_auto.sync import SyncFntAPI
+
+
+ITEMS = 500
+LATENCY = 0.002
+SOAP_TEMPLATE = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>'
+    '<update><sessionId>{sid}</sessionId><elid>{elid}</elid><remark>{remark}</remark></update>'
+    '</soapenv:Body></soapenv:Envelope>'
+)
+
+
+def _buildings() -> typing.List[BuildingCreate]:
+    return [BuildingCreate(name=f'B{i}', campus_elid=f'C{i % 10}', c_x=float(i)) for i in range(ITEMS)]
+
+
+def _scheduler() -> RequestScheduler:
+    # Injected errors are retried without real backoff so the benchmark measures the client, not the sleeps
+    return RequestScheduler(retry=RetryPolicy(max_attempts=5, backoff_base=0.001, backoff_max=0.01))
+
+
+async def _create_buildings(server: FakeFNT, concurrency: int) -> typing.List[BuildingCreate]:
+    buildings = _buildings()
+    async with AsyncFntAPI(
+        'http://fnt.test', 'user', 'password', transport=server.async_transport(), scheduler=_scheduler()
+    ) as api:
+        await api.create_buildings(buildings, concurrency=concurrency).run()
+    return buildings
+
+
+@pytest.mark.parametrize('error_rate', [0.0, 0.05])
+@pytest.mark.parametrize('concurrency', [1, 10, 50])
+def test_async_create_buildings(benchmark: typing.Any, concurrency: int, error_rate: float) -> None:
+    server = FakeFNT(latency=LATENCY, error_rate=error_rate)
+    buildings = benchmark.pedantic(lambda: asyncio.run(_create_buildings(server, concurrency)), rounds=3)
+    assert all(building.status == ItemStatusOpt.SUCCESS for building in buildings)
+
+
+def test_async_create_buildings_session_expiry(benchmark: typing.Any) -> None:
+    server = FakeFNT(latency=LATENCY, expire_every=100)
+    buildings = benchmark.pedantic(lambda: asyncio.run(_create_buildings(server, 10)), rounds=3)
+    assert all(building.status == ItemStatusOpt.SUCCESS for building in buildings)
+
+
+@pytest.mark.parametrize('concurrency', [1, 10])
+def test_sync_create_buildings(benchmark: typing.Any, concurrency: int) -> None:
+    server = FakeFNT(latency=LATENCY)
+
+    def run() -> typing.List[BuildingCreate]:
+        buildings = _buildings()
+        with SyncFntAPI('http://fnt.test', 'user', 'password', transport=server.sync_transport()) as api:
+            api.create_buildings(buildings, concurrency=concurrency).run()
+        return buildings
+
+    buildings = benchmark.pedantic(run, rounds=3)
+    assert all(building.status == ItemStatusOpt.SUCCESS for building in buildings)
+
+
+async def _sync_buildings(server: FakeFNT) -> None:
+    async with AsyncFntAPI(
+        'http://fnt.test', 'user', 'password', transport=server.async_transport(), scheduler=_scheduler()
+    ) as api:
+        await api.sync_buildings(_buildings(), concurrency=10)
+
+
+def test_async_sync_buildings(benchmark: typing.Any) -> None:
+    benchmark.pedantic(lambda: asyncio.run(_sync_buildings(FakeFNT(latency=LATENCY))), rounds=3)
+
+
+async def _soap_bulk(server: FakeFNT, concurrency: int) -> None:
+    async with AsyncFntAPI(
+        'http://fnt.test', 'user', 'password', transport=server.async_transport(), scheduler=_scheduler()
+    ) as api:
+        calls = [{'elid': f'E{i}', 'remark': f'benchmark <{i}>'} for i in range(ITEMS)]
+        stats = await api.soap_bulk('UpdateService', SOAP_TEMPLATE, calls, concurrency=concurrency).run()
+    assert stats.statuses[ItemStatusOpt.SUCCESS] == ITEMS
+
+
+@pytest.mark.parametrize('concurrency', [10, 50])
+def test_async_soap_bulk(benchmark: typing.Any, concurrency: int) -> None:
+    server = FakeFNT(latency=LATENCY)
+    benchmark.pedantic(lambda: asyncio.run(_soap_bulk(server, concurrency)), rounds=3)
+
+
+async def _query_buildings(server: FakeFNT, page_size: typing.Union[int, None], concurrency: int) -> int:
+    async with AsyncFntAPI('http://fnt.test', 'user', 'password', transport=server.async_transport()) as api:
+        return len(await api.query('building', {}, page_size=page_size, concurrency=concurrency).collect())
+
+
+@pytest.mark.parametrize(('page_size', 'concurrency'), [(None, 1), (100, 1), (100, 4)])
+def test_async_query_pages(benchmark: typing.Any, page_size: typing.Union[int, None], concurrency: int) -> None:
+    server = FakeFNT(latency=LATENCY)
+    asyncio.run(_create_buildings(server, 50))
+    rows = benchmark.pedantic(lambda: asyncio.run(_query_buildings(server, page_size, concurrency)), rounds=3)
+    assert rows == ITEMS
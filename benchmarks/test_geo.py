@@ -0,0 +1,161 @@
+import typing
+
+from fnt_auto.models.columnar import ColumnarFeatureCollection
+from fnt_auto.models.geo import FeatureCollection, Point
+from fnt_auto.models.query import Eq, Range
+
+
+QUERIES = 200
+
+
+def _collection(raw: typing.Dict[str, typing.Any]) -> FeatureCollection:
+    return FeatureCollection.model_validate(raw)
+
+
+def _query_points(collection: FeatureCollection, count: int = QUERIES) -> typing.List[Point]:
+    step = max(1, len(collection) // count)
+    return [
+        Point(coordinates=[feature.geometry.coordinates[0] + 1e-4, feature.geometry.coordinates[1] - 1e-4])
+        for feature in collection.features[::step][:count]
+    ]
+
+
+def test_validate_feature_collection(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = benchmark(_collection, raw)
+    assert len(collection) == len(raw['features'])
+
+
+def test_convert_to_2039(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    # Conversion is in place, so every round starts from a freshly validated collection
+    benchmark.pedantic(
+        lambda collection: collection.convert_to_2039(), setup=lambda: ((_collection(raw),), {}), rounds=5
+    )
+
+
+def test_spatial_index_build(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+
+    def build() -> None:
+        collection.invalidate_index()
+        _ = collection.spatial_index
+
+    benchmark(build)
+
+
+def test_closest(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    points = _query_points(collection)
+    _ = collection.spatial_index
+    results = benchmark(lambda: [collection.closest(point) for point in points])
+    assert all(result is not None for result in results)
+
+
+def test_closest_min_distance(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    points = _query_points(collection, 20)
+    _ = collection.spatial_index
+    benchmark(lambda: [collection.closest(point, min_distance=1e-5, max_distance=0.01) for point in points])
+
+
+def test_closest_many(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    points = _query_points(collection)
+    _ = collection.spatial_index
+    results = benchmark(collection.closest_many, points)
+    assert len(results) == len(points)
+
+
+def test_filter(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    benchmark(collection.filter, lambda feature: feature.properties.get('layer') == 'building')
+
+
+def test_columnar_from_raw(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    columnar = benchmark(ColumnarFeatureCollection.from_raw, raw['features'])
+    assert len(columnar) == len(raw['features'])
+
+
+def test_columnar_convert_to_2039(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    benchmark.pedantic(
+        lambda columnar: columnar.convert_to_2039(),
+        setup=lambda: ((ColumnarFeatureCollection.from_raw(raw['features']),), {}),
+        rounds=5,
+    )
+
+
+def test_columnar_closest(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    columnar = ColumnarFeatureCollection.from_raw(raw['features'])
+    points = _query_points(_collection({'type': 'FeatureCollection', 'features': raw['features'][:QUERIES]}))
+    _ = columnar.spatial_index
+    benchmark(lambda: [columnar.closest(point) for point in points])
+
+
+def _campus_grid(collection: FeatureCollection, cells: int = 20) -> FeatureCollection:
+    minx, miny, maxx, maxy = collection.shapely.bounds
+    width, height = (maxx - minx) / cells, (maxy - miny) / cells
+    return FeatureCollection.model_validate(
+        {
+            'type': 'FeatureCollection',
+            'features': [
+                {
+                    'type': 'Feature',
+                    'geometry': {
+                        'type': 'Polygon',
+                        'coordinates': [
+                            [
+                                [minx + i * width, miny + j * height],
+                                [minx + (i + 1) * width, miny + j * height],
+                                [minx + (i + 1) * width, miny + (j + 1) * height],
+                                [minx + i * width, miny + (j + 1) * height],
+                                [minx + i * width, miny + j * height],
+                            ]
+                        ],
+                    },
+                    'properties': {'elid': f'C{i}-{j}'},
+                }
+                for i in range(cells)
+                for j in range(cells)
+            ],
+        }
+    )
+
+
+def test_join_campuses(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    campuses = _campus_grid(collection)
+    _ = campuses.spatial_index
+    matched = benchmark(collection.join_properties, campuses, {'campus_elid': 'elid'}, max_distance=1e-3)
+    assert matched == len(collection)
+
+
+def test_annotate_itm(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    benchmark(_collection(raw).annotate_itm)
+
+
+def test_filter_layer_predicate(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    benchmark(
+        collection.filter,
+        lambda feature: feature.properties.get('layer') == 'building' and (feature.properties.get('floors') or 0) > 10,
+    )
+
+
+def test_query_indexed(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    collection = _collection(raw)
+    collection.create_index('layer', 'floors')
+    query = Eq('layer', 'building') & Range('floors', 10, include_low=False)
+    collection.query(query)
+    benchmark(collection.query, query)
+
+
+def test_diff_snapshots(benchmark: typing.Any, raw: typing.Dict[str, typing.Any]) -> None:
+    old = _collection(raw)
+    new = _collection(raw)
+    # Every 100th feature moves ~10 m, every 50th gets a new floor count
+    for i, feature in enumerate(new.features):
+        if i % 100 == 0:
+            feature.geometry.coordinates = [feature.geometry.coordinates[0] + 1e-4, feature.geometry.coordinates[1]]
+        if i % 50 == 0:
+            feature.properties['floors'] = -1
+    result = benchmark(old.diff, new, key='handle')
+    assert len(result.moved) == len(range(0, len(new), 100))
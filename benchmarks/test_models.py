@@ -0,0 +1,67 @@
+import asyncio
+import typing
+
+import pytest
+
+from fnt_auto.models.serialization import dump_json, type_adapter
+from fnt_auto.models.zones.building import BuildingCreate
+from fnt_auto.pipeline import BuildingMapping, BuildingPipeline
+
+
+ROWS = 10_000
+
+
+@pytest.fixture(scope='module')
+def building_rows() -> typing.List[typing.Dict[str, typing.Any]]:
+    return [
+        {
+            'name': f'B{i}',
+            'campusElid': f'C{i % 50}',
+            'cX': 180000.0 + i,
+            'cY': 660000.0 + i,
+            'cFloorsNum': i % 30,
+            'description': 'benchmark building',
+        }
+        for i in range(ROWS)
+    ]
+
+
+@pytest.fixture(scope='module')
+def buildings(building_rows: typing.List[typing.Dict[str, typing.Any]]) -> typing.List[BuildingCreate]:
+    return [BuildingCreate.model_validate(row) for row in building_rows]
+
+
+def test_building_create_validate(
+    benchmark: typing.Any, building_rows: typing.List[typing.Dict[str, typing.Any]]
+) -> None:
+    benchmark(lambda: [BuildingCreate.model_validate(row) for row in building_rows])
+
+
+def test_building_create_validate_batch(
+    benchmark: typing.Any, building_rows: typing.List[typing.Dict[str, typing.Any]]
+) -> None:
+    adapter = type_adapter(typing.List[BuildingCreate])
+    benchmark(adapter.validate_python, building_rows)
+
+
+def test_building_to_rest_request(benchmark: typing.Any, buildings: typing.List[BuildingCreate]) -> None:
+    benchmark(lambda: [building.to_rest_request() for building in buildings])
+
+
+def test_building_to_rest_request_bytes(benchmark: typing.Any, buildings: typing.List[BuildingCreate]) -> None:
+    benchmark(lambda: [building.to_rest_request_bytes() for building in buildings])
+
+
+def test_building_batch_dump_json(benchmark: typing.Any, buildings: typing.List[BuildingCreate]) -> None:
+    benchmark(dump_json, buildings, typing.List[BuildingCreate], by_alias=True, exclude_defaults=True)
+
+
+@pytest.mark.parametrize('workers', [1, 4])
+def test_building_pipeline(benchmark: typing.Any, raw: typing.Dict[str, typing.Any], workers: int) -> None:
+    mapping = BuildingMapping(name='handle', default_campus_elid='C1')
+
+    def run() -> typing.List[BuildingCreate]:
+        return asyncio.run(BuildingPipeline(raw['features'], mapping, chunk_size=500, workers=workers).collect())
+
+    buildings = benchmark.pedantic(run, rounds=3)
+    assert len(buildings) == len(raw['features'])
@@ -1,3 +1,17 @@
 from fnt_auto._async_api._async_client import AsyncFntAPI
+from fnt_auto._async_api.journal import JobJournal
+from fnt_auto._async_api.query import QueryIterator
+from fnt_auto._common.scheduler import AdaptiveLimiter, RequestScheduler, RetryPolicy, TokenBucket
+from fnt_auto._common.soap import SoapCall, SoapTemplate
 
-__all__ = ['AsyncFntAPI',]
\ No newline at end of file
+__all__ = [
+    'AsyncFntAPI',
+    'JobJournal',
+    'AdaptiveLimiter',
+    'QueryIterator',
+    'RequestScheduler',
+    'RetryPolicy',
+    'SoapCall',
+    'SoapTemplate',
+    'TokenBucket',
+]
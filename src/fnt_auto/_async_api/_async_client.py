@@ -1,5 +1,6 @@
 from fnt_auto._async_api.location import LocationAPI
+from fnt_auto._async_api.telco import TelcoAPI
 
 
-class AsyncFntAPI(LocationAPI):
+class AsyncFntAPI(LocationAPI, TelcoAPI):
     pass
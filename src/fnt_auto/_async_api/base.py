@@ -1,92 +1,318 @@
+import asyncio
+import os
 import typing
 import logging
-import typing
 
+import httpx
 from httpx import AsyncClient
-from httpx import AsyncClient
-from fnt_auto.models.api import Login, RestResponse
+from fnt_auto._async_api.cache import (
+    DEFAULT_BATCH_WINDOW,
+    DEFAULT_CACHE_SIZE,
+    DEFAULT_CACHE_TTL,
+    CachedLookup,
+    LoadMany,
+    SqliteCacheStore,
+)
+from fnt_auto import _core
+from fnt_auto._async_api.bulk import DEFAULT_CONCURRENCY, BulkJob
+from fnt_auto._async_api.query import DEFAULT_PAGE_SIZE, QueryIterator
+from fnt_auto._async_api.session import SessionPool
+from fnt_auto._common.scheduler import RequestScheduler
+from fnt_auto._common.soap import SoapCall, SoapTemplate, compile_template
+from fnt_auto._core import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+)
+from fnt_auto._core import ErrorReponse, ResponseType, SuccessReponse  # noqa: F401
+from fnt_auto.instrumentation import NOOP, Instrumentation, PayloadLog
+from fnt_auto.models.api import RestResponse, SoapResponse
 
 
-if typing.TYPE_CHECKING:
-    from fnt_auto._async_api.base import ResponseType
+logger = logging.getLogger(__package__)
 
+_APIT = typing.TypeVar('_APIT', bound='AsyncBaseAPI')
+_ResultT = typing.TypeVar('_ResultT')
 
-logger = logging.getLogger(__package__)
 
-class AsyncBaseAPI:
+class AsyncBaseAPI(_core.RequestFlows):
     _client: AsyncClient
-    _session_id: str
+    _session_id: typing.Union[str, None] = None
 
-    def __init__(self, base_url: str, username: str, password: str) -> None:
-        self._client = AsyncClient(base_url=base_url.rstrip('/'))
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        *,
+        max_connections: typing.Union[int, None] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: typing.Union[int, None] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: typing.Union[float, None] = DEFAULT_KEEPALIVE_EXPIRY,
+        timeout: typing.Union[float, None] = DEFAULT_TIMEOUT,
+        connect_timeout: typing.Union[float, None] = DEFAULT_CONNECT_TIMEOUT,
+        read_timeout: typing.Union[float, None] = None,
+        write_timeout: typing.Union[float, None] = None,
+        pool_timeout: typing.Union[float, None] = None,
+        http2: bool = False,
+        transport: typing.Union[httpx.AsyncBaseTransport, None] = None,
+        warmup_connections: int = 1,
+        sessions: int = 1,
+        scheduler: typing.Union[RequestScheduler, None] = None,
+        cache_ttl: typing.Union[float, None] = DEFAULT_CACHE_TTL,
+        cache_size: int = DEFAULT_CACHE_SIZE,
+        cache_batch_window: float = DEFAULT_BATCH_WINDOW,
+        cache_path: typing.Union[str, 'os.PathLike[str]', None] = None,
+        instrumentation: typing.Union[Instrumentation, None] = None,
+        payload_log_sample_rate: float = 1.0,
+    ) -> None:
+        # A shared transport owns its own pool, so it is left open when this client is closed
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = self.create_transport(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+                http2=http2,
+            )
+        self._client = AsyncClient(
+            base_url=base_url.rstrip('/'),
+            transport=transport,
+            timeout=httpx.Timeout(
+                timeout,
+                connect=connect_timeout,
+                read=read_timeout if read_timeout is not None else timeout,
+                write=write_timeout if write_timeout is not None else timeout,
+                pool=pool_timeout if pool_timeout is not None else timeout,
+            ),
+        )
+        self._warmup_connections = warmup_connections
         self._username = username
         self._password = password
+        self._sessions = SessionPool(self._create_session, sessions)
+        self._scheduler = scheduler or RequestScheduler()
+        self._cache_ttl = cache_ttl
+        self._cache_size = cache_size
+        self._cache_batch_window = cache_batch_window
+        self._cache_store = SqliteCacheStore(cache_path) if cache_path is not None else None
+        self._lookups: typing.List[CachedLookup[typing.Any, typing.Any]] = []
+        self.instrumentation = instrumentation or NOOP
+        self.payload_log = PayloadLog(logger, payload_log_sample_rate)
+
+    @staticmethod
+    def create_transport(
+        *,
+        max_connections: typing.Union[int, None] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: typing.Union[int, None] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: typing.Union[float, None] = DEFAULT_KEEPALIVE_EXPIRY,
+        http2: bool = False,
+    ) -> httpx.AsyncHTTPTransport:
+        return httpx.AsyncHTTPTransport(
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_keepalive_connections,
+                keepalive_expiry=keepalive_expiry,
+            ),
+            http2=http2,
+        )
+
+    async def __aenter__(self: _APIT) -> _APIT:
+        await self.warmup(self._warmup_connections)
+        return self
+
+    async def __aexit__(self, *exc_info: typing.Any) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        for lookup in self._lookups:
+            await lookup.aclose()
+        await self._close_sessions()
+        if self._cache_store is not None:
+            self._cache_store.close()
+        if self._owns_transport:
+            await self._client.aclose()
+
+    def create_lookup(
+        self, namespace: str, load_many: 'LoadMany[typing.Any, typing.Any]', ttl: typing.Union[float, None] = None
+    ) -> CachedLookup[typing.Any, typing.Any]:
+        lookup: CachedLookup[typing.Any, typing.Any] = CachedLookup(
+            load_many,
+            ttl=ttl if ttl is not None else self._cache_ttl,
+            maxsize=self._cache_size,
+            batch_window=self._cache_batch_window,
+            store=self._cache_store,
+            namespace=namespace,
+        )
+        # Closed with the client, so no load outlives it
+        self._lookups.append(lookup)
+        return lookup
+
+    async def warmup(self, connections: int = 1) -> None:
+        async def _open() -> None:
+            try:
+                await self._client.head('/')
+            except httpx.HTTPError as exc:
+                logger.debug('Connection warmup failed: %s', exc)
+
+        await asyncio.gather(*(_open() for _ in range(connections)))
 
     async def login(
         self, username: typing.Union[str, None] = None, password: typing.Union[str, None] = None
     ) -> typing.Union[str, None]:
-        response = await self._client.post(
-            '/axis/api/rest/businessGateway/login',
-            json=Login(user=username or self._username, password=password or self._password).model_dump(by_alias=True),
-        )
-        if response.is_success:
-            self._session_id = response.json()['sessionId']
-            return self._session_id
-        logger.error(response.json())
-        return None
+        # Credentials of an explicit login are also the ones used when the session has to be renewed
+        self._username = username or self._username
+        self._password = password or self._password
+        session_id = await self._create_session()
+        if session_id is not None:
+            self._session_id = session_id
+            self._sessions.adopt(session_id)
+        return session_id
 
     async def logout(self, session_id: typing.Union[str, None] = None) -> None:
-        response = await self._client.post(
-            '/axis/api/rest/businessGateway/logout', params={'sessionId': session_id or self._session_id}
-        )
-        if response.is_success:
-            return response.json()
-        logger.error(response.json())
-        return response.json()
+        return await self._run(self._logout_flow(session_id or self._session_id))  # type: ignore[arg-type]
+
+    async def _create_session(
+        self, username: typing.Union[str, None] = None, password: typing.Union[str, None] = None
+    ) -> typing.Union[str, None]:
+        return await self._run(self._login_flow(username, password))
+
+    async def _close_sessions(self) -> None:
+        for session_id in self._sessions.clear():
+            try:
+                await self.logout(session_id)
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning('Failed to logout session: %s', exc)
+
+    async def _run(self, flow: '_core.Flow[_ResultT]') -> _ResultT:
+        # Performs the I/O a request flow yields until it returns; errors are raised inside the flow
+        result: typing.Any = None
+        error: typing.Union[BaseException, None] = None
+        while True:
+            try:
+                effect = flow.send(result) if error is None else flow.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                result, error = await self._perform(effect), None
+            except BaseException as exc:
+                result, error = None, exc
+
+    async def _perform(self, effect: '_core.Effect') -> typing.Any:
+        if isinstance(effect, _core.Send):
+            request = effect.request.build(self._client)
+            return await self._scheduler.send(lambda: self._client.send(request, stream=effect.stream))
+        if isinstance(effect, _core.Read):
+            try:
+                async for chunk in effect.response.aiter_bytes():
+                    effect.sink(chunk)
+            finally:
+                await effect.response.aclose()
+            return None
+        if isinstance(effect, _core.Close):
+            return await effect.response.aclose()
+        if isinstance(effect, _core.Sleep):
+            return await asyncio.sleep(effect.seconds)
+        if isinstance(effect, _core.AcquireSession):
+            return await self._sessions.acquire()
+        return await self._sessions.renew(effect.stale)
 
     async def rest_request(
-        self, entity: str, operation: str, data: typing.Any, session_id: typing.Union[str, None] = None
+        self,
+        entity: str,
+        operation: str,
+        data: typing.Any,
+        session_id: typing.Union[str, None] = None,
+        idempotent: typing.Union[bool, None] = None,
     ) -> 'RestResponse':
-        logger.info(f"About to {operation} {entity}:")
-        logger.info(f"\tRequest content: {data}")
-        response = await self._client.post(
-            f'/axis/api/rest/entity/{entity}/{operation}', params={'sessionId': session_id or self._session_id}, json=data
+        response = await self._run(self._rest_flow(entity, operation, data, session_id, idempotent))
+        return _core.parse_rest_response(response, entity, operation)
+
+    async def _rest_exchange(
+        self,
+        entity: str,
+        operation: str,
+        data: typing.Any,
+        session_id: typing.Union[str, None] = None,
+        idempotent: typing.Union[bool, None] = None,
+    ) -> httpx.Response:
+        # The raw response, for callers that parse the body themselves (see `query`)
+        return await self._run(self._rest_flow(entity, operation, data, session_id, idempotent))
+
+    def query(
+        self,
+        entity: str,
+        restrictions: typing.Mapping[str, typing.Any],
+        *,
+        model: typing.Any = None,
+        return_attributes: typing.Union[typing.List[str], None] = None,
+        page_size: typing.Union[int, None] = DEFAULT_PAGE_SIZE,
+        prefetch: typing.Union[int, None] = None,
+        concurrency: int = 1,
+        session_id: typing.Union[str, None] = None,
+    ) -> 'QueryIterator[typing.Any]':
+        """Iterate over the `entity` objects matching `restrictions`, page by page: `async for row in api.query(...)`.
+
+        Rows are dicts, or instances of `model` parsed straight from each page's JSON. See `QueryIterator`.
+        """
+        return QueryIterator(
+            self,
+            entity,
+            restrictions,
+            model=model,
+            return_attributes=return_attributes,
+            page_size=page_size,
+            prefetch=prefetch,
+            concurrency=concurrency,
+            session_id=session_id,
         )
-        ret = RestResponse(status_code=response.status_code)
-        if response.is_success:
-            ret.data = response.json().get('returnData')
-            logger.info(f"\tResponse content: {ret.data}")
-        else:
-            ret.message = response.json().get('status',{}).get('message')
-            logger.error(f"\tFailed to {operation} {entity}: {ret.message}")
-        return ret
 
     async def rest_elid_request(
-        self, entity: str, elid: str, operation: str, data: typing.Any, session_id: typing.Union[str, None] = None
+        self,
+        entity: str,
+        elid: str,
+        operation: str,
+        data: typing.Any,
+        session_id: typing.Union[str, None] = None,
+        idempotent: typing.Union[bool, None] = None,
     ) -> 'ResponseType':
-        response = await self._client.post(
-            f'/entity/{entity}/{elid}/{operation}', params={'sessionId': session_id or self._session_id}, json=data
-        )
-        if response.is_success:
-            return response.json(), None
-        logger.error(response.text)
-        return None, response.text
+        response = await self._run(self._rest_flow(entity, operation, data, session_id, idempotent, elid=elid))
+        return _core.parse_rest_elid_response(response)
 
     async def soap_request(
-        self, operation: str, xml: str, session_id: typing.Union[str, None] = None
+        self, operation: str, xml: str, session_id: typing.Union[str, None] = None, idempotent: bool = False
     ) -> typing.Union[typing.Tuple[typing.Literal[True], None], typing.Tuple[None, str]]:
-        url = f'/axis/services/{operation}'
-        payload = xml.format(sid=session_id or self._session_id)
-        response = await self._client.post(
-            url, content=payload, headers={'Content-Type': 'text/xml', 'SOAPAction': url}
-        )
-        if b'exception_msgtxt' in response.content:
-            logger.error(response.content)
-            return None, response.content.decode('utf-8')
+        response = await self.soap_call(operation, xml, session_id=session_id, idempotent=idempotent)
+        if response.message is not None:
+            return None, response.message
         return True, None
 
+    async def soap_call(
+        self,
+        operation: str,
+        template: typing.Union[str, SoapTemplate],
+        params: typing.Union[typing.Mapping[str, typing.Any], None] = None,
+        session_id: typing.Union[str, None] = None,
+        idempotent: bool = False,
+    ) -> SoapResponse:
+        return await self._run(self._soap_flow(operation, template, params, session_id, idempotent))
+
+    def soap_bulk(
+        self,
+        operation: str,
+        template: typing.Union[str, SoapTemplate],
+        calls: typing.Iterable[typing.Union[SoapCall, typing.Mapping[str, typing.Any]]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_id: typing.Union[str, None] = None,
+        idempotent: bool = False,
+    ) -> 'BulkJob[SoapCall]':
+        if isinstance(template, str):
+            template = compile_template(template)
 
-ErrorReponse = typing.Tuple[None, str]
-SuccessReponse = typing.Tuple[typing.Dict[str, typing.Any], None]
+        async def handler(call: SoapCall) -> None:
+            call.response = await self.soap_call(
+                operation, template, call.params, session_id=session_id, idempotent=idempotent
+            )
 
-ResponseType = typing.Union[ErrorReponse, SuccessReponse]
+        items = (call if isinstance(call, SoapCall) else SoapCall(params=dict(call)) for call in calls)
+        return BulkJob(items, handler, concurrency)
@@ -0,0 +1,102 @@
+import asyncio
+import logging
+import typing
+
+from fnt_auto._common.bulk import DEFAULT_CONCURRENCY, BulkStats, ItemT, settle
+
+
+logger = logging.getLogger(__package__)
+
+ItemSource = typing.Union[typing.Iterable[ItemT], typing.AsyncIterable[ItemT]]
+
+
+class BulkJob(typing.Generic[ItemT]):
+    """Runs `handler` over `items` with at most `concurrency` requests in flight.
+
+    Iterating the job yields every item as soon as its request finishes (completion order, not input order);
+    `stats` holds the aggregate per-status counts and throughput. `items` may be an async iterable, e.g. a
+    conversion pipeline, in which case the next item is awaited alongside the requests already in flight.
+    """
+
+    def __init__(
+        self,
+        items: 'ItemSource[ItemT]',
+        handler: typing.Callable[[ItemT], typing.Awaitable[typing.Any]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        if concurrency < 1:
+            msg = f'concurrency must be at least 1, got {concurrency}'
+            raise ValueError(msg)
+        self._items = items
+        self._handler = handler
+        self._concurrency = concurrency
+        self._started = False
+        self.stats = BulkStats()
+
+    def __aiter__(self) -> typing.AsyncIterator[ItemT]:
+        if self._started:
+            msg = 'BulkJob can only be iterated once'
+            raise RuntimeError(msg)
+        self._started = True
+        return self._run()
+
+    async def run(self) -> BulkStats:
+        async for _ in self:
+            pass
+        return self.stats
+
+    async def _run(self) -> typing.AsyncIterator[ItemT]:
+        iterator: typing.Union[typing.Iterator[ItemT], None] = None
+        aiterator: typing.Union[typing.AsyncIterator[ItemT], None] = None
+        if isinstance(self._items, typing.AsyncIterable):
+            aiterator = self._items.__aiter__()
+        else:
+            iterator = iter(self._items)
+        pending: typing.Set['asyncio.Future[ItemT]'] = set()
+        fetch: typing.Union['asyncio.Future[ItemT]', None] = None
+        exhausted = False
+        self.stats.start()
+        try:
+            while True:
+                while not exhausted and fetch is None and len(pending) < self._concurrency:
+                    if aiterator is not None:
+                        fetch = asyncio.ensure_future(aiterator.__anext__())
+                        break
+                    try:
+                        item = next(iterator)  # type: ignore[arg-type]
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    pending.add(asyncio.ensure_future(self._process(item)))
+                waiting = pending if fetch is None else pending | {fetch}
+                if not waiting:
+                    break
+                done, _ = await asyncio.wait(waiting, return_when=asyncio.FIRST_COMPLETED)
+                if fetch is not None and fetch in done:
+                    done.discard(fetch)
+                    try:
+                        pending.add(asyncio.ensure_future(self._process(fetch.result())))
+                    except StopAsyncIteration:
+                        exhausted = True
+                    fetch = None
+                pending -= done
+                for task in done:
+                    item = task.result()
+                    self.stats.add(item.status)
+                    yield item
+        finally:
+            if fetch is not None:
+                pending.add(fetch)
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+            self.stats.finish()
+            logger.info('Bulk job finished: %r', self.stats)
+
+    async def _process(self, item: ItemT) -> ItemT:
+        try:
+            await self._handler(item)
+        except Exception as exc:
+            return settle(item, exc)
+        return settle(item)
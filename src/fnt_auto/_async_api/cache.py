@@ -0,0 +1,279 @@
+import asyncio
+import logging
+import os
+import sqlite3
+import time
+import typing
+from collections import OrderedDict
+
+from fnt_auto.models.serialization import dumps, loads
+
+
+logger = logging.getLogger(__package__)
+
+K = typing.TypeVar('K', bound=typing.Hashable)
+V = typing.TypeVar('V')
+
+DEFAULT_CACHE_TTL = 300.0
+DEFAULT_CACHE_SIZE = 10_000
+DEFAULT_BATCH_WINDOW = 0.005
+DEFAULT_MAX_BATCH = 100
+
+_MISSING: typing.Any = object()
+
+LoadMany = typing.Callable[[typing.List[K]], typing.Awaitable[typing.Mapping[K, V]]]
+
+
+class TTLCache(typing.Generic[K, V]):
+    """In-memory LRU cache whose entries also expire `ttl` seconds after they were stored."""
+
+    def __init__(self, maxsize: int = DEFAULT_CACHE_SIZE, ttl: typing.Union[float, None] = DEFAULT_CACHE_TTL) -> None:
+        if maxsize < 1:
+            msg = f'maxsize must be at least 1, got {maxsize}'
+            raise ValueError(msg)
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: typing.OrderedDict[K, typing.Tuple[V, float]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: object) -> bool:
+        entry = self._entries.get(key)  # type: ignore[call-overload]
+        return entry is not None and entry[1] > time.time()
+
+    def get(self, key: K, default: typing.Union[V, None] = None) -> typing.Union[V, None]:
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return default
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, key: K, value: V, expires_at: typing.Union[float, None] = None) -> None:  # noqa: A003
+        if expires_at is None:
+            expires_at = time.time() + self.ttl if self.ttl is not None else float('inf')
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def expires_at(self, key: K) -> typing.Union[float, None]:
+        entry = self._entries.get(key)
+        return entry[1] if entry is not None else None
+
+    def pop(self, key: K) -> None:
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+
+class SqliteCacheStore:
+    """On-disk backing store for lookup caches, so a restarted client does not refetch master data."""
+
+    def __init__(self, path: typing.Union[str, 'os.PathLike[str]']) -> None:
+        self.path = path
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        with self._connection:
+            self._connection.execute(
+                'CREATE TABLE IF NOT EXISTS lookup_cache ('
+                'namespace TEXT NOT NULL, key TEXT NOT NULL, value BLOB NOT NULL, expires_at REAL NOT NULL, '
+                'PRIMARY KEY (namespace, key))'
+            )
+
+    def get_many(
+        self, namespace: str, keys: typing.Sequence[str]
+    ) -> typing.Dict[str, typing.Tuple[typing.Any, float]]:
+        result: typing.Dict[str, typing.Tuple[typing.Any, float]] = {}
+        now = time.time()
+        # Stay below SQLite's default limit on bound parameters
+        for start in range(0, len(keys), 500):
+            chunk = keys[start : start + 500]
+            rows = self._connection.execute(
+                'SELECT key, value, expires_at FROM lookup_cache '
+                f'WHERE namespace = ? AND expires_at > ? AND key IN ({", ".join("?" * len(chunk))})',
+                (namespace, now, *chunk),
+            )
+            for key, value, expires_at in rows:
+                result[key] = (loads(value), expires_at)
+        return result
+
+    def set_many(self, namespace: str, items: typing.Iterable[typing.Tuple[str, typing.Any, float]]) -> None:
+        with self._connection:
+            self._connection.executemany(
+                'INSERT OR REPLACE INTO lookup_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)',
+                [(namespace, key, dumps(value), expires_at) for key, value, expires_at in items],
+            )
+
+    def delete(self, namespace: str, key: typing.Union[str, None] = None) -> None:
+        with self._connection:
+            if key is None:
+                self._connection.execute('DELETE FROM lookup_cache WHERE namespace = ?', (namespace,))
+            else:
+                self._connection.execute('DELETE FROM lookup_cache WHERE namespace = ? AND key = ?', (namespace, key))
+
+    def purge_expired(self) -> None:
+        with self._connection:
+            self._connection.execute('DELETE FROM lookup_cache WHERE expires_at <= ?', (time.time(),))
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class CachedLookup(typing.Generic[K, V]):
+    """Read-through cache in front of a multi-key loader.
+
+    Misses for the same key share one in-flight load, and misses that arrive within `batch_window` seconds of each
+    other are fetched together in a single `load_many` call of at most `max_batch` keys. Keys the loader does not
+    return resolve to None and are not cached. With a `store`, entries are also persisted under `namespace`
+    (keys and values must then be JSON serializable, and keys are stored as strings).
+    """
+
+    def __init__(
+        self,
+        load_many: 'LoadMany[K, V]',
+        *,
+        ttl: typing.Union[float, None] = DEFAULT_CACHE_TTL,
+        maxsize: int = DEFAULT_CACHE_SIZE,
+        batch_window: float = DEFAULT_BATCH_WINDOW,
+        max_batch: int = DEFAULT_MAX_BATCH,
+        store: typing.Union[SqliteCacheStore, None] = None,
+        namespace: str = 'default',
+    ) -> None:
+        self._load_many = load_many
+        self._cache: TTLCache[K, V] = TTLCache(maxsize, ttl)
+        self.batch_window = batch_window
+        self.max_batch = max_batch
+        self._store = store
+        self.namespace = namespace
+        self._in_flight: typing.Dict[K, 'asyncio.Future[typing.Union[V, None]]'] = {}
+        self._queued: typing.List[K] = []
+        self._flush_handle: typing.Union[asyncio.TimerHandle, None] = None
+        self._loads: typing.Set['asyncio.Task[None]'] = set()
+
+    @property
+    def cache(self) -> 'TTLCache[K, V]':
+        return self._cache
+
+    async def get(self, key: K) -> typing.Union[V, None]:
+        return (await self.get_many([key]))[key]
+
+    async def get_many(self, keys: typing.Iterable[K]) -> typing.Dict[K, typing.Union[V, None]]:
+        result: typing.Dict[K, typing.Union[V, None]] = {}
+        missing: typing.List[K] = []
+        for key in dict.fromkeys(keys):
+            value = self._cache.get(key, _MISSING)
+            if value is _MISSING:
+                missing.append(key)
+            else:
+                result[key] = value
+        if missing and self._store is not None:
+            missing = self._load_from_store(missing, result)
+        if missing:
+            futures = [self._schedule(key) for key in missing]
+            for key, value in zip(missing, await asyncio.gather(*futures)):
+                result[key] = value
+        return result
+
+    def invalidate(self, key: typing.Union[K, None] = None) -> None:
+        if key is None:
+            self._cache.clear()
+        else:
+            self._cache.pop(key)
+        if self._store is not None:
+            self._store.delete(self.namespace, None if key is None else str(key))
+
+    def _load_from_store(self, keys: typing.List[K], result: typing.Dict[K, typing.Union[V, None]]) -> typing.List[K]:
+        stored = self._store.get_many(self.namespace, [str(key) for key in keys])  # type: ignore[union-attr]
+        missing = []
+        for key in keys:
+            entry = stored.get(str(key))
+            if entry is None:
+                missing.append(key)
+                continue
+            value, expires_at = entry
+            self._cache.set(key, value, expires_at)
+            result[key] = value
+        return missing
+
+    def _schedule(self, key: K) -> 'asyncio.Future[typing.Union[V, None]]':
+        future = self._in_flight.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._in_flight[key] = future
+        self._queued.append(key)
+        if len(self._queued) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.batch_window, self._flush)
+        return future
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        keys, self._queued = self._queued, []
+        for start in range(0, len(keys), self.max_batch):
+            # The event loop only keeps weak references to tasks
+            task = asyncio.ensure_future(self._load(keys[start : start + self.max_batch]))
+            self._loads.add(task)
+            task.add_done_callback(self._loads.discard)
+
+    async def aclose(self) -> None:
+        """Cancel the queued and running loads; whoever waits for them gets a CancelledError."""
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        keys, self._queued = self._queued, []
+        self._cancel_waiters(keys)
+        loads = list(self._loads)
+        for task in loads:
+            task.cancel()
+        if loads:
+            await asyncio.gather(*loads, return_exceptions=True)
+
+    def _cancel_waiters(self, keys: typing.Iterable[K]) -> None:
+        for key in keys:
+            future = self._in_flight.pop(key, None)
+            if future is not None and not future.done():
+                future.cancel()
+
+    async def _load(self, keys: typing.List[K]) -> None:
+        try:
+            await self._load_batch(keys)
+        finally:
+            # Only left over when the load was cancelled
+            self._cancel_waiters(keys)
+
+    async def _load_batch(self, keys: typing.List[K]) -> None:
+        try:
+            values = await self._load_many(keys)
+        except Exception as exc:
+            # Every waiter of the batch sees the failure; nothing is cached so the next call retries
+            for key in keys:
+                future = self._in_flight.pop(key)
+                if not future.done():
+                    future.set_exception(exc)
+            return
+        persisted = []
+        for key in keys:
+            value = values.get(key)
+            if value is not None:
+                self._cache.set(key, value)
+                persisted.append((str(key), value, self._cache.expires_at(key)))
+            future = self._in_flight.pop(key)
+            if not future.done():
+                future.set_result(value)
+        if persisted and self._store is not None:
+            try:
+                self._store.set_many(self.namespace, persisted)
+            except (sqlite3.Error, TypeError, ValueError) as exc:
+                logger.warning('Failed to persist %s lookups: %s', self.namespace, exc)
@@ -0,0 +1,188 @@
+import csv
+import hashlib
+import logging
+import os
+import time
+import typing
+
+from fnt_auto._async_api.bulk import DEFAULT_CONCURRENCY, BulkJob, ItemSource, ItemT
+from fnt_auto.models.base import ItemCreate, ItemStatusOpt
+from fnt_auto.models.serialization import dumps, loads
+
+
+logger = logging.getLogger(__package__)
+
+# Outcomes that need no further request when a job is resumed
+COMPLETED_STATUSES = frozenset(
+    {ItemStatusOpt.SUCCESS, ItemStatusOpt.ALREADY_EXIST, ItemStatusOpt.UPDATED, ItemStatusOpt.UNCHANGED}
+)
+EXPORT_COLUMNS = ['fingerprint', 'key', 'status', 'elid', 'message', 'recorded_at']
+
+
+def item_fingerprint(item: ItemCreate) -> str:
+    # The request payload identifies the item, so a re-run over the same input maps onto the same journal entries
+    digest = hashlib.sha256(type(item).__name__.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(item.to_rest_request_bytes())
+    return digest.hexdigest()
+
+
+def item_key(item: ItemCreate) -> typing.Union[str, None]:
+    for attribute in ('name', 'id', 'visible_id'):
+        value = getattr(item, attribute, None)
+        if value is not None:
+            return str(value)
+    return None
+
+
+class JobJournal:
+    """Append-only JSONL journal of bulk item outcomes, keyed by `item_fingerprint`.
+
+    Later records of a fingerprint override earlier ones, so a resumed job only appends. With `durable`, each record
+    is fsync'ed before the next item is handled.
+    """
+
+    def __init__(self, path: typing.Union[str, 'os.PathLike[str]'], durable: bool = False) -> None:
+        self.path = path
+        self.durable = durable
+        self._records: typing.Union[typing.Dict[str, typing.Dict[str, typing.Any]], None] = None
+        self._fp: typing.Union[typing.BinaryIO, None] = None
+
+    @property
+    def records(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        if self._records is None:
+            self._records = self._read()
+        return self._records
+
+    def _read(self) -> typing.Dict[str, typing.Dict[str, typing.Any]]:
+        records: typing.Dict[str, typing.Dict[str, typing.Any]] = {}
+        if not os.path.exists(self.path):  # noqa: PTH110
+            return records
+        with open(self.path, 'rb') as fp:  # noqa: PTH123
+            for number, line in enumerate(fp, 1):
+                if not line.strip():
+                    continue
+                try:
+                    record = loads(line)
+                except ValueError:
+                    # A crash can leave a partial last line behind
+                    logger.warning('Ignoring unreadable journal line %d in %s', number, self.path)
+                    continue
+                records[record['fingerprint']] = record
+        return records
+
+    def completed(self, fingerprint: str) -> typing.Union[typing.Dict[str, typing.Any], None]:
+        record = self.records.get(fingerprint)
+        if record is not None and ItemStatusOpt[record['status']] in COMPLETED_STATUSES:
+            return record
+        return None
+
+    def restore(self, item: ItemCreate, record: typing.Mapping[str, typing.Any]) -> None:
+        item.status = ItemStatusOpt[record['status']]
+        if record.get('elid') is not None and item.elid is None:
+            item.new_item_elid = record['elid']
+
+    def record(self, item: ItemCreate, fingerprint: typing.Union[str, None] = None) -> None:
+        response = item.rest_response
+        entry = {
+            'fingerprint': fingerprint or item_fingerprint(item),
+            'key': item_key(item),
+            'status': item.status.name,
+            'elid': item.elid,
+            'message': response.message if response is not None else None,
+            'recorded_at': time.time(),
+        }
+        if self._fp is None:
+            self._fp = self._open()
+        self._fp.write(dumps(entry) + b'\n')
+        self._fp.flush()
+        if self.durable:
+            os.fsync(self._fp.fileno())
+        self.records[entry['fingerprint']] = entry
+
+    def _open(self) -> typing.BinaryIO:
+        fp = open(self.path, 'a+b')  # noqa: SIM115, PTH123
+        if fp.tell():
+            # Start on a fresh line after a partial record left by a crash, instead of appending to it
+            fp.seek(-1, os.SEEK_END)
+            if fp.read(1) != b'\n':
+                fp.write(b'\n')
+        return fp
+
+    def close(self) -> None:
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+
+    def __enter__(self) -> 'JobJournal':
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+    def export_csv(self, target: typing.Union[str, 'os.PathLike[str]', typing.TextIO]) -> int:
+        if isinstance(target, (str, os.PathLike)):
+            with open(target, 'w', newline='', encoding='utf-8') as fp:  # noqa: PTH123
+                return self.export_csv(fp)
+        writer = csv.DictWriter(target, fieldnames=EXPORT_COLUMNS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(self.records.values())
+        return len(self.records)
+
+
+class JournaledBulkJob(BulkJob[ItemT]):
+    """`BulkJob` that records every outcome in a `JobJournal` and skips the items it already completed.
+
+    Skipped items get their journaled status and elid back and are yielded (and counted) like processed ones.
+    """
+
+    def __init__(
+        self,
+        items: 'ItemSource[ItemT]',
+        handler: typing.Callable[[ItemT], typing.Awaitable[typing.Any]],
+        journal: JobJournal,
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        super().__init__(items, handler, concurrency)
+        self.journal = journal
+        self.resumed = 0
+        self._fingerprints: typing.Dict[int, str] = {}
+        self._restored: typing.List[ItemT] = []
+
+    def _is_pending(self, item: ItemT) -> bool:
+        fingerprint = item_fingerprint(item)  # type: ignore[arg-type]
+        record = self.journal.completed(fingerprint)
+        if record is None:
+            self._fingerprints[id(item)] = fingerprint
+            return True
+        self.journal.restore(item, record)  # type: ignore[arg-type]
+        self.resumed += 1
+        self.stats.add(item.status)
+        self._restored.append(item)
+        return False
+
+    def _pending(self, items: typing.Iterable[ItemT]) -> typing.Iterator[ItemT]:
+        return (item for item in items if self._is_pending(item))
+
+    async def _apending(self, items: typing.AsyncIterable[ItemT]) -> typing.AsyncIterator[ItemT]:
+        async for item in items:
+            if self._is_pending(item):
+                yield item
+
+    async def _run(self) -> typing.AsyncIterator[ItemT]:
+        if isinstance(self._items, typing.AsyncIterable):
+            self._items = self._apending(self._items)
+        else:
+            self._items = self._pending(self._items)
+        try:
+            async for item in super()._run():
+                self.journal.record(item, self._fingerprints.pop(id(item)))  # type: ignore[arg-type]
+                yield item
+                while self._restored:
+                    yield self._restored.pop()
+            while self._restored:
+                yield self._restored.pop()
+        finally:
+            if self.resumed:
+                logger.info('Resumed %d items already completed in %s', self.resumed, self.journal.path)
+            self.journal.close()
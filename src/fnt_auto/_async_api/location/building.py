@@ -1,12 +1,144 @@
-from typing import Optional
-from fnt_auto._async_api.base import AsyncBaseAPI
-from fnt_auto.models.zones.building import BuildingCreate
+import asyncio
+import functools
+import logging
+from collections import defaultdict
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Union, overload
+from fnt_auto._async_api.base import AsyncBaseAPI, ResponseType
+from fnt_auto._async_api.bulk import DEFAULT_CONCURRENCY, BulkJob
+from fnt_auto._async_api.journal import JobJournal, JournaledBulkJob
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.models.reconcile import PlanItem, SyncActionOpt, SyncPlan, build_plan
+from fnt_auto.models.zones.building import BuildingAttr, BuildingCreate
 from fnt_auto.models.api import RestResponse
 
 
+logger = logging.getLogger(__package__)
+
+BUILDING_RETURN_ATTRIBUTES = ['elid', 'name', *(field.alias or name for name, field in BuildingAttr.model_fields.items())]
+
+
 class BuildingAPI(AsyncBaseAPI):
 
     async def create_building(self, building: BuildingCreate, session_id:Optional[str]=None) -> 'RestResponse': 
-        building.rest_response = await self.rest_request('building', 'create', building.to_rest_request(), session_id=session_id)
+        building.rest_response = await self.rest_request(
+            'building', 'create', building.to_rest_request_bytes(), session_id=session_id
+        )
         return building.rest_response # type: ignore
-        
\ No newline at end of file
+
+    @overload
+    def create_buildings(
+        self,
+        buildings: Union[Iterable[BuildingCreate], AsyncIterable[BuildingCreate]],
+        concurrency: int = ...,
+        session_id: Optional[str] = ...,
+        journal: None = ...,
+    ) -> 'BulkJob[BuildingCreate]': ...
+
+    @overload
+    def create_buildings(
+        self,
+        buildings: Union[Iterable[BuildingCreate], AsyncIterable[BuildingCreate]],
+        concurrency: int = ...,
+        session_id: Optional[str] = ...,
+        *,
+        journal: JobJournal,
+    ) -> 'JournaledBulkJob[BuildingCreate]': ...
+
+    def create_buildings(
+        self,
+        buildings: Union[Iterable[BuildingCreate], AsyncIterable[BuildingCreate]],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_id: Optional[str] = None,
+        journal: Optional[JobJournal] = None,
+    ) -> 'BulkJob[BuildingCreate]':
+        handler = functools.partial(self.create_building, session_id=session_id)
+        if journal is not None:
+            return JournaledBulkJob(buildings, handler, journal, concurrency)
+        return BulkJob(buildings, handler, concurrency)
+
+    async def update_building(
+        self, elid: str, changes: Dict[str, Any], session_id: Optional[str] = None
+    ) -> 'ResponseType':
+        return await self.rest_elid_request('building', elid, 'update', changes, session_id=session_id)
+
+    async def query_buildings(
+        self,
+        restrictions: Dict[str, Any],
+        return_attributes: Optional[List[str]] = None,
+        session_id: Optional[str] = None,
+        page_size: Optional[int] = None,
+        concurrency: int = 1,
+    ) -> List[Dict[str, Any]]:
+        # A single request by default; large campuses can be read in parallel pages with `page_size`
+        return await self.query(
+            'building',
+            restrictions,
+            return_attributes=return_attributes,
+            page_size=page_size,
+            concurrency=concurrency,
+            session_id=session_id,
+        ).collect()
+
+    async def query_campus_buildings(self, campus_elid: str, session_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        return await self.query_buildings(
+            {'campusElid': {'operator': '=', 'value': campus_elid}},
+            return_attributes=BUILDING_RETURN_ATTRIBUTES,
+            session_id=session_id,
+        )
+
+    async def sync_buildings(
+        self,
+        buildings: Iterable[BuildingCreate],
+        key: str = 'name',
+        dry_run: bool = False,
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_id: Optional[str] = None,
+    ) -> 'SyncPlan[BuildingCreate]':
+        by_campus: Dict[str, List[BuildingCreate]] = defaultdict(list)
+        for building in buildings:
+            by_campus[building.campus_elid].append(building)
+        existing = await asyncio.gather(
+            *(self.query_campus_buildings(campus_elid, session_id=session_id) for campus_elid in by_campus)
+        )
+        plan: SyncPlan[BuildingCreate] = SyncPlan(
+            [
+                plan_item
+                for campus_buildings, campus_existing in zip(by_campus.values(), existing)
+                for plan_item in build_plan(campus_buildings, campus_existing, key=key)
+            ]
+        )
+        # One line per pending building only at DEBUG, a large import would otherwise log one line per item
+        logger.info('Building sync plan: %s', plan.summary())
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(plan.report(key))
+        if dry_run:
+            return plan
+
+        for plan_item in plan:
+            if plan_item.elid is not None:
+                plan_item.item.existing_elid = plan_item.elid
+            if plan_item.action == SyncActionOpt.NOOP:
+                plan_item.item.status = ItemStatusOpt.UNCHANGED
+        # Buildings left out of the plan as duplicates of an earlier one
+        planned = {id(plan_item.item) for plan_item in plan}
+        for campus_buildings in by_campus.values():
+            for building in campus_buildings:
+                if id(building) not in planned:
+                    building.status = ItemStatusOpt.SKIPPED
+        pending = {id(plan_item.item): plan_item for plan_item in plan.pending}
+
+        async def apply(building: BuildingCreate) -> None:
+            await self._apply_plan_item(pending[id(building)], session_id)
+
+        await BulkJob([plan_item.item for plan_item in pending.values()], apply, concurrency).run()
+        return plan
+
+    async def _apply_plan_item(self, plan_item: 'PlanItem[BuildingCreate]', session_id: Optional[str]) -> None:
+        building = plan_item.item
+        if plan_item.action == SyncActionOpt.CREATE:
+            await self.create_building(building, session_id=session_id)
+            return
+        _, error = await self.update_building(
+            plan_item.elid, plan_item.changes, session_id=session_id  # type: ignore[arg-type]
+        )
+        building.status = ItemStatusOpt.FAILED if error else ItemStatusOpt.UPDATED
@@ -0,0 +1,140 @@
+import asyncio
+import logging
+import typing
+from collections import deque
+
+from pydantic import ValidationError
+
+from fnt_auto import _core
+from fnt_auto.exceptions import ApiError
+from fnt_auto.models.api import QueryPage
+from fnt_auto.models.serialization import type_adapter
+
+
+if typing.TYPE_CHECKING:
+    from fnt_auto._async_api.base import AsyncBaseAPI
+
+
+logger = logging.getLogger(__package__)
+
+RowT = typing.TypeVar('RowT')
+
+DEFAULT_PAGE_SIZE = 500
+ELID_ATTRIBUTE = 'elid'
+
+
+class QueryIterator(typing.Generic[RowT]):
+    """Async iterator over the results of an FNT REST query, fetched in pages.
+
+    FNT queries have no offset/limit, so paging is keyset based: one query lists the elids matching `restrictions`,
+    then pages of `page_size` elids are fetched with an `in` restriction. While a page is consumed, up to
+    `prefetch` following pages (default: `concurrency`) are already requested, at most `concurrency` at a time.
+    Full rows in memory are thus bounded by `(1 + prefetch) * page_size`, but the elid listing is one unpaged
+    request and is held whole, so it still grows with the result size (`total` elids). Rows come out in elid order.
+    With `page_size=None` the whole result is read in a single request instead.
+    """
+
+    def __init__(
+        self,
+        api: 'AsyncBaseAPI',
+        entity: str,
+        restrictions: typing.Mapping[str, typing.Any],
+        *,
+        model: typing.Any = None,
+        return_attributes: typing.Union[typing.List[str], None] = None,
+        page_size: typing.Union[int, None] = DEFAULT_PAGE_SIZE,
+        prefetch: typing.Union[int, None] = None,
+        concurrency: int = 1,
+        session_id: typing.Union[str, None] = None,
+    ) -> None:
+        if page_size is not None and page_size < 1:
+            msg = f'page_size must be at least 1, got {page_size}'
+            raise ValueError(msg)
+        if concurrency < 1:
+            msg = f'concurrency must be at least 1, got {concurrency}'
+            raise ValueError(msg)
+        self._api = api
+        self.entity = entity
+        self.restrictions = dict(restrictions)
+        self.return_attributes = return_attributes
+        self.page_size = page_size
+        self.concurrency = concurrency
+        self.prefetch = concurrency if prefetch is None else prefetch
+        self._session_id = session_id
+        row_type: typing.Any = model if model is not None else typing.Dict[str, typing.Any]
+        self._adapter = type_adapter(QueryPage[row_type])
+        self._limiter = asyncio.Semaphore(concurrency)
+        self._started = False
+        self.total: typing.Union[int, None] = None
+        self.pages = 0
+
+    def __aiter__(self) -> typing.AsyncIterator[RowT]:
+        if self._started:
+            msg = 'QueryIterator can only be iterated once'
+            raise RuntimeError(msg)
+        self._started = True
+        return self._run()
+
+    async def collect(self) -> typing.List[RowT]:
+        return [row async for row in self]
+
+    async def _run(self) -> typing.AsyncIterator[RowT]:
+        if self.page_size is None:
+            for row in await self._fetch(self.restrictions, self.return_attributes):
+                yield row
+            return
+
+        elids = await self._list_elids()
+        self.total = len(elids)
+        chunks = iter([elids[start : start + self.page_size] for start in range(0, len(elids), self.page_size)])
+        window: typing.Deque['asyncio.Future[typing.List[RowT]]'] = deque()
+        try:
+            while True:
+                while len(window) <= self.prefetch:
+                    chunk = next(chunks, None)
+                    if chunk is None:
+                        break
+                    window.append(asyncio.ensure_future(self._fetch_page(chunk)))
+                if not window:
+                    break
+                for row in await window.popleft():
+                    yield row
+        finally:
+            for task in window:
+                task.cancel()
+            if window:
+                await asyncio.gather(*window, return_exceptions=True)
+
+    async def _list_elids(self) -> typing.List[str]:
+        # The gateway has no way to page this listing either; only the elid attribute is returned, to keep it small
+        rows = await self._fetch(self.restrictions, [ELID_ATTRIBUTE], typing.Dict[str, typing.Any])
+        # Sorted, so pages and their order do not depend on how the gateway happened to return the rows
+        return sorted({row[ELID_ATTRIBUTE] for row in rows if row.get(ELID_ATTRIBUTE)})
+
+    async def _fetch_page(self, elids: typing.List[str]) -> typing.List[RowT]:
+        async with self._limiter:
+            rows = await self._fetch({ELID_ATTRIBUTE: {'operator': 'in', 'value': elids}}, self.return_attributes)
+        self.pages += 1
+        return rows
+
+    async def _fetch(
+        self,
+        restrictions: typing.Mapping[str, typing.Any],
+        return_attributes: typing.Union[typing.List[str], None],
+        row_type: typing.Any = None,
+    ) -> typing.List[typing.Any]:
+        payload: typing.Dict[str, typing.Any] = {'restrictions': restrictions}
+        if return_attributes:
+            payload['returnAttributes'] = return_attributes
+        response = await self._api._rest_exchange(self.entity, 'query', payload, session_id=self._session_id)
+        if not response.is_success:
+            error = _core.parse_rest_response(response, self.entity, 'query')
+            msg = f'Failed to query {self.entity}: {error.message}'
+            raise ApiError(msg)
+        adapter = self._adapter if row_type is None else type_adapter(QueryPage[row_type])
+        try:
+            page = adapter.validate_json(response.content)
+        except ValidationError as exc:
+            msg = f'Unexpected {self.entity} query response: {exc}'
+            raise ApiError(msg) from exc
+        return page.return_data or []
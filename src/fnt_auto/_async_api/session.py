@@ -0,0 +1,74 @@
+import asyncio
+import logging
+import typing
+
+from fnt_auto._common.session import SessionSlot
+
+
+logger = logging.getLogger(__package__)
+
+
+class _SessionSlot(SessionSlot):
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock: typing.Union[asyncio.Lock, None] = None
+
+    @property
+    def lock(self) -> asyncio.Lock:
+        # Created on first use so the lock binds to the running loop
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+
+class SessionPool:
+    """A fixed number of gateway sessions handed out round-robin.
+
+    Each slot logs in lazily on first use; concurrent callers waiting on the same slot share a single login, and a
+    renewal is skipped when another caller already replaced the stale session.
+    """
+
+    def __init__(self, login: typing.Callable[[], typing.Awaitable[typing.Union[str, None]]], size: int = 1) -> None:
+        if size < 1:
+            msg = f'session pool size must be at least 1, got {size}'
+            raise ValueError(msg)
+        self._login = login
+        self._slots = [_SessionSlot() for _ in range(size)]
+        self._next = 0
+
+    @property
+    def sessions(self) -> typing.List[str]:
+        return [slot.session_id for slot in self._slots if slot.session_id is not None]
+
+    def adopt(self, session_id: str) -> None:
+        for slot in self._slots:
+            if slot.session_id is None:
+                slot.session_id = session_id
+                return
+
+    async def acquire(self) -> str:
+        slot = self._slots[self._next]
+        self._next = (self._next + 1) % len(self._slots)
+        if slot.session_id is not None:
+            return slot.session_id
+        return await self._renew(slot, None)
+
+    async def renew(self, stale_session_id: str) -> str:
+        for slot in self._slots:
+            if slot.session_id == stale_session_id:
+                return await self._renew(slot, stale_session_id)
+        # Already replaced by a concurrent renewal
+        return await self.acquire()
+
+    def clear(self) -> typing.List[str]:
+        sessions = self.sessions
+        for slot in self._slots:
+            slot.session_id = None
+        return sessions
+
+    async def _renew(self, slot: _SessionSlot, stale_session_id: typing.Union[str, None]) -> str:
+        async with slot.lock:
+            session_id = slot.reusable(stale_session_id)
+            if session_id is not None:
+                return session_id
+            return slot.store(await self._login())
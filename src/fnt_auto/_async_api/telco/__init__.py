@@ -0,0 +1,4 @@
+from fnt_auto._async_api.telco.path import PathAPI
+
+class TelcoAPI(PathAPI):
+    pass
@@ -0,0 +1,147 @@
+import asyncio
+import functools
+import logging
+from typing import Hashable, Iterable, List, Optional, Union, overload
+
+from fnt_auto._async_api.bulk import DEFAULT_CONCURRENCY, BulkJob, BulkStats
+from fnt_auto._async_api.journal import JobJournal, JournaledBulkJob
+from fnt_auto._async_api.telco.service import ServiceAPI
+from fnt_auto.exceptions import ApiError, RouteMissing
+from fnt_auto.models.api import RestResponse
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.models.dag import DependencyGraph
+from fnt_auto.models.telco.service.path import PathCreate
+
+
+logger = logging.getLogger(__package__)
+
+
+def path_key(path: PathCreate) -> Union[Hashable, None]:
+    # A hop refers to another path of the same batch by that path's id (or visible id)
+    return path.id or path.visible_id
+
+
+def route_graph(paths: Iterable[PathCreate]) -> 'DependencyGraph[PathCreate]':
+    return DependencyGraph(paths, key=path_key, references=lambda path: [hop.ser_elid for hop in path.route])
+
+
+class PathAPI(ServiceAPI):
+
+    async def enrich_paths(self, paths: Iterable[PathCreate]) -> List[PathCreate]:
+        """Resolve the type master data and routed services of a batch of paths with one lookup per kind.
+
+        Paths that cannot be resolved are marked FAILED; the enriched ones are returned.
+        """
+        paths = list(paths)
+        types = {path.type for path in paths}
+        ser_elids = {hop.ser_elid for path in paths for hop in path.route}
+        master_data, (route_info, err) = await asyncio.gather(
+            self.type_master_data.get_many(types), self.get_services_infos(ser_elids)
+        )
+        if err:
+            logger.error(err)
+            raise ApiError(err)
+        enriched = []
+        for path in paths:
+            try:
+                path.apply_lookups(master_data[path.type], route_info)  # type: ignore[arg-type]
+            except (ValueError, RouteMissing) as exc:
+                logger.error(exc)
+                path.status = ItemStatusOpt.FAILED
+            else:
+                enriched.append(path)
+        return enriched
+
+    async def create_path(self, path: PathCreate, session_id: Optional[str] = None) -> 'RestResponse':
+        if path.master_data is None:
+            await self.enrich_paths([path])
+        if path.rest_entity is None or path.rest_operation is None:
+            path.rest_response = RestResponse(
+                status_code=400, message=f'Unsupported service type [{path.type}] for path creation'
+            )
+            return path.rest_response  # type: ignore[return-value]
+        path.rest_response = await self.rest_request(
+            path.rest_entity, path.rest_operation, path.to_rest_request_bytes(), session_id=session_id
+        )
+        return path.rest_response  # type: ignore[return-value]
+
+    @overload
+    async def create_paths(
+        self,
+        paths: Iterable[PathCreate],
+        concurrency: int = ...,
+        session_id: Optional[str] = ...,
+        journal: None = ...,
+    ) -> 'BulkJob[PathCreate]': ...
+
+    @overload
+    async def create_paths(
+        self,
+        paths: Iterable[PathCreate],
+        concurrency: int = ...,
+        session_id: Optional[str] = ...,
+        *,
+        journal: JobJournal,
+    ) -> 'JournaledBulkJob[PathCreate]': ...
+
+    async def create_paths(
+        self,
+        paths: Iterable[PathCreate],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_id: Optional[str] = None,
+        journal: Optional[JobJournal] = None,
+    ) -> 'BulkJob[PathCreate]':
+        enriched = await self.enrich_paths(paths)
+        handler = functools.partial(self.create_path, session_id=session_id)
+        if journal is not None:
+            return JournaledBulkJob(enriched, handler, journal, concurrency)
+        return BulkJob(enriched, handler, concurrency)
+
+    async def provision_paths(
+        self,
+        paths: Iterable[PathCreate],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_id: Optional[str] = None,
+    ) -> BulkStats:
+        """Create a batch of paths whose routes may run over other paths of the same batch.
+
+        Paths are created level by level of the route dependency graph, each level in parallel. Hops that refer to a
+        path of the batch get that path's new elid, and paths depending on a path that was not created are SKIPPED.
+
+        Only paths are scheduled: the package has no create model for bearers or other services, so every hop that
+        does not refer to a path of the batch must name a service that already exists in FNT.
+        """
+        graph = route_graph(paths)
+        stats = BulkStats()
+        stats.start()
+        for level, indices in enumerate(graph.level_indices()):
+            ready = []
+            for index in indices:
+                path = graph.items[index]
+                parents = graph.parents(index)
+                if any(parent.elid is None for parent in parents):
+                    logger.error('Skipping path %s, a path it is routed over was not created', path_key(path))
+                    path.status = ItemStatusOpt.SKIPPED
+                    stats.add(path.status)
+                    continue
+                for hop in path.route:
+                    parent = graph.get(hop.ser_elid)
+                    if parent is not None and parent is not path:
+                        hop.ser_elid = parent.elid  # type: ignore[assignment]
+                ready.append(path)
+            logger.info('Provisioning level %d: %d paths', level, len(ready))
+            try:
+                enriched = await self.enrich_paths(ready)
+            except ApiError:
+                enriched = []
+                for path in ready:
+                    path.status = ItemStatusOpt.FAILED
+            for path in ready:
+                if path.status == ItemStatusOpt.FAILED:
+                    stats.add(path.status)
+            job = BulkJob(enriched, functools.partial(self.create_path, session_id=session_id), concurrency)
+            async for path in job:
+                stats.add(path.status)
+        stats.finish()
+        logger.info('Path provisioning finished: %r', stats)
+        return stats
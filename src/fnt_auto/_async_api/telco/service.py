@@ -0,0 +1,69 @@
+import logging
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Tuple, Union
+
+from fnt_auto._async_api.base import AsyncBaseAPI
+from fnt_auto._async_api.cache import CachedLookup
+from fnt_auto.exceptions import ApiError
+
+
+logger = logging.getLogger(__package__)
+
+SERVICE_ENTITY = 'serviceTelco'
+SERVICE_TYPE_ENTITY = 'serviceTelcoTypeDefinition'
+TYPE_MASTER_DATA_ATTRIBUTES = ['elid', 'name', 'serviceCategory', 'transmissionTechnology']
+# Service types change far less often than services, so they are kept for a day
+TYPE_MASTER_DATA_TTL = 24 * 60 * 60.0
+
+ServiceInfos = Dict[str, List[Dict[str, Any]]]
+
+
+class ServiceAPI(AsyncBaseAPI):
+    _type_master_data: Optional[CachedLookup[str, Dict[str, Any]]] = None
+    _service_infos: Optional[CachedLookup[str, List[Dict[str, Any]]]] = None
+
+    @property
+    def type_master_data(self) -> CachedLookup[str, Dict[str, Any]]:
+        if self._type_master_data is None:
+            self._type_master_data = self.create_lookup(
+                'type_master_data', self._load_type_master_data, ttl=TYPE_MASTER_DATA_TTL
+            )
+        return self._type_master_data
+
+    @property
+    def service_infos(self) -> CachedLookup[str, List[Dict[str, Any]]]:
+        if self._service_infos is None:
+            self._service_infos = self.create_lookup('service_infos', self._load_service_infos)
+        return self._service_infos
+
+    async def get_type_master_data(self, type_name: str) -> Optional[Dict[str, Any]]:
+        return await self.type_master_data.get(type_name)
+
+    async def get_services_infos(
+        self, elids: Iterable[str]
+    ) -> Union[Tuple[ServiceInfos, None], Tuple[None, str]]:
+        try:
+            infos = await self.service_infos.get_many(elids)
+        except ApiError as exc:
+            return None, str(exc)
+        return {elid: info for elid, info in infos.items() if info is not None}, None
+
+    async def query_entities(
+        self, entity: str, restrictions: Mapping[str, Any], return_attributes: Optional[List[str]] = None
+    ) -> List[Dict[str, Any]]:
+        return await self.query(entity, restrictions, return_attributes=return_attributes, page_size=None).collect()
+
+    async def _load_type_master_data(self, type_names: List[str]) -> Dict[str, Dict[str, Any]]:
+        rows = await self.query_entities(
+            SERVICE_TYPE_ENTITY,
+            {'name': {'operator': 'in', 'value': type_names}},
+            return_attributes=TYPE_MASTER_DATA_ATTRIBUTES,
+        )
+        return {row['name']: row for row in rows}
+
+    async def _load_service_infos(self, elids: List[str]) -> ServiceInfos:
+        rows = await self.query_entities(SERVICE_ENTITY, {'elid': {'operator': 'in', 'value': elids}})
+        infos: ServiceInfos = defaultdict(list)
+        for row in rows:
+            infos[row['elid']].append(row)
+        return infos
@@ -0,0 +1 @@
+"""Building blocks shared by the async and sync clients, free of any I/O or event loop."""
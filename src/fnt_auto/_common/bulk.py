@@ -0,0 +1,62 @@
+import logging
+import time
+import typing
+from collections import Counter
+
+from fnt_auto.models.base import ItemAction, ItemStatusOpt
+
+
+logger = logging.getLogger(__package__)
+
+ItemT = typing.TypeVar('ItemT', bound=ItemAction)
+
+DEFAULT_CONCURRENCY = 10
+
+
+class BulkStats:
+    def __init__(self) -> None:
+        self.statuses: typing.Counter[ItemStatusOpt] = Counter()
+        self._started_at: typing.Union[float, None] = None
+        self._finished_at: typing.Union[float, None] = None
+
+    def start(self) -> None:
+        self._started_at = time.perf_counter()
+
+    def finish(self) -> None:
+        self._finished_at = time.perf_counter()
+
+    def add(self, status: ItemStatusOpt) -> None:
+        self.statuses[status] += 1
+
+    @property
+    def total(self) -> int:
+        return sum(self.statuses.values())
+
+    @property
+    def elapsed(self) -> float:
+        if self._started_at is None:
+            return 0.0
+        return (self._finished_at or time.perf_counter()) - self._started_at
+
+    @property
+    def throughput(self) -> float:
+        elapsed = self.elapsed
+        return self.total / elapsed if elapsed > 0 else 0.0
+
+    def __repr__(self) -> str:
+        statuses = ', '.join(f'{status.name}={count}' for status, count in self.statuses.items())
+        return (
+            f'{type(self).__name__}(total={self.total}, {statuses}, '
+            f'elapsed={self.elapsed:.2f}s, throughput={self.throughput:.1f}/s)'
+        )
+
+
+def settle(item: ItemT, error: typing.Union[BaseException, None] = None) -> ItemT:
+    """Final status of a bulk item once its handler returned or raised `error`."""
+    if error is not None:
+        # One broken item must not abort the whole batch
+        logger.error('Bulk item failed: %r', item, exc_info=error)
+        item.status = ItemStatusOpt.FAILED
+    if item.status == ItemStatusOpt.INIT:
+        item.status = ItemStatusOpt.FAILED
+    return item
@@ -0,0 +1,277 @@
+import asyncio
+import contextlib
+import logging
+import random
+import threading
+import time
+import typing
+
+import httpx
+
+
+logger = logging.getLogger(__package__)
+
+IDEMPOTENT_OPERATIONS = frozenset({'query', 'get', 'update'})
+
+
+def is_idempotent(operation: str) -> bool:
+    return operation in IDEMPOTENT_OPERATIONS or operation.startswith(('query', 'get'))
+
+
+class RetryPolicy:
+    # Errors raised before the request could reach the server, safe to retry for any operation
+    _unsent_errors = (httpx.ConnectError, httpx.ConnectTimeout, httpx.PoolTimeout)
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        jitter: bool = True,
+        retry_statuses: typing.Collection[int] = (429, 502, 503, 504),
+        unsafe_retry_statuses: typing.Collection[int] = (429, 503),
+    ) -> None:
+        if max_attempts < 1:
+            msg = f'max_attempts must be at least 1, got {max_attempts}'
+            raise ValueError(msg)
+        self.max_attempts = max_attempts
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        # Statuses that mean the server rejected the request without processing it
+        self.unsafe_retry_statuses = frozenset(unsafe_retry_statuses)
+
+    def should_retry(
+        self,
+        attempt: int,
+        *,
+        idempotent: bool,
+        response: typing.Union[httpx.Response, None] = None,
+        error: typing.Union[Exception, None] = None,
+    ) -> bool:
+        if attempt >= self.max_attempts:
+            return False
+        if error is not None:
+            return isinstance(error, self._unsent_errors) or (idempotent and isinstance(error, httpx.TransportError))
+        if response is None:
+            return False
+        if idempotent:
+            return response.status_code in self.retry_statuses
+        return response.status_code in self.unsafe_retry_statuses
+
+    def backoff(self, attempt: int, response: typing.Union[httpx.Response, None] = None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after is not None and retry_after.isdigit():
+            return min(float(retry_after), self.backoff_max)
+        delay = min(self.backoff_base * 2 ** (attempt - 1), self.backoff_max)
+        if self.jitter:
+            # Full jitter spreads out clients that failed together
+            delay = random.uniform(0, delay)  # noqa: S311
+        return delay
+
+
+class TokenBucket:
+    """Request rate limit shared by every request of a client, async or blocking."""
+
+    def __init__(self, rate: float, burst: typing.Union[int, None] = None) -> None:
+        if rate <= 0:
+            msg = f'rate must be positive, got {rate}'
+            raise ValueError(msg)
+        self.rate = rate
+        self.burst = burst or max(1, int(rate))
+        self._tokens = float(self.burst)
+        self._updated_at = time.monotonic()
+        self._state_lock = threading.Lock()
+        self._lock: typing.Union[asyncio.Lock, None] = None
+
+    def _reserve(self) -> float:
+        # Takes a token when one is available, otherwise returns how long until the next one is
+        with self._state_lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated_at) * self.rate)
+            self._updated_at = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    async def acquire(self) -> None:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Waiting tasks queue on the lock, so tokens go out in arrival order
+        async with self._lock:
+            delay = self._reserve()
+            while delay > 0:
+                await asyncio.sleep(delay)
+                delay = self._reserve()
+
+    def acquire_blocking(self) -> None:
+        delay = self._reserve()
+        while delay > 0:
+            time.sleep(delay)
+            delay = self._reserve()
+
+
+class AdaptiveLimiter:
+    """AIMD concurrency limit driven by request latency and errors.
+
+    The limit grows by roughly one slot per limit-worth of healthy responses and is cut by `decrease_factor` when a
+    request fails or recent latency exceeds `latency_target` (by default `latency_tolerance` times the long-run
+    average latency). Cuts are spaced by at least one typical round-trip so a burst of failures counts once.
+    """
+
+    def __init__(
+        self,
+        initial_limit: int = 10,
+        min_limit: int = 1,
+        max_limit: int = 100,
+        latency_target: typing.Union[float, None] = None,
+        latency_tolerance: float = 2.0,
+        decrease_factor: float = 0.7,
+    ) -> None:
+        if not min_limit <= initial_limit <= max_limit:
+            msg = f'expected min_limit <= initial_limit <= max_limit, got {min_limit}, {initial_limit}, {max_limit}'
+            raise ValueError(msg)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.latency_target = latency_target
+        self.latency_tolerance = latency_tolerance
+        self.decrease_factor = decrease_factor
+        self._limit = float(initial_limit)
+        self._in_flight = 0
+        # Slow and fast moving averages of healthy response latency
+        self._baseline_latency: typing.Union[float, None] = None
+        self._recent_latency: typing.Union[float, None] = None
+        self._samples = 0
+        self._warmup_samples = 20
+        self._last_decrease = 0.0
+        self._state_lock = threading.Lock()
+        self._condition: typing.Union[asyncio.Condition, None] = None
+        self._thread_condition = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    @contextlib.asynccontextmanager
+    async def slot(self) -> typing.AsyncIterator['AdaptiveLimiter']:
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        async with self._condition:
+            await self._condition.wait_for(self._take_slot)
+        try:
+            yield self
+        finally:
+            self._release_slot()
+            async with self._condition:
+                self._condition.notify_all()
+
+    @contextlib.contextmanager
+    def slot_blocking(self) -> typing.Iterator['AdaptiveLimiter']:
+        with self._thread_condition:
+            self._thread_condition.wait_for(self._take_slot)
+        try:
+            yield self
+        finally:
+            self._release_slot()
+            with self._thread_condition:
+                self._thread_condition.notify_all()
+
+    def _take_slot(self) -> bool:
+        with self._state_lock:
+            if self._in_flight >= self.limit:
+                return False
+            self._in_flight += 1
+            return True
+
+    def _release_slot(self) -> None:
+        with self._state_lock:
+            self._in_flight -= 1
+
+    def record_response(self, latency: float, response: typing.Union[httpx.Response, None]) -> None:
+        # None: the request raised a transport error
+        failed = response is None or response.status_code == httpx.codes.TOO_MANY_REQUESTS or response.is_server_error
+        self.record(latency, failed=failed)
+
+    def record(self, latency: float, *, failed: bool) -> None:
+        with self._state_lock:
+            self._record(latency, failed=failed)
+
+    def _record(self, latency: float, *, failed: bool) -> None:
+        # Failed requests often return instantly and would skew the latency baseline
+        if not failed:
+            self._samples += 1
+            if self._baseline_latency is None or self._recent_latency is None:
+                self._baseline_latency = self._recent_latency = latency
+            else:
+                self._baseline_latency += 0.01 * (latency - self._baseline_latency)
+                self._recent_latency += 0.2 * (latency - self._recent_latency)
+        if failed or self._is_slow():
+            now = time.monotonic()
+            if now - self._last_decrease >= (self._recent_latency or latency):
+                self._last_decrease = now
+                self._limit = max(self.min_limit, self._limit * self.decrease_factor)
+                logger.debug('Concurrency limit decreased to %d', self.limit)
+        else:
+            self._limit = min(self.max_limit, self._limit + 1 / self._limit)
+
+    def _is_slow(self) -> bool:
+        if self._recent_latency is None or self._baseline_latency is None:
+            return False
+        if self.latency_target is not None:
+            return self._recent_latency > self.latency_target
+        if self._samples < self._warmup_samples:
+            return False
+        return self._recent_latency > self._baseline_latency * self.latency_tolerance
+
+
+class RequestScheduler:
+    """Retry policy, rate limit and adaptive concurrency limit applied to every request of a client.
+
+    The retry loop itself is `fnt_auto._core.send`; the scheduler only sends single attempts, awaited or blocking.
+    """
+
+    def __init__(
+        self,
+        retry: typing.Union[RetryPolicy, None] = None,
+        rate_limiter: typing.Union[TokenBucket, None] = None,
+        limiter: typing.Union[AdaptiveLimiter, None] = None,
+    ) -> None:
+        self.retry = retry or RetryPolicy()
+        self.rate_limiter = rate_limiter
+        self.limiter = limiter
+
+    async def send(self, send: typing.Callable[[], typing.Awaitable[httpx.Response]]) -> httpx.Response:
+        if self.rate_limiter is not None:
+            await self.rate_limiter.acquire()
+        if self.limiter is None:
+            return await send()
+        async with self.limiter.slot():
+            started = time.perf_counter()
+            try:
+                response = await send()
+            except httpx.TransportError:
+                self.limiter.record_response(time.perf_counter() - started, None)
+                raise
+            self.limiter.record_response(time.perf_counter() - started, response)
+            return response
+
+    def send_blocking(self, send: typing.Callable[[], httpx.Response]) -> httpx.Response:
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire_blocking()
+        if self.limiter is None:
+            return send()
+        with self.limiter.slot_blocking():
+            started = time.perf_counter()
+            try:
+                response = send()
+            except httpx.TransportError:
+                self.limiter.record_response(time.perf_counter() - started, None)
+                raise
+            self.limiter.record_response(time.perf_counter() - started, response)
+            return response
@@ -0,0 +1,28 @@
+import logging
+import typing
+
+from fnt_auto.exceptions import AuthenticationError
+
+
+logger = logging.getLogger(__package__)
+
+
+class SessionSlot:
+    """One gateway session, and whether a caller holding the slot's lock still has to log in to use it."""
+
+    def __init__(self) -> None:
+        self.session_id: typing.Union[str, None] = None
+
+    def reusable(self, stale_session_id: typing.Union[str, None] = None) -> typing.Union[str, None]:
+        # Another caller may have replaced the stale session while this one waited for the lock
+        if self.session_id is not None and self.session_id != stale_session_id:
+            return self.session_id
+        logger.info('Opening new gateway session')
+        return None
+
+    def store(self, session_id: typing.Union[str, None]) -> str:
+        if session_id is None:
+            msg = 'Failed to login to FNT business gateway'
+            raise AuthenticationError(msg)
+        self.session_id = session_id
+        return session_id
@@ -0,0 +1,160 @@
+import functools
+import logging
+import string
+import typing
+from xml.etree.ElementTree import ParseError, XMLPullParser
+from xml.sax.saxutils import escape
+
+from fnt_auto.models.api import SoapResponse
+from fnt_auto.models.base import ItemAction, ItemStatusOpt
+
+
+logger = logging.getLogger(__package__)
+
+SESSION_FIELD = 'sid'
+_XML_ENTITIES = {'"': '&quot;', "'": '&apos;'}
+
+
+def _local_name(tag: str) -> str:
+    return tag.rpartition('}')[2]
+
+
+class SoapTemplate:
+    """A SOAP envelope split once into literal byte chunks and `{name}` placeholders.
+
+    `render` only joins the chunks with the XML-escaped parameters; `{sid}` is always filled with the gateway session.
+    Literal braces are written `{{` and `}}` as with `str.format`.
+    """
+
+    def __init__(self, template: str) -> None:
+        self.template = template
+        self._literals: typing.List[bytes] = []
+        self._fields: typing.List[typing.Union[str, None]] = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(template):
+            if field is not None and (not field.isidentifier() or format_spec or conversion):
+                msg = f'Unsupported SOAP template placeholder {{{field}}}, only plain names are allowed'
+                raise ValueError(msg)
+            self._literals.append(literal.encode('utf-8'))
+            self._fields.append(field)
+
+    @property
+    def fields(self) -> typing.FrozenSet[str]:
+        return frozenset(field for field in self._fields if field is not None and field != SESSION_FIELD)
+
+    def render(self, session_id: str, params: typing.Union[typing.Mapping[str, typing.Any], None] = None) -> bytes:
+        params = params or {}
+        chunks: typing.List[bytes] = []
+        for literal, field in zip(self._literals, self._fields):
+            chunks.append(literal)
+            if field is None:
+                continue
+            if field == SESSION_FIELD:
+                value: typing.Any = session_id
+            elif field in params:
+                value = params[field]
+            else:
+                msg = f'Missing SOAP template parameter: {field}'
+                raise KeyError(msg)
+            chunks.append(escape(str(value), _XML_ENTITIES).encode('utf-8'))
+        return b''.join(chunks)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_template(template: str) -> SoapTemplate:
+    return SoapTemplate(template)
+
+
+class SoapResponseParser:
+    """Incremental SOAP response parser, fed with body chunks as they arrive.
+
+    Leaf elements are released as soon as they are read, so large responses are never held as a tree.
+    """
+
+    def __init__(self, status_code: int) -> None:
+        self.status_code = status_code
+        self.received = 0
+        self._parser = XMLPullParser(events=('start', 'end'))
+        self._in_body = False
+        self._in_fault = False
+        self._values: typing.Dict[str, typing.Any] = {}
+        self._fault: typing.Dict[str, str] = {}
+        self._message: typing.Union[str, None] = None
+        self._error: typing.Union[str, None] = None
+
+    def feed(self, chunk: bytes) -> None:
+        self.received += len(chunk)
+        if self._error is not None:
+            return
+        try:
+            self._parser.feed(chunk)
+            self._consume()
+        except ParseError as exc:
+            self._error = f'Invalid SOAP response: {exc}'
+
+    def close(self) -> SoapResponse:
+        if self._error is None:
+            try:
+                self._parser.close()
+                self._consume()
+            except ParseError as exc:
+                self._error = f'Invalid SOAP response: {exc}'
+        message = self._message or self._fault.get('faultstring')
+        # An error page that is not a SOAP envelope is reported by its status rather than as a parse error
+        if message is None and not 200 <= self.status_code < 300:  # noqa: PLR2004
+            message = f'SOAP request failed with status {self.status_code}'
+        if message is None and self._error is not None:
+            message = self._error
+        return SoapResponse(
+            status_code=self.status_code, message=message, fault_code=self._fault.get('faultcode'), values=self._values
+        )
+
+    def _consume(self) -> None:
+        for event, element in self._parser.read_events():
+            name = _local_name(element.tag)
+            if event == 'start':
+                if name == 'Body':
+                    self._in_body = True
+                elif name == 'Fault':
+                    self._in_fault = True
+                continue
+            if name == 'Body':
+                self._in_body = False
+            elif name == 'Fault':
+                self._in_fault = False
+            elif len(element) == 0 and self._in_body:
+                self._leaf(name, (element.text or '').strip())
+            element.clear()
+
+    def _leaf(self, name: str, text: str) -> None:
+        if name == 'exception_msgtxt':
+            self._message = text
+        elif self._in_fault:
+            self._fault[name] = text
+        elif name in self._values:
+            current = self._values[name]
+            if isinstance(current, list):
+                current.append(text)
+            else:
+                self._values[name] = [current, text]
+        else:
+            self._values[name] = text
+
+
+def parse_soap_response(content: bytes, status_code: int = 200) -> SoapResponse:
+    parser = SoapResponseParser(status_code)
+    parser.feed(content)
+    return parser.close()
+
+
+class SoapCall(ItemAction):
+    params: typing.Dict[str, typing.Any] = {}
+    _response: typing.Union[SoapResponse, None] = None
+
+    @property
+    def response(self) -> typing.Union[SoapResponse, None]:
+        return self._response
+
+    @response.setter
+    def response(self, value: SoapResponse) -> None:
+        self._response = value
+        self.status = ItemStatusOpt.SUCCESS if value.ok else ItemStatusOpt.FAILED
@@ -0,0 +1,308 @@
+"""Request building, response parsing and request flows shared by the async and sync clients; no I/O happens here."""
+import logging
+import typing
+
+import httpx
+
+from fnt_auto._common.scheduler import RequestScheduler, is_idempotent
+from fnt_auto._common.soap import SoapResponseParser, SoapTemplate, compile_template
+from fnt_auto.instrumentation import Instrumentation, PayloadLog
+from fnt_auto.models.api import Login, RestResponse, SoapResponse
+from fnt_auto.models.serialization import JSON_CONTENT_TYPE, dumps, loads
+
+
+logger = logging.getLogger(__package__)
+
+LOGIN_URL = '/axis/api/rest/businessGateway/login'
+LOGOUT_URL = '/axis/api/rest/businessGateway/logout'
+REST_URL = '/axis/api/rest/entity'
+SOAP_URL = '/axis/services'
+
+DEFAULT_MAX_CONNECTIONS = 100
+DEFAULT_MAX_KEEPALIVE_CONNECTIONS = 20
+DEFAULT_KEEPALIVE_EXPIRY = 30.0
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CONNECT_TIMEOUT = 10.0
+
+ErrorReponse = typing.Tuple[None, str]
+SuccessReponse = typing.Tuple[typing.Dict[str, typing.Any], None]
+
+ResponseType = typing.Union[ErrorReponse, SuccessReponse]
+
+_T = typing.TypeVar('_T')
+
+_JSON_HEADERS = {'Content-Type': JSON_CONTENT_TYPE}
+_EXPIRED_MARKERS = ('expired', 'invalid', 'not valid', 'timed out', 'timeout', 'unknown')
+
+
+class RequestSpec(typing.NamedTuple):
+    method: str
+    url: str
+    params: typing.Union[typing.Dict[str, str], None] = None
+    content: typing.Union[bytes, None] = None
+    headers: typing.Union[typing.Dict[str, str], None] = None
+
+    def build(self, client: typing.Union[httpx.Client, httpx.AsyncClient]) -> httpx.Request:
+        return client.build_request(
+            self.method, self.url, params=self.params, content=self.content, headers=self.headers
+        )
+
+
+def encode_body(data: typing.Any) -> bytes:
+    # Pre-encoded bodies (e.g. ItemAction.to_rest_request_bytes) are sent as they are
+    if isinstance(data, (bytes, bytearray)):
+        return bytes(data)
+    return dumps(data)
+
+
+def login_request(username: str, password: str) -> RequestSpec:
+    payload = Login(user=username, password=password).model_dump(by_alias=True)
+    return RequestSpec('POST', LOGIN_URL, content=dumps(payload), headers=_JSON_HEADERS)
+
+
+def parse_login(response: httpx.Response) -> typing.Union[str, None]:
+    if response.is_success:
+        return response.json()['sessionId']
+    logger.error(response.json())
+    return None
+
+
+def logout_request(session_id: str) -> RequestSpec:
+    return RequestSpec('POST', LOGOUT_URL, params={'sessionId': session_id})
+
+
+def parse_logout(response: httpx.Response) -> typing.Any:
+    if not response.is_success:
+        logger.error(response.json())
+    return response.json()
+
+
+def rest_request(entity: str, operation: str, content: bytes, session_id: str) -> RequestSpec:
+    return RequestSpec(
+        'POST',
+        f'{REST_URL}/{entity}/{operation}',
+        params={'sessionId': session_id},
+        content=content,
+        headers=_JSON_HEADERS,
+    )
+
+
+def rest_elid_request(entity: str, elid: str, operation: str, content: bytes, session_id: str) -> RequestSpec:
+    return RequestSpec(
+        'POST',
+        f'{REST_URL}/{entity}/{elid}/{operation}',
+        params={'sessionId': session_id},
+        content=content,
+        headers=_JSON_HEADERS,
+    )
+
+
+def soap_request(operation: str, content: bytes) -> RequestSpec:
+    url = f'{SOAP_URL}/{operation}'
+    return RequestSpec('POST', url, content=content, headers={'Content-Type': 'text/xml', 'SOAPAction': url})
+
+
+def is_session_expired(response: httpx.Response) -> bool:
+    if response.status_code == httpx.codes.UNAUTHORIZED:
+        return True
+    # SOAP faults come back as 200 with the exception embedded in the envelope, and a 403 is a permission error
+    # unless its body says the session is gone
+    if response.is_success and b'exception_msgtxt' not in response.content:
+        return False
+    return is_session_error(response.text)
+
+
+def is_session_error(message: typing.Union[str, None]) -> bool:
+    if not message:
+        return False
+    text = message.lower()
+    return 'session' in text and any(marker in text for marker in _EXPIRED_MARKERS)
+
+
+def is_soap_session_expired(response: SoapResponse) -> bool:
+    return response.status_code == httpx.codes.UNAUTHORIZED or is_session_error(response.message)
+
+
+def parse_rest_response(response: httpx.Response, entity: str, operation: str) -> RestResponse:
+    ret = RestResponse(status_code=response.status_code)
+    if response.is_success:
+        ret.data = loads(response.content).get('returnData')
+    else:
+        try:
+            ret.message = loads(response.content).get('status',{}).get('message')
+        except ValueError:
+            # Proxies and overloaded gateways answer with empty or non-JSON bodies
+            ret.message = response.text or response.reason_phrase
+        logger.error('Failed to %s %s: %s', operation, entity, ret.message)
+    return ret
+
+
+def parse_rest_elid_response(response: httpx.Response) -> ResponseType:
+    if response.is_success:
+        return loads(response.content), None
+    logger.error(response.text)
+    return None, response.text
+
+
+# Request flows
+#
+# Everything that happens between building a request and parsing its response (retries, session renewal, streamed
+# SOAP parsing, instrumentation) is written once, as generators that yield the I/O they need as the effects below
+# and are sent its result back. The async and sync clients only perform the effects (see their `_run`).
+
+
+class Send(typing.NamedTuple):
+    """Send one attempt of `request` through the client's scheduler; the result is the `httpx.Response`."""
+
+    request: RequestSpec
+    stream: bool = False
+
+
+class Close(typing.NamedTuple):
+    response: httpx.Response
+
+
+class Read(typing.NamedTuple):
+    """Feed the body of a streamed response to `sink` chunk by chunk, then close the response."""
+
+    response: httpx.Response
+    sink: typing.Callable[[bytes], None]
+
+
+class Sleep(typing.NamedTuple):
+    seconds: float
+
+
+class AcquireSession(typing.NamedTuple):
+    """A gateway session to send with; the result is its id."""
+
+
+class RenewSession(typing.NamedTuple):
+    """Replace the expired `stale` session; the result is the new session id."""
+
+    stale: str
+
+
+Effect = typing.Union[Send, Close, Read, Sleep, AcquireSession, RenewSession]
+Flow = typing.Generator[Effect, typing.Any, _T]
+
+
+def session_flow(
+    call: typing.Callable[[str], 'Flow[_T]'],
+    expired: typing.Callable[[_T], bool],
+    session_id: typing.Union[str, None] = None,
+) -> 'Flow[_T]':
+    # An explicit session id is the caller's responsibility and is never renewed
+    if session_id is not None:
+        return (yield from call(session_id))
+    session_id = yield AcquireSession()
+    result = yield from call(session_id)
+    if expired(result):
+        logger.info('Gateway session expired, logging in again')
+        result = yield from call((yield RenewSession(session_id)))
+    return result
+
+
+class RequestFlows:
+    """The request flows of a client, driven by its `_run`."""
+
+    _username: str
+    _password: str
+    _scheduler: RequestScheduler
+    instrumentation: Instrumentation
+    payload_log: PayloadLog
+
+    def _request_flow(
+        self,
+        request: RequestSpec,
+        *,
+        idempotent: bool,
+        on_retry: typing.Union[typing.Callable[[str], None], None] = None,
+        stream: bool = False,
+    ) -> 'Flow[httpx.Response]':
+        policy = self._scheduler.retry
+        attempt = 1
+        while True:
+            try:
+                response = yield Send(request, stream)
+            except httpx.TransportError as exc:
+                if not policy.should_retry(attempt, idempotent=idempotent, error=exc):
+                    raise
+                delay = policy.backoff(attempt)
+                logger.warning('Request failed (%s), retry %d in %.2fs', exc, attempt, delay)
+                reason = type(exc).__name__
+            else:
+                if not policy.should_retry(attempt, idempotent=idempotent, response=response):
+                    return response
+                delay = policy.backoff(attempt, response)
+                logger.warning('Request returned %d, retry %d in %.2fs', response.status_code, attempt, delay)
+                reason = f'http_{response.status_code}'
+                yield Close(response)
+            if on_retry is not None:
+                on_retry(reason)
+            yield Sleep(delay)
+            attempt += 1
+
+    def _login_flow(
+        self, username: typing.Union[str, None] = None, password: typing.Union[str, None] = None
+    ) -> 'Flow[typing.Union[str, None]]':
+        request = login_request(username or self._username, password or self._password)
+        return parse_login((yield from self._request_flow(request, idempotent=True)))
+
+    def _logout_flow(self, session_id: str) -> 'Flow[typing.Any]':
+        return parse_logout((yield from self._request_flow(logout_request(session_id), idempotent=True)))
+
+    def _rest_flow(
+        self,
+        entity: str,
+        operation: str,
+        data: typing.Any,
+        session_id: typing.Union[str, None] = None,
+        idempotent: typing.Union[bool, None] = None,
+        elid: typing.Union[str, None] = None,
+    ) -> 'Flow[httpx.Response]':
+        content = encode_body(data)
+        retry_safe = is_idempotent(operation) if idempotent is None else idempotent
+        # Payloads are logged at DEBUG for a sample of the requests, and only rendered when emitted
+        sampled = self.payload_log.request(entity, operation, content)
+        with self.instrumentation.request('rest', entity, operation, len(content)) as observation:
+
+            def call(sid: str) -> 'Flow[httpx.Response]':
+                if elid is None:
+                    request = rest_request(entity, operation, content, sid)
+                else:
+                    request = rest_elid_request(entity, elid, operation, content, sid)
+                return self._request_flow(request, idempotent=retry_safe, on_retry=observation.retry)
+
+            response = yield from session_flow(call, is_session_expired, session_id)
+            observation.finish(response.status_code, len(response.content))
+        if sampled:
+            self.payload_log.response(entity, operation, response.content)
+        return response
+
+    def _soap_flow(
+        self,
+        operation: str,
+        template: typing.Union[str, SoapTemplate],
+        params: typing.Union[typing.Mapping[str, typing.Any], None] = None,
+        session_id: typing.Union[str, None] = None,
+        idempotent: bool = False,
+    ) -> 'Flow[SoapResponse]':
+        compiled = compile_template(template) if isinstance(template, str) else template
+        with self.instrumentation.request('soap', 'soap', operation) as observation:
+
+            def call(sid: str) -> 'Flow[SoapResponse]':
+                request = soap_request(operation, compiled.render(sid, params))
+                response = yield from self._request_flow(
+                    request, idempotent=idempotent, on_retry=observation.retry, stream=True
+                )
+                # Parsed while the body streams in, so large responses are never held whole
+                parser = SoapResponseParser(response.status_code)
+                yield Read(response, parser.feed)
+                observation.finish(response.status_code, parser.received, len(request.content or b''))
+                return parser.close()
+
+            result = yield from session_flow(call, is_soap_session_expired, session_id)
+        if result.message is not None:
+            logger.error('SOAP %s failed: %s', operation, result.message)
+        return result
@@ -0,0 +1,4 @@
+from fnt_auto._sync_api._sync_client import SyncFntAPI
+from fnt_auto._sync_api.bulk import ThreadedBulkJob
+
+__all__ = ['SyncFntAPI', 'ThreadedBulkJob']
@@ -0,0 +1,5 @@
+from fnt_auto._sync_api.location import SyncLocationAPI
+
+
+class SyncFntAPI(SyncLocationAPI):
+    pass
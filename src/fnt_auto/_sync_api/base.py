@@ -1,27 +1,192 @@
+import threading
+import time
 import typing
 import logging
-import typing
-
-from httpx import AsyncClient, Client
-from httpx import AsyncClient
-from fnt_auto.models.api import Login
-
 
-if typing.TYPE_CHECKING:
-    from fnt_auto._async_api.base import ResponseType
+import httpx
+from httpx import Client
+from fnt_auto import _core
+from fnt_auto._common.scheduler import RequestScheduler
+from fnt_auto._common.session import SessionSlot
+from fnt_auto._common.soap import SoapTemplate
+from fnt_auto._core import (
+    DEFAULT_CONNECT_TIMEOUT,
+    DEFAULT_KEEPALIVE_EXPIRY,
+    DEFAULT_MAX_CONNECTIONS,
+    DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_TIMEOUT,
+)
+from fnt_auto._core import ErrorReponse, ResponseType, SuccessReponse  # noqa: F401
+from fnt_auto.instrumentation import NOOP, Instrumentation, PayloadLog
+from fnt_auto.models.api import RestResponse, SoapResponse
 
 
 logger = logging.getLogger(__package__)
 
 __all__: list[str] = []
 
+_APIT = typing.TypeVar('_APIT', bound='SyncBaseAPI')
+_ResultT = typing.TypeVar('_ResultT')
+
+
+class SyncBaseAPI(_core.RequestFlows):
+    """Blocking counterpart of `AsyncBaseAPI` on a pooled `httpx.Client`.
+
+    Requests go through the same flows as the async client (see `fnt_auto._core`), this class only performs their
+    I/O. The client is safe to share between threads.
+    """
 
-class SyncBaseAPI:
     _client: Client
-    _session_id: str
 
+    def __init__(
+        self,
+        base_url: str,
+        username: str,
+        password: str,
+        *,
+        max_connections: typing.Union[int, None] = DEFAULT_MAX_CONNECTIONS,
+        max_keepalive_connections: typing.Union[int, None] = DEFAULT_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry: typing.Union[float, None] = DEFAULT_KEEPALIVE_EXPIRY,
+        timeout: typing.Union[float, None] = DEFAULT_TIMEOUT,
+        connect_timeout: typing.Union[float, None] = DEFAULT_CONNECT_TIMEOUT,
+        http2: bool = False,
+        transport: typing.Union[httpx.BaseTransport, None] = None,
+        scheduler: typing.Union[RequestScheduler, None] = None,
+        instrumentation: typing.Union[Instrumentation, None] = None,
+        payload_log_sample_rate: float = 1.0,
+    ) -> None:
+        self._owns_transport = transport is None
+        if transport is None:
+            transport = httpx.HTTPTransport(
+                limits=httpx.Limits(
+                    max_connections=max_connections,
+                    max_keepalive_connections=max_keepalive_connections,
+                    keepalive_expiry=keepalive_expiry,
+                ),
+                http2=http2,
+            )
+        self._client = Client(
+            base_url=base_url.rstrip('/'), transport=transport, timeout=httpx.Timeout(timeout, connect=connect_timeout)
+        )
+        self._username = username
+        self._password = password
+        self._session = SessionSlot()
+        self._session_lock = threading.Lock()
+        self._scheduler = scheduler or RequestScheduler()
+        self.instrumentation = instrumentation or NOOP
+        self.payload_log = PayloadLog(logger, payload_log_sample_rate)
+
+    @property
+    def _session_id(self) -> typing.Union[str, None]:
+        return self._session.session_id
+
+    def __enter__(self: _APIT) -> _APIT:
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._session.session_id is not None:
+            try:
+                self.logout()
+            except (httpx.HTTPError, ValueError) as exc:
+                logger.warning('Failed to logout session: %s', exc)
+            self._session.session_id = None
+        if self._owns_transport:
+            self._client.close()
+
+    def login(
+        self, username: typing.Union[str, None] = None, password: typing.Union[str, None] = None
+    ) -> typing.Union[str, None]:
+        self._username = username or self._username
+        self._password = password or self._password
+        session_id = self._run(self._login_flow())
+        if session_id is not None:
+            self._session.session_id = session_id
+        return session_id
+
+    def logout(self, session_id: typing.Union[str, None] = None) -> typing.Any:
+        return self._run(self._logout_flow(session_id or self._session_id))  # type: ignore[arg-type]
+
+    def _acquire_session(self, stale_session_id: typing.Union[str, None] = None) -> str:
+        # Threads that see the same expired session share a single login
+        with self._session_lock:
+            session_id = self._session.reusable(stale_session_id)
+            if session_id is not None:
+                return session_id
+            return self._session.store(self._run(self._login_flow()))
+
+    def _run(self, flow: '_core.Flow[_ResultT]') -> _ResultT:
+        # Performs the I/O a request flow yields until it returns; errors are raised inside the flow
+        result: typing.Any = None
+        error: typing.Union[BaseException, None] = None
+        while True:
+            try:
+                effect = flow.send(result) if error is None else flow.throw(error)
+            except StopIteration as stop:
+                return stop.value
+            try:
+                result, error = self._perform(effect), None
+            except BaseException as exc:
+                result, error = None, exc
+
+    def _perform(self, effect: '_core.Effect') -> typing.Any:
+        if isinstance(effect, _core.Send):
+            request = effect.request.build(self._client)
+            return self._scheduler.send_blocking(lambda: self._client.send(request, stream=effect.stream))
+        if isinstance(effect, _core.Read):
+            try:
+                for chunk in effect.response.iter_bytes():
+                    effect.sink(chunk)
+            finally:
+                effect.response.close()
+            return None
+        if isinstance(effect, _core.Close):
+            return effect.response.close()
+        if isinstance(effect, _core.Sleep):
+            return time.sleep(effect.seconds)
+        if isinstance(effect, _core.AcquireSession):
+            return self._acquire_session()
+        return self._acquire_session(effect.stale)
+
+    def rest_request(
+        self,
+        entity: str,
+        operation: str,
+        data: typing.Any,
+        session_id: typing.Union[str, None] = None,
+        idempotent: typing.Union[bool, None] = None,
+    ) -> 'RestResponse':
+        response = self._run(self._rest_flow(entity, operation, data, session_id, idempotent))
+        return _core.parse_rest_response(response, entity, operation)
+
+    def rest_elid_request(
+        self,
+        entity: str,
+        elid: str,
+        operation: str,
+        data: typing.Any,
+        session_id: typing.Union[str, None] = None,
+        idempotent: typing.Union[bool, None] = None,
+    ) -> 'ResponseType':
+        response = self._run(self._rest_flow(entity, operation, data, session_id, idempotent, elid=elid))
+        return _core.parse_rest_elid_response(response)
 
-ErrorReponse = typing.Tuple[None, str]
-SuccessReponse = typing.Tuple[typing.Dict[str, typing.Any], None]
+    def soap_request(
+        self, operation: str, xml: str, session_id: typing.Union[str, None] = None, idempotent: bool = False
+    ) -> typing.Union[typing.Tuple[typing.Literal[True], None], typing.Tuple[None, str]]:
+        response = self.soap_call(operation, xml, session_id=session_id, idempotent=idempotent)
+        if response.message is not None:
+            return None, response.message
+        return True, None
 
-ResponseType = typing.Union[ErrorReponse, SuccessReponse]
+    def soap_call(
+        self,
+        operation: str,
+        template: typing.Union[str, SoapTemplate],
+        params: typing.Union[typing.Mapping[str, typing.Any], None] = None,
+        session_id: typing.Union[str, None] = None,
+        idempotent: bool = False,
+    ) -> SoapResponse:
+        return self._run(self._soap_flow(operation, template, params, session_id, idempotent))
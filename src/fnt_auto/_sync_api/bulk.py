@@ -0,0 +1,78 @@
+import logging
+import typing
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+from fnt_auto._common.bulk import DEFAULT_CONCURRENCY, BulkStats, ItemT, settle
+
+
+logger = logging.getLogger(__package__)
+
+
+class ThreadedBulkJob(typing.Generic[ItemT]):
+    """Blocking `BulkJob`: runs `handler` over `items` on a pool of `concurrency` threads.
+
+    Iterating the job yields every item as soon as its request finishes; `stats` holds the aggregate counts.
+    """
+
+    def __init__(
+        self,
+        items: typing.Iterable[ItemT],
+        handler: typing.Callable[[ItemT], typing.Any],
+        concurrency: int = DEFAULT_CONCURRENCY,
+    ) -> None:
+        if concurrency < 1:
+            msg = f'concurrency must be at least 1, got {concurrency}'
+            raise ValueError(msg)
+        self._items = items
+        self._handler = handler
+        self._concurrency = concurrency
+        self._started = False
+        self.stats = BulkStats()
+
+    def __iter__(self) -> typing.Iterator[ItemT]:
+        if self._started:
+            msg = 'ThreadedBulkJob can only be iterated once'
+            raise RuntimeError(msg)
+        self._started = True
+        return self._run()
+
+    def run(self) -> BulkStats:
+        for _ in self:
+            pass
+        return self.stats
+
+    def _run(self) -> typing.Iterator[ItemT]:
+        items = iter(self._items)
+        pending: typing.Set['Future[ItemT]'] = set()
+        exhausted = False
+        self.stats.start()
+        with ThreadPoolExecutor(self._concurrency, thread_name_prefix='fnt-bulk') as executor:
+            try:
+                while True:
+                    # Only `concurrency` items are submitted at a time, so a lazy iterable is consumed lazily
+                    while not exhausted and len(pending) < self._concurrency:
+                        try:
+                            item = next(items)
+                        except StopIteration:
+                            exhausted = True
+                            break
+                        pending.add(executor.submit(self._process, item))
+                    if not pending:
+                        break
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        item = future.result()
+                        self.stats.add(item.status)
+                        yield item
+            finally:
+                for future in pending:
+                    future.cancel()
+                self.stats.finish()
+                logger.info('Bulk job finished: %r', self.stats)
+
+    def _process(self, item: ItemT) -> ItemT:
+        try:
+            self._handler(item)
+        except Exception as exc:
+            return settle(item, exc)
+        return settle(item)
@@ -0,0 +1,4 @@
+from fnt_auto._sync_api.location.building import SyncBuildingAPI
+
+class SyncLocationAPI(SyncBuildingAPI):
+    pass
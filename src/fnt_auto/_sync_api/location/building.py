@@ -0,0 +1,51 @@
+import functools
+import logging
+from typing import Any, Dict, Iterable, List, Optional
+
+from httpx import codes
+from fnt_auto._common.bulk import DEFAULT_CONCURRENCY
+from fnt_auto._sync_api.base import ResponseType, SyncBaseAPI
+from fnt_auto._sync_api.bulk import ThreadedBulkJob
+from fnt_auto.exceptions import ApiError
+from fnt_auto.models.api import RestResponse
+from fnt_auto.models.zones.building import BuildingCreate
+
+
+logger = logging.getLogger(__package__)
+
+
+class SyncBuildingAPI(SyncBaseAPI):
+
+    def create_building(self, building: BuildingCreate, session_id: Optional[str] = None) -> 'RestResponse':
+        building.rest_response = self.rest_request(
+            'building', 'create', building.to_rest_request_bytes(), session_id=session_id
+        )
+        return building.rest_response  # type: ignore[return-value]
+
+    def create_buildings(
+        self,
+        buildings: Iterable[BuildingCreate],
+        concurrency: int = DEFAULT_CONCURRENCY,
+        session_id: Optional[str] = None,
+    ) -> 'ThreadedBulkJob[BuildingCreate]':
+        return ThreadedBulkJob(buildings, functools.partial(self.create_building, session_id=session_id), concurrency)
+
+    def update_building(
+        self, elid: str, changes: Dict[str, Any], session_id: Optional[str] = None
+    ) -> 'ResponseType':
+        return self.rest_elid_request('building', elid, 'update', changes, session_id=session_id)
+
+    def query_buildings(
+        self,
+        restrictions: Dict[str, Any],
+        return_attributes: Optional[List[str]] = None,
+        session_id: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        payload: Dict[str, Any] = {'restrictions': restrictions}
+        if return_attributes:
+            payload['returnAttributes'] = return_attributes
+        response = self.rest_request('building', 'query', payload, session_id=session_id)
+        if response.status_code != codes.OK:
+            msg = f'Failed to query buildings: {response.message}'
+            raise ApiError(msg)
+        return response.data or []  # type: ignore[return-value]
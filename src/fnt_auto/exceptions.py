@@ -0,0 +1,14 @@
+class FntError(Exception):
+    pass
+
+
+class AuthenticationError(FntError):
+    pass
+
+
+class ApiError(FntError):
+    pass
+
+
+class RouteMissing(FntError):
+    pass
@@ -0,0 +1,385 @@
+import bisect
+import logging
+import random
+import threading
+import time
+import typing
+from collections import defaultdict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+logger = logging.getLogger(__package__)
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = typing.Tuple[str, str, str]
+
+
+class RequestObservation:
+    """One request as seen by an `Instrumentation`; used as a context manager around the request."""
+
+    __slots__ = (
+        'instrumentation',
+        'kind',
+        'entity',
+        'operation',
+        'bytes_sent',
+        'bytes_received',
+        'status_code',
+        'error',
+        'retries',
+        'started_at',
+        'elapsed',
+        'context',
+    )
+
+    def __init__(
+        self, instrumentation: 'Instrumentation', kind: str, entity: str, operation: str, bytes_sent: int = 0
+    ) -> None:
+        self.instrumentation = instrumentation
+        self.kind = kind
+        self.entity = entity
+        self.operation = operation
+        self.bytes_sent = bytes_sent
+        self.bytes_received = 0
+        self.status_code: typing.Union[int, None] = None
+        self.error: typing.Union[str, None] = None
+        self.retries = 0
+        self.started_at = 0.0
+        self.elapsed = 0.0
+        # Per-request state of the exporters (e.g. the tracing span)
+        self.context: typing.Dict[str, typing.Any] = {}
+
+    @property
+    def labels(self) -> Labels:
+        return self.kind, self.entity, self.operation
+
+    def __enter__(self) -> 'RequestObservation':
+        self.started_at = time.perf_counter()
+        self.instrumentation.on_start(self)
+        return self
+
+    def __exit__(self, exc_type: typing.Any, exc: typing.Any, tb: typing.Any) -> None:
+        self.elapsed = time.perf_counter() - self.started_at
+        if exc_type is not None and self.error is None:
+            self.error = exc_type.__name__
+        self.instrumentation.on_end(self)
+
+    def retry(self, reason: str) -> None:
+        self.retries += 1
+        self.instrumentation.on_retry(self, reason)
+
+    def finish(self, status_code: int, bytes_received: int = 0, bytes_sent: typing.Union[int, None] = None) -> None:
+        self.status_code = status_code
+        self.bytes_received = bytes_received
+        if bytes_sent is not None:
+            self.bytes_sent = bytes_sent
+
+
+class _NullObservation:
+    # Shared by every request when instrumentation is off, so nothing is allocated per call
+    __slots__ = ()
+
+    def __enter__(self) -> '_NullObservation':
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        pass
+
+    def retry(self, reason: str) -> None:
+        pass
+
+    def finish(self, status_code: int, bytes_received: int = 0, bytes_sent: typing.Union[int, None] = None) -> None:
+        pass
+
+
+_NULL_OBSERVATION = _NullObservation()
+
+
+class Instrumentation:
+    """Base class of request instrumentation exporters; every hook is a no-op."""
+
+    enabled = True
+
+    def request(
+        self, kind: str, entity: str, operation: str, bytes_sent: int = 0
+    ) -> typing.Union[RequestObservation, _NullObservation]:
+        return RequestObservation(self, kind, entity, operation, bytes_sent)
+
+    def on_start(self, observation: RequestObservation) -> None:
+        pass
+
+    def on_retry(self, observation: RequestObservation, reason: str) -> None:
+        pass
+
+    def on_end(self, observation: RequestObservation) -> None:
+        pass
+
+
+class NoopInstrumentation(Instrumentation):
+    enabled = False
+
+    def request(
+        self, kind: str, entity: str, operation: str, bytes_sent: int = 0
+    ) -> typing.Union[RequestObservation, _NullObservation]:
+        return _NULL_OBSERVATION
+
+
+NOOP = NoopInstrumentation()
+
+
+class CompositeInstrumentation(Instrumentation):
+    def __init__(self, *instrumentations: Instrumentation) -> None:
+        self.instrumentations = [instrumentation for instrumentation in instrumentations if instrumentation.enabled]
+
+    def on_start(self, observation: RequestObservation) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.on_start(observation)
+
+    def on_retry(self, observation: RequestObservation, reason: str) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.on_retry(observation, reason)
+
+    def on_end(self, observation: RequestObservation) -> None:
+        for instrumentation in self.instrumentations:
+            instrumentation.on_end(observation)
+
+
+class Histogram:
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> float:
+        # Upper bound of the bucket holding the q-th observation
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float('inf')
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(names: typing.Sequence[str], values: typing.Sequence[typing.Any]) -> str:
+    return ','.join(f'{name}="{_escape_label(str(value))}"' for name, value in zip(names, values))
+
+
+class MetricsRecorder(Instrumentation):
+    """In-process request metrics per (kind, entity, operation), exported in the Prometheus text format.
+
+    Records a latency histogram, request counts by status, error and retry counters, the number of requests in flight
+    and bytes sent/received. Safe to share between threads and clients.
+    """
+
+    def __init__(self, buckets: typing.Sequence[float] = DEFAULT_BUCKETS, namespace: str = 'fnt') -> None:
+        self.buckets = tuple(buckets)
+        self.namespace = namespace
+        self._lock = threading.Lock()
+        self.latency: typing.Dict[Labels, Histogram] = {}
+        self.requests: typing.DefaultDict[typing.Tuple[str, str, str, str], int] = defaultdict(int)
+        self.errors: typing.DefaultDict[typing.Tuple[str, str, str, str], int] = defaultdict(int)
+        self.retries: typing.DefaultDict[Labels, int] = defaultdict(int)
+        self.in_flight: typing.DefaultDict[Labels, int] = defaultdict(int)
+        self.bytes_sent: typing.DefaultDict[Labels, int] = defaultdict(int)
+        self.bytes_received: typing.DefaultDict[Labels, int] = defaultdict(int)
+
+    def on_start(self, observation: RequestObservation) -> None:
+        with self._lock:
+            self.in_flight[observation.labels] += 1
+
+    def on_retry(self, observation: RequestObservation, reason: str) -> None:
+        with self._lock:
+            self.retries[observation.labels] += 1
+
+    def on_end(self, observation: RequestObservation) -> None:
+        labels = observation.labels
+        status = str(observation.status_code) if observation.status_code is not None else 'error'
+        with self._lock:
+            self.in_flight[labels] -= 1
+            histogram = self.latency.get(labels)
+            if histogram is None:
+                histogram = self.latency[labels] = Histogram(self.buckets)
+            histogram.observe(observation.elapsed)
+            self.requests[(*labels, status)] += 1
+            if observation.error is not None:
+                self.errors[(*labels, observation.error)] += 1
+            elif observation.status_code is not None and observation.status_code >= 400:  # noqa: PLR2004
+                self.errors[(*labels, f'http_{observation.status_code}')] += 1
+            self.bytes_sent[labels] += observation.bytes_sent
+            self.bytes_received[labels] += observation.bytes_received
+
+    def reset(self) -> None:
+        with self._lock:
+            for metric in (
+                self.latency,
+                self.requests,
+                self.errors,
+                self.retries,
+                self.in_flight,
+                self.bytes_sent,
+                self.bytes_received,
+            ):
+                metric.clear()
+
+    def render_prometheus(self) -> str:
+        names = ('kind', 'entity', 'operation')
+        prefix = self.namespace
+        lines: typing.List[str] = []
+
+        def counter(
+            name: str, help_text: str, values: typing.Mapping[typing.Any, int], label_names: typing.Sequence[str]
+        ) -> None:
+            lines.append(f'# HELP {prefix}_{name} {help_text}')
+            lines.append(f'# TYPE {prefix}_{name} {"gauge" if name.endswith("in_flight") else "counter"}')
+            for labels, value in sorted(values.items()):
+                lines.append(f'{prefix}_{name}{{{_format_labels(label_names, labels)}}} {value}')
+
+        with self._lock:
+            lines.append(f'# HELP {prefix}_request_duration_seconds FNT request latency')
+            lines.append(f'# TYPE {prefix}_request_duration_seconds histogram')
+            for labels, histogram in sorted(self.latency.items()):
+                label_text = _format_labels(names, labels)
+                cumulative = 0
+                for bound, count in zip((*histogram.buckets, float('inf')), histogram.counts):
+                    cumulative += count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{prefix}_request_duration_seconds_bucket{{{label_text},le="{le}"}} {cumulative}')
+                lines.append(f'{prefix}_request_duration_seconds_sum{{{label_text}}} {histogram.sum}')
+                lines.append(f'{prefix}_request_duration_seconds_count{{{label_text}}} {histogram.count}')
+            counter('requests_total', 'FNT requests by response status', self.requests, (*names, 'status'))
+            counter('request_errors_total', 'Failed FNT requests by error', self.errors, (*names, 'error'))
+            counter('request_retries_total', 'Retried FNT request attempts', self.retries, names)
+            counter('requests_in_flight', 'FNT requests currently in flight', self.in_flight, names)
+            counter('request_bytes_sent_total', 'Request body bytes sent', self.bytes_sent, names)
+            counter('request_bytes_received_total', 'Response body bytes received', self.bytes_received, names)
+        return '\n'.join(lines) + '\n'
+
+    def serve(self, port: int = 9464, addr: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """Serve `render_prometheus` on http://addr:port/metrics from a daemon thread; `shutdown()` the result."""
+        recorder = self
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.split('?', 1)[0] != '/metrics':
+                    self.send_error(404)
+                    return
+                body = recorder.render_prometheus().encode('utf-8')
+                self.send_response(200)
+                self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format: str, *args: typing.Any) -> None:  # noqa: A002
+                logger.debug(format, *args)
+
+        server = ThreadingHTTPServer((addr, port), _Handler)
+        threading.Thread(target=server.serve_forever, name='fnt-metrics', daemon=True).start()
+        return server
+
+
+class OpenTelemetryInstrumentation(Instrumentation):
+    """Opens an OpenTelemetry client span per request; requires opentelemetry-api (fnt-auto[otel])."""
+
+    def __init__(self, tracer: typing.Any = None) -> None:
+        try:
+            from opentelemetry import trace
+        except ImportError as exc:  # no cov
+            msg = 'OpenTelemetry tracing requires opentelemetry-api, install fnt-auto[otel]'
+            raise ImportError(msg) from exc
+        self._trace = trace
+        self.tracer = tracer or trace.get_tracer('fnt_auto')
+
+    def on_start(self, observation: RequestObservation) -> None:
+        observation.context['span'] = self.tracer.start_span(
+            f'FNT {observation.kind} {observation.entity}.{observation.operation}',
+            kind=self._trace.SpanKind.CLIENT,
+            attributes={
+                'fnt.kind': observation.kind,
+                'fnt.entity': observation.entity,
+                'fnt.operation': observation.operation,
+                'fnt.request.bytes': observation.bytes_sent,
+            },
+        )
+
+    def on_retry(self, observation: RequestObservation, reason: str) -> None:
+        span = observation.context.get('span')
+        if span is not None:
+            span.add_event('retry', {'reason': reason, 'attempt': observation.retries})
+
+    def on_end(self, observation: RequestObservation) -> None:
+        span = observation.context.pop('span', None)
+        if span is None:
+            return
+        if observation.status_code is not None:
+            span.set_attribute('http.status_code', observation.status_code)
+        span.set_attribute('fnt.response.bytes', observation.bytes_received)
+        if observation.error is not None or (observation.status_code or 0) >= 400:  # noqa: PLR2004
+            span.set_status(self._trace.Status(self._trace.StatusCode.ERROR, observation.error))
+        span.end()
+
+
+class _LazyPayload:
+    __slots__ = ('payload', 'max_chars')
+
+    def __init__(self, payload: typing.Any, max_chars: int) -> None:
+        self.payload = payload
+        self.max_chars = max_chars
+
+    def __str__(self) -> str:
+        payload = self.payload
+        text = payload.decode('utf-8', 'replace') if isinstance(payload, (bytes, bytearray)) else str(payload)
+        if len(text) > self.max_chars:
+            return f'{text[: self.max_chars]}... ({len(text)} chars)'
+        return text
+
+
+class PayloadLog:
+    """Logs request/response payloads at `level` for a `sample_rate` fraction of requests.
+
+    Payloads are only rendered when a record is actually emitted.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        sample_rate: float = 1.0,
+        level: int = logging.DEBUG,
+        max_chars: int = 2000,
+    ) -> None:
+        if not 0.0 <= sample_rate <= 1.0:
+            msg = f'sample_rate must be between 0 and 1, got {sample_rate}'
+            raise ValueError(msg)
+        self.logger = logger
+        self.sample_rate = sample_rate
+        self.level = level
+        self.max_chars = max_chars
+
+    def sampled(self) -> bool:
+        if self.sample_rate <= 0.0 or not self.logger.isEnabledFor(self.level):
+            return False
+        return self.sample_rate >= 1.0 or random.random() < self.sample_rate  # noqa: S311
+
+    def request(self, entity: str, operation: str, payload: typing.Any) -> bool:
+        if not self.sampled():
+            return False
+        self.logger.log(self.level, 'About to %s %s: %s', operation, entity, _LazyPayload(payload, self.max_chars))
+        return True
+
+    def response(self, entity: str, operation: str, payload: typing.Any) -> None:
+        self.logger.log(self.level, 'Response of %s %s: %s', operation, entity, _LazyPayload(payload, self.max_chars))
@@ -1,6 +1,8 @@
-from typing import Optional, Any
+from typing import Generic, List, Optional, Any, Dict, TypeVar, Union
 from fnt_auto.models import RWModel
 
+RowT = TypeVar('RowT')
+
 class Login(RWModel):
     user: str
     password: str
@@ -10,4 +12,20 @@ class Login(RWModel):
 class RestResponse(RWModel):
     message: Optional[str] = None
     status_code: int
-    data: Optional[dict[str,Any]] = None
\ No newline at end of file
+    # A single object for create/update calls, a list of objects for queries
+    data: Optional[Union[dict[str,Any], list[dict[str,Any]]]] = None
+
+class QueryPage(RWModel, Generic[RowT]):
+    # Body of a successful query, validated in one pass from the raw JSON
+    return_data: Optional[List[RowT]] = None
+
+class SoapResponse(RWModel):
+    status_code: int
+    message: Optional[str] = None
+    fault_code: Optional[str] = None
+    # Leaf elements of the SOAP body by local name, a list when an element repeats
+    values: Dict[str, Any] = {}
+
+    @property
+    def ok(self) -> bool:
+        return 200 <= self.status_code < 300 and self.message is None
@@ -13,6 +13,9 @@ class ItemStatusOpt(Enum):
     ALREADY_EXIST = auto()
     FAILED = auto()
     INIT = auto()
+    UPDATED = auto()
+    UNCHANGED = auto()
+    SKIPPED = auto()
 
 
 class CustumAttribute(RWModel):
@@ -69,12 +72,33 @@ class ItemAction(RWModel):
 
         return self.model_dump(by_alias=True, exclude_defaults=True)
 
+    def to_rest_request_bytes(self) -> bytes:
+        # Same payload as to_rest_request, serialized straight to JSON bytes by pydantic-core
+        return self.__pydantic_serializer__.to_json(self, by_alias=True, exclude_defaults=True)
+
 class ItemCreate(ItemAction):
     _new_item_elid: Optional[str] = None
+    _existing_elid: Optional[str] = None
 
     @property
     def new_item_elid(self) -> Optional[str]:
         return self._new_item_elid
+
+    @new_item_elid.setter
+    def new_item_elid(self, value: Optional[str]):
+        self._new_item_elid = value
+
+    @property
+    def existing_elid(self) -> Optional[str]:
+        return self._existing_elid
+
+    @existing_elid.setter
+    def existing_elid(self, value: Optional[str]):
+        self._existing_elid = value
+
+    @property
+    def elid(self) -> Optional[str]:
+        return self._new_item_elid or self._existing_elid
     
     @property
     def rest_response(self) -> Optional[RestResponse]:
@@ -83,12 +107,16 @@ class ItemCreate(ItemAction):
     @rest_response.setter
     def rest_response(self, value:RestResponse):
         self._rest_response = value
-        if value.status_code == codes.OK and value.data:
+        if value.status_code == codes.OK and value.data and isinstance(value.data, dict):
             self._new_item_elid = value.data.get('elid')
             self.status = ItemStatusOpt.SUCCESS
         elif value.status_code == codes.BAD_REQUEST:
             if value.message and 'already exists' in value.message:
                 self.status = ItemStatusOpt.ALREADY_EXIST
+            else:
+                self.status = ItemStatusOpt.FAILED
+        else:
+            self.status = ItemStatusOpt.FAILED
 
 class Link(RWModel):
     linked_elid: str
\ No newline at end of file
@@ -0,0 +1,334 @@
+import logging
+import operator
+import typing
+
+import numpy as np
+import shapely
+from shapely import GeometryType
+
+from fnt_auto.models.geo import (
+    BaseGeometry,
+    Feature,
+    FeatureCollection,
+    LineString,
+    MultiLineString,
+    MultiPoint,
+    MultiPolygon,
+    Point,
+    Polygon,
+    _arrays_to_2039,
+    _arrays_to_4326,
+)
+from fnt_auto.models.spatial import JoinPredicate, SpatialIndex
+
+
+logger = logging.getLogger(__package__)
+
+# Column codes follow shapely's GeometryType so type groups map straight onto from_ragged_array
+_GEOMETRY_CODES: typing.Dict[str, int] = {
+    'Point': GeometryType.POINT,
+    'LineString': GeometryType.LINESTRING,
+    'Polygon': GeometryType.POLYGON,
+    'MultiPoint': GeometryType.MULTIPOINT,
+    'MultiLineString': GeometryType.MULTILINESTRING,
+    'MultiPolygon': GeometryType.MULTIPOLYGON,
+}
+ColumnarGeometry = typing.Union[Point, LineString, Polygon, MultiPoint, MultiLineString, MultiPolygon]
+_GEOMETRY_CLASSES: typing.Dict[int, typing.Type[ColumnarGeometry]] = {
+    GeometryType.POINT: Point,
+    GeometryType.LINESTRING: LineString,
+    GeometryType.POLYGON: Polygon,
+    GeometryType.MULTIPOINT: MultiPoint,
+    GeometryType.MULTILINESTRING: MultiLineString,
+    GeometryType.MULTIPOLYGON: MultiPolygon,
+}
+
+
+class _Missing:
+    def __repr__(self) -> str:
+        return '<missing>'
+
+
+MISSING: typing.Any = _Missing()
+
+
+def _as_parts(geometry_type: str, coordinates: typing.Any) -> typing.List[typing.List[typing.Any]]:
+    # Every geometry is stored as parts -> rings -> coordinates
+    if geometry_type == 'Point':
+        return [[[coordinates]]]
+    if geometry_type in ('MultiPoint', 'LineString'):
+        return [[coordinates]]
+    if geometry_type in ('MultiLineString', 'Polygon'):
+        return [coordinates]
+    return coordinates
+
+
+def _take_ranges(offsets: 'np.ndarray', indices: 'np.ndarray') -> typing.Tuple['np.ndarray', 'np.ndarray']:
+    starts = offsets[indices]
+    lengths = offsets[indices + 1] - starts
+    new_offsets = np.zeros(len(indices) + 1, dtype=np.int64)
+    np.cumsum(lengths, out=new_offsets[1:])
+    positions = np.repeat(starts - new_offsets[:-1], lengths) + np.arange(new_offsets[-1])
+    return positions, new_offsets
+
+
+class ColumnarFeatureCollection:
+    """Array-backed alternative to `FeatureCollection` for large layers.
+
+    Coordinates live in one contiguous float64 array addressed through feature -> part -> ring -> coordinate offset
+    arrays, and properties are stored as one list per key. Indexing and iteration build `Feature` models on access;
+    they are copies, so changing them does not change the collection.
+    """
+
+    def __init__(
+        self,
+        geometry_types: 'np.ndarray',
+        coords: 'np.ndarray',
+        geom_offsets: 'np.ndarray',
+        part_offsets: 'np.ndarray',
+        ring_offsets: 'np.ndarray',
+        properties: typing.Dict[str, typing.List[typing.Any]],
+        z: 'typing.Union[np.ndarray, None]' = None,
+    ) -> None:
+        self._types = geometry_types
+        self._coords = coords
+        self._z = z
+        self._geom_offsets = geom_offsets
+        self._part_offsets = part_offsets
+        self._ring_offsets = ring_offsets
+        self._properties = properties
+        self._spatial_index: typing.Union[SpatialIndex, None] = None
+
+    @classmethod
+    def from_raw(cls, features: typing.Iterable[typing.Mapping[str, typing.Any]]) -> 'ColumnarFeatureCollection':
+        types: typing.List[int] = []
+        xs: typing.List[float] = []
+        ys: typing.List[float] = []
+        zs: typing.List[float] = []
+        geom_offsets = [0]
+        part_offsets = [0]
+        ring_offsets = [0]
+        properties: typing.Dict[str, typing.List[typing.Any]] = {}
+        for index, feature in enumerate(features):
+            geometry = feature['geometry']
+            geometry_type = geometry['type']
+            if geometry_type not in _GEOMETRY_CODES:
+                msg = f'Unsupported geometry type for columnar storage: {geometry_type}'
+                raise ValueError(msg)
+            types.append(_GEOMETRY_CODES[geometry_type])
+            for part in _as_parts(geometry_type, geometry['coordinates']):
+                for ring in part:
+                    for coordinate in ring:
+                        xs.append(coordinate[0])
+                        ys.append(coordinate[1])
+                        zs.append(coordinate[2] if len(coordinate) > 2 else np.nan)  # noqa: PLR2004
+                    ring_offsets.append(len(xs))
+                part_offsets.append(len(ring_offsets) - 1)
+            geom_offsets.append(len(part_offsets) - 1)
+            feature_properties = feature.get('properties') or {}
+            for key in feature_properties.keys() - properties.keys():
+                properties[key] = [MISSING] * index
+            for key, column in properties.items():
+                column.append(feature_properties.get(key, MISSING))
+        z = np.array(zs, dtype=np.float64)
+        return cls(
+            geometry_types=np.array(types, dtype=np.int8),
+            coords=np.column_stack([np.array(xs, dtype=np.float64), np.array(ys, dtype=np.float64)]),
+            geom_offsets=np.array(geom_offsets, dtype=np.int64),
+            part_offsets=np.array(part_offsets, dtype=np.int64),
+            ring_offsets=np.array(ring_offsets, dtype=np.int64),
+            properties=properties,
+            z=z if not np.isnan(z).all() else None,
+        )
+
+    @classmethod
+    def from_features(cls, features: typing.Iterable[Feature]) -> 'ColumnarFeatureCollection':
+        return cls.from_raw(
+            {
+                'geometry': {'type': feature.geometry.type, 'coordinates': feature.geometry.coordinates},
+                'properties': feature.properties,
+            }
+            for feature in features
+        )
+
+    def to_feature_collection(self) -> FeatureCollection:
+        return FeatureCollection(features=list(self))
+
+    @property
+    def geom(self) -> str:
+        return self.to_feature_collection().geom
+
+    @property
+    def shapely(self) -> 'shapely.GeometryCollection':
+        return shapely.GeometryCollection(list(self.to_shapely()))
+
+    @property
+    def property_keys(self) -> typing.List[str]:
+        return list(self._properties)
+
+    def column(self, key: str) -> typing.List[typing.Any]:
+        return [None if value is MISSING else value for value in self._properties[key]]
+
+    def __len__(self) -> int:
+        return len(self._types)
+
+    def __iter__(self) -> typing.Iterator[Feature]:
+        for index in range(len(self)):
+            yield self._feature(index)
+
+    def __getitem__(self, index: int) -> Feature:
+        index = operator.index(index)
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            msg = f'feature index {index} out of range'
+            raise IndexError(msg)
+        return self._feature(index)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ColumnarFeatureCollection) or len(self) != len(other):
+            return False
+        return (
+            np.array_equal(self._types, other._types)
+            and np.array_equal(self._geom_offsets, other._geom_offsets)
+            and np.array_equal(self._part_offsets, other._part_offsets)
+            and np.array_equal(self._ring_offsets, other._ring_offsets)
+            and np.array_equal(self._coords, other._coords)
+        )
+
+    def _coordinates(self, ring: int) -> typing.List[typing.List[float]]:
+        start, end = self._ring_offsets[ring], self._ring_offsets[ring + 1]
+        coords = self._coords[start:end].tolist()
+        if self._z is not None:
+            for coordinate, z in zip(coords, self._z[start:end].tolist()):
+                if not np.isnan(z):
+                    coordinate.append(z)
+        return coords
+
+    def _feature(self, index: int) -> Feature:
+        geometry_type = int(self._types[index])
+        parts = [
+            [self._coordinates(ring) for ring in range(self._part_offsets[part], self._part_offsets[part + 1])]
+            for part in range(self._geom_offsets[index], self._geom_offsets[index + 1])
+        ]
+        if geometry_type == GeometryType.POINT:
+            coordinates: typing.Any = parts[0][0][0]
+        elif geometry_type in (GeometryType.MULTIPOINT, GeometryType.LINESTRING):
+            coordinates = parts[0][0]
+        elif geometry_type in (GeometryType.MULTILINESTRING, GeometryType.POLYGON):
+            coordinates = parts[0]
+        else:
+            coordinates = parts
+        properties = {
+            key: column[index] for key, column in self._properties.items() if column[index] is not MISSING
+        }
+        geometry_class = _GEOMETRY_CLASSES[geometry_type]
+        geometry = geometry_class.model_construct(
+            type=geometry_class.model_fields['type'].default, coordinates=coordinates
+        )
+        return Feature.model_construct(geometry=geometry, properties=properties)
+
+    def take(self, indices: typing.Union[typing.Sequence[int], 'np.ndarray']) -> 'ColumnarFeatureCollection':
+        indices = np.asarray(indices, dtype=np.int64)
+        part_indices, geom_offsets = _take_ranges(self._geom_offsets, indices)
+        ring_indices, part_offsets = _take_ranges(self._part_offsets, part_indices)
+        coord_indices, ring_offsets = _take_ranges(self._ring_offsets, ring_indices)
+        index_list = indices.tolist()
+        return ColumnarFeatureCollection(
+            geometry_types=self._types[indices],
+            coords=self._coords[coord_indices],
+            geom_offsets=geom_offsets,
+            part_offsets=part_offsets,
+            ring_offsets=ring_offsets,
+            properties={key: [column[i] for i in index_list] for key, column in self._properties.items()},
+            z=self._z[coord_indices] if self._z is not None else None,
+        )
+
+    def filter(  # noqa: A003
+        self,
+        func: typing.Union[typing.Callable[[Feature], bool], typing.Sequence[bool], 'np.ndarray'],
+        remove: bool = False,
+    ) -> 'ColumnarFeatureCollection':
+        # A boolean mask skips building Feature views entirely
+        if callable(func):
+            mask = np.fromiter((bool(func(feature)) for feature in self), dtype=bool, count=len(self))
+        else:
+            mask = np.asarray(func, dtype=bool)
+        collection = self.take(np.flatnonzero(mask))
+        if remove:
+            self._replace(self.take(np.flatnonzero(~mask)))
+        return collection
+
+    def _replace(self, other: 'ColumnarFeatureCollection') -> None:
+        self.__dict__.update(other.__dict__)
+        self._spatial_index = None
+
+    def convert_to_2039(self) -> None:
+        self._coords[:, 0], self._coords[:, 1] = _arrays_to_2039(self._coords[:, 0], self._coords[:, 1])
+        self._spatial_index = None
+
+    def convert_to_4326(self) -> None:
+        self._coords[:, 0], self._coords[:, 1] = _arrays_to_4326(self._coords[:, 0], self._coords[:, 1])
+        self._spatial_index = None
+
+    def to_shapely(self) -> 'np.ndarray':
+        result = np.empty(len(self), dtype=object)
+        # Group by geometry type and dimension so 2D features stay 2D, as they do through `Feature.shapely`
+        groups = self._types.astype(np.int64) * 2 + self._has_z()
+        for group_code in np.unique(groups).tolist():
+            indices = np.flatnonzero(groups == group_code)
+            # A homogeneous layer hands its stored arrays to shapely as they are
+            group = self if len(indices) == len(self) else self.take(indices)
+            result[indices] = group._ragged_geometries(group_code // 2, has_z=bool(group_code % 2))
+        return result
+
+    def _has_z(self) -> 'np.ndarray':
+        if self._z is None:
+            return np.zeros(len(self), dtype=np.int64)
+        # A geometry is 3D when any of its coordinates carries a z value
+        coord_offsets = self._ring_offsets[self._part_offsets[self._geom_offsets]]
+        with_z = np.concatenate([[0], np.cumsum(~np.isnan(self._z))])
+        return (with_z[coord_offsets[1:]] > with_z[coord_offsets[:-1]]).astype(np.int64)
+
+    def _ragged_geometries(self, geometry_type: int, has_z: bool) -> 'np.ndarray':
+        coords = self._coords
+        if has_z and self._z is not None:
+            coords = np.column_stack([coords, np.nan_to_num(self._z)])
+        if geometry_type == GeometryType.POINT:
+            return shapely.from_ragged_array(GeometryType.POINT, coords)
+        if geometry_type in (GeometryType.LINESTRING, GeometryType.MULTIPOINT):
+            return shapely.from_ragged_array(GeometryType(geometry_type), coords, (self._ring_offsets,))
+        if geometry_type in (GeometryType.POLYGON, GeometryType.MULTILINESTRING):
+            return shapely.from_ragged_array(
+                GeometryType(geometry_type), coords, (self._ring_offsets, self._part_offsets)
+            )
+        return shapely.from_ragged_array(
+            GeometryType.MULTIPOLYGON, coords, (self._ring_offsets, self._part_offsets, self._geom_offsets)
+        )
+
+    @property
+    def spatial_index(self) -> SpatialIndex:
+        if self._spatial_index is None:
+            self._spatial_index = SpatialIndex(self, self.to_shapely())  # type: ignore[arg-type]
+        return self._spatial_index
+
+    def closest(
+        self,
+        point: 'Point',
+        /,
+        *,
+        min_distance: typing.Union[float, None] = None,
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.Union[Feature, None]':
+        return self.spatial_index.closest(point, min_distance=min_distance, max_distance=max_distance)
+
+    def sjoin(
+        self,
+        other: 'typing.Union[FeatureCollection, ColumnarFeatureCollection]',
+        /,
+        *,
+        predicate: typing.Union[JoinPredicate, None] = 'within',
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'np.ndarray':
+        # Positions rather than features, so large layers never materialize Feature objects
+        return other.spatial_index.join_indices(self.to_shapely(), predicate=predicate, max_distance=max_distance)
@@ -0,0 +1,83 @@
+import threading
+import typing
+
+
+if typing.TYPE_CHECKING:
+    import numpy as np
+    from pyproj import CRS, Transformer
+
+
+EPSG2039_PROJ = (
+    '+proj=tmerc +lat_0=31.7343936111111 +lon_0=35.2045169444445 +k=1.0000067 +x_0=219529.584 +y_0=626907.39 '
+    '+ellps=GRS80 +towgs84=-24.002400,-17.103200,-17.844400,-0.33077,-1.852690,1.669690,5.424800 +units=m +no_defs'
+)
+
+# Old survey grid still found in CAD exports: ITM minus a fixed offset. Converted by adding the offset back rather
+# than through pyproj, so it has no registry entry.
+LEGACY_OFFSET = (50000.0, 500000.0)
+
+ITM = 'itm'
+WGS84 = 'wgs84'
+
+CRSDefinition = typing.Union[str, int]
+
+_registry: typing.Dict[str, CRSDefinition] = {
+    ITM: EPSG2039_PROJ,
+    WGS84: 4326,
+}
+
+# pyproj objects must not be shared between threads, so every thread builds and keeps its own. The generation
+# bumps on every registration and makes each thread drop what it built from older definitions.
+_local = threading.local()
+_generation = 0
+
+
+def register_crs(name: str, definition: CRSDefinition) -> None:
+    """Register a CRS under `name`: an EPSG code, or anything `pyproj.CRS.from_user_input` accepts."""
+    global _generation
+    _registry[name] = definition
+    _generation += 1
+
+
+def _thread_cache(kind: str) -> typing.Dict[typing.Any, typing.Any]:
+    if getattr(_local, 'generation', None) != _generation:
+        _local.generation = _generation
+        _local.crs = {}
+        _local.transformers = {}
+    return getattr(_local, kind)
+
+
+def registered_crs() -> typing.Dict[str, CRSDefinition]:
+    return dict(_registry)
+
+
+def get_crs(name: CRSDefinition) -> 'CRS':
+    cache: typing.Dict[typing.Any, 'CRS'] = _thread_cache('crs')
+    crs = cache.get(name)
+    if crs is None:
+        from pyproj import CRS
+
+        crs = CRS.from_user_input(_registry.get(name, name) if isinstance(name, str) else name)
+        cache[name] = crs
+    return crs
+
+
+def get_transformer(source: CRSDefinition, target: CRSDefinition) -> 'Transformer':
+    """Return this thread's always_xy transformer from `source` to `target`, building it on first use."""
+    cache: typing.Dict[typing.Tuple[typing.Any, typing.Any], 'Transformer'] = _thread_cache('transformers')
+    transformer = cache.get((source, target))
+    if transformer is None:
+        from pyproj import Transformer
+
+        transformer = Transformer.from_crs(get_crs(source), get_crs(target), always_xy=True)
+        cache[(source, target)] = transformer
+    return transformer
+
+
+def transform(
+    xs: 'np.ndarray',
+    ys: 'np.ndarray',
+    source: CRSDefinition,
+    target: CRSDefinition,
+) -> typing.Tuple['np.ndarray', 'np.ndarray']:
+    return get_transformer(source, target).transform(xs, ys)
@@ -0,0 +1,83 @@
+import logging
+import typing
+from collections import defaultdict
+
+
+logger = logging.getLogger(__name__)
+
+NodeT = typing.TypeVar('NodeT')
+
+
+class DependencyCycleError(ValueError):
+    pass
+
+
+class DependencyGraph(typing.Generic[NodeT]):
+    """Dependency DAG over a batch of items, identified by `key`.
+
+    `references` lists the keys an item refers to; references to keys outside the batch are ignored (they point at
+    objects that already exist). `levels` groups the items so that every item comes after all its dependencies.
+    """
+
+    def __init__(
+        self,
+        items: typing.Iterable[NodeT],
+        key: typing.Callable[[NodeT], typing.Union[typing.Hashable, None]],
+        references: typing.Callable[[NodeT], typing.Iterable[typing.Hashable]],
+    ) -> None:
+        self.items = list(items)
+        self._by_key: typing.Dict[typing.Hashable, int] = {}
+        for index, item in enumerate(self.items):
+            item_key = key(item)
+            if item_key is None:
+                continue
+            if item_key in self._by_key:
+                msg = f'duplicate key {item_key!r} in dependency graph'
+                raise ValueError(msg)
+            self._by_key[item_key] = index
+        self._parents: typing.List[typing.List[int]] = []
+        self._children: typing.Dict[int, typing.List[int]] = defaultdict(list)
+        for index, item in enumerate(self.items):
+            parents = list(
+                dict.fromkeys(
+                    self._by_key[ref] for ref in references(item) if ref in self._by_key and self._by_key[ref] != index
+                )
+            )
+            self._parents.append(parents)
+            for parent in parents:
+                self._children[parent].append(index)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def get(self, key: typing.Hashable) -> typing.Union[NodeT, None]:
+        index = self._by_key.get(key)
+        return self.items[index] if index is not None else None
+
+    def parents(self, item_index: int) -> typing.List[NodeT]:
+        return [self.items[parent] for parent in self._parents[item_index]]
+
+    def level_indices(self) -> typing.List[typing.List[int]]:
+        # Kahn's algorithm, one level per round of items whose dependencies are all in earlier levels
+        remaining = [len(parents) for parents in self._parents]
+        level = [index for index, count in enumerate(remaining) if count == 0]
+        levels = []
+        placed = 0
+        while level:
+            levels.append(level)
+            placed += len(level)
+            next_level = []
+            for index in level:
+                for child in self._children[index]:
+                    remaining[child] -= 1
+                    if remaining[child] == 0:
+                        next_level.append(child)
+            level = sorted(next_level)
+        if placed != len(self.items):
+            cyclic = [index for index, count in enumerate(remaining) if count > 0]
+            msg = f'dependency cycle between items {cyclic}'
+            raise DependencyCycleError(msg)
+        return levels
+
+    def levels(self) -> typing.List[typing.List[NodeT]]:
+        return [[self.items[index] for index in level] for level in self.level_indices()]
@@ -0,0 +1,265 @@
+import hashlib
+import logging
+import typing
+from collections import defaultdict, deque
+
+import numpy as np
+
+from fnt_auto.models.geo import BaseGeometry, Feature, FeatureCollection, _flatten_coordinates, _leaf_geometries
+from fnt_auto.models.reconcile import _values_equal
+from fnt_auto.models.serialization import dumps
+
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TOLERANCE = 1e-6
+
+KeyFunc = typing.Callable[[Feature], typing.Any]
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _quantized(geometry: typing.Union[BaseGeometry, typing.Any], tolerance: float) -> str:
+    parts = []
+    for leaf in _leaf_geometries(geometry):
+        if leaf.type == 'Point':
+            coordinates = [leaf.coordinates]
+        else:
+            coordinates = []
+            _flatten_coordinates(leaf.coordinates, leaf._nesting, coordinates)
+        # Only x/y take part: a survey height update is not a move
+        cells = ','.join(f'{round(point[0] / tolerance)}:{round(point[1] / tolerance)}' for point in coordinates)
+        parts.append(f'{leaf.type}({cells})')
+    return ';'.join(parts)
+
+
+def geometry_fingerprint(feature: Feature, tolerance: float = DEFAULT_TOLERANCE) -> str:
+    """Digest of the feature's x/y coordinates snapped to a `tolerance` grid; stable across runs and processes.
+
+    Equal fingerprints mean the geometries agree within the grid; coordinates close to a cell edge may still get
+    different fingerprints, so `diff_layers` re-checks those pairs against `tolerance` directly.
+    """
+    return _digest(_quantized(feature.geometry, tolerance).encode('utf-8'))
+
+
+def properties_fingerprint(
+    feature: Feature, keys: typing.Union[typing.Sequence[str], None] = None
+) -> str:
+    properties = feature.properties
+    selected = sorted(properties) if keys is None else sorted(keys)
+    return _digest(dumps({key: properties.get(key) for key in selected}))
+
+
+def feature_fingerprint(
+    feature: Feature,
+    keys: typing.Union[typing.Sequence[str], None] = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+) -> str:
+    return _digest(
+        f'{geometry_fingerprint(feature, tolerance)}/{properties_fingerprint(feature, keys)}'.encode('utf-8')
+    )
+
+
+class FeatureChange:
+    def __init__(
+        self,
+        old: Feature,
+        new: Feature,
+        moved: bool,
+        changes: typing.Dict[str, typing.Tuple[typing.Any, typing.Any]],
+    ) -> None:
+        self.old = old
+        self.new = new
+        self.moved = moved
+        # {property: (old value, new value)}
+        self.changes = changes
+
+    @property
+    def distance(self) -> float:
+        return float(self.old.shapely.distance(self.new.shapely)) if self.moved else 0.0
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(moved={self.moved}, changes={self.changes!r})'
+
+
+class LayerDiff:
+    def __init__(self) -> None:
+        self.added: typing.List[Feature] = []
+        self.removed: typing.List[Feature] = []
+        self.moved: typing.List[FeatureChange] = []
+        self.changed: typing.List[FeatureChange] = []
+        self.unchanged = 0
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.moved or self.changed)
+
+    @property
+    def delta(self) -> FeatureCollection:
+        """New versions of every added, moved or changed feature: what a sync still has to process."""
+        seen: typing.Set[int] = set()
+        features = list(self.added)
+        for change in (*self.moved, *self.changed):
+            if id(change.new) not in seen:
+                seen.add(id(change.new))
+                features.append(change.new)
+        return FeatureCollection(features=features)
+
+    def report(self) -> str:
+        return (
+            f'{len(self.added)} added, {len(self.removed)} removed, {len(self.moved)} moved, '
+            f'{len(self.changed)} changed, {self.unchanged} unchanged'
+        )
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}({self.report()})'
+
+
+def _key_func(key: typing.Union[str, KeyFunc, None]) -> typing.Union[KeyFunc, None]:
+    if key is None or callable(key):
+        return key
+    return lambda feature: feature.properties.get(key)
+
+
+def _same_geometry(old: Feature, new: Feature, tolerance: float) -> bool:
+    if old.geometry.type == 'Point' and new.geometry.type == 'Point':
+        (ox, oy, *_), (nx, ny, *_) = old.geometry.coordinates, new.geometry.coordinates
+        return abs(ox - nx) <= tolerance and abs(oy - ny) <= tolerance
+    return bool(old.shapely.equals_exact(new.shapely, tolerance))
+
+
+def _property_changes(
+    old: Feature, new: Feature, keys: typing.Union[typing.Sequence[str], None]
+) -> typing.Dict[str, typing.Tuple[typing.Any, typing.Any]]:
+    selected = keys if keys is not None else dict.fromkeys([*old.properties, *new.properties])
+    changes = {}
+    for key in selected:
+        before, after = old.properties.get(key), new.properties.get(key)
+        if not _values_equal(after, before):
+            changes[key] = (before, after)
+    return changes
+
+
+def _spatial_pairs(
+    old: typing.List[Feature], new: typing.List[Feature], max_distance: float
+) -> typing.List[typing.Tuple[int, int]]:
+    import shapely
+
+    from fnt_auto.models.spatial import feature_geometries
+
+    if not old or not new:
+        return []
+    old_geometries = feature_geometries(old)
+    new_geometries = feature_geometries(new)
+    # Every candidate within reach, not just each feature's nearest: that one may be taken by a closer feature
+    new_indices, old_indices = shapely.STRtree(old_geometries).query(
+        new_geometries, predicate='dwithin', distance=max_distance
+    )
+    distances = shapely.distance(new_geometries[new_indices], old_geometries[old_indices])
+    # Closest pairs first, each feature used once
+    pairs = []
+    used_old: typing.Set[int] = set()
+    used_new: typing.Set[int] = set()
+    for position in np.argsort(distances, kind='stable').tolist():
+        old_index, new_index = int(old_indices[position]), int(new_indices[position])
+        if old_index not in used_old and new_index not in used_new:
+            used_old.add(old_index)
+            used_new.add(new_index)
+            pairs.append((old_index, new_index))
+    return pairs
+
+
+def diff_layers(
+    old: typing.Union[FeatureCollection, typing.Iterable[Feature]],
+    new: typing.Union[FeatureCollection, typing.Iterable[Feature]],
+    *,
+    key: typing.Union[str, KeyFunc, None] = None,
+    properties: typing.Union[typing.Sequence[str], None] = None,
+    tolerance: float = DEFAULT_TOLERANCE,
+    match_distance: typing.Union[float, None] = None,
+) -> LayerDiff:
+    """Compare two snapshots of a layer (in the same CRS) and sort the new one into added/moved/changed features.
+
+    Features are paired by `key` (a property name or a function of the feature) when given; the rest are paired
+    by identical content fingerprints, then by identical geometry, then, with `match_distance`, by distance: of all
+    old/new pairs within that distance the closest are taken first, every feature paired at most once. Paired
+    features count as moved when their geometries differ by more than `tolerance`, and as changed when any of
+    `properties` (default: all) differs; one can be both. Pairing is hash based, so the cost stays close to linear
+    in the layer sizes.
+    """
+    old_features = list(old.features if isinstance(old, FeatureCollection) else old)
+    new_features = list(new.features if isinstance(new, FeatureCollection) else new)
+    key_of = _key_func(key)
+    result = LayerDiff()
+    pairs: typing.List[typing.Tuple[Feature, Feature]] = []
+
+    if key_of is not None:
+        by_key: typing.Dict[typing.Any, Feature] = {}
+        unkeyed_old = []
+        for feature in old_features:
+            value = key_of(feature)
+            if value is None:
+                unkeyed_old.append(feature)
+            elif value in by_key:
+                logger.warning('Duplicate key [%s] in the old snapshot, keeping the first feature', value)
+                unkeyed_old.append(feature)
+            else:
+                by_key[value] = feature
+        unkeyed_new = []
+        for feature in new_features:
+            value = key_of(feature)
+            match = by_key.pop(value, None) if value is not None else None
+            if match is None:
+                unkeyed_new.append(feature)
+            else:
+                pairs.append((match, feature))
+        old_features, new_features = [*by_key.values(), *unkeyed_old], unkeyed_new
+
+    # Identical content, then identical geometry: both are plain dictionary lookups on fingerprints
+    geometries = {id(feature): geometry_fingerprint(feature, tolerance) for feature in (*old_features, *new_features)}
+    for fingerprint in (
+        lambda feature: (geometries[id(feature)], properties_fingerprint(feature, properties)),
+        lambda feature: geometries[id(feature)],
+    ):
+        buckets: typing.DefaultDict[typing.Any, typing.Deque[Feature]] = defaultdict(deque)
+        for feature in old_features:
+            buckets[fingerprint(feature)].append(feature)
+        unmatched = []
+        for feature in new_features:
+            bucket = buckets.get(fingerprint(feature))
+            if bucket:
+                pairs.append((bucket.popleft(), feature))
+            else:
+                unmatched.append(feature)
+        old_features = [feature for bucket in buckets.values() for feature in bucket]
+        new_features = unmatched
+
+    # Within `tolerance` this also pairs features whose coordinates straddle a fingerprint cell edge
+    if old_features and new_features:
+        matched_old: typing.Set[int] = set()
+        matched_new: typing.Set[int] = set()
+        max_distance = max(match_distance or 0.0, tolerance)
+        for old_index, new_index in _spatial_pairs(old_features, new_features, max_distance):
+            pairs.append((old_features[old_index], new_features[new_index]))
+            matched_old.add(old_index)
+            matched_new.add(new_index)
+        old_features = [feature for i, feature in enumerate(old_features) if i not in matched_old]
+        new_features = [feature for i, feature in enumerate(new_features) if i not in matched_new]
+
+    result.removed = old_features
+    result.added = new_features
+    for before, after in pairs:
+        moved = not _same_geometry(before, after, tolerance)
+        changes = _property_changes(before, after, properties)
+        if not moved and not changes:
+            result.unchanged += 1
+            continue
+        change = FeatureChange(before, after, moved, changes)
+        if moved:
+            result.moved.append(change)
+        if changes:
+            result.changed.append(change)
+    # The report is rendered through repr, only when the record is emitted
+    logger.info('Layer diff: %r', result)
+    return result
@@ -1,60 +1,169 @@
 import logging
 import math
 import typing
-from typing import Any, Dict, List, Literal, Tuple, Union
+from typing import Any, ClassVar, Dict, List, Literal, Tuple, Union
 
-from pydantic import BaseModel, Field, conlist
-from pyproj import CRS, Transformer
-from pyproj.enums import TransformDirection
-from shapely import geometry as shapely_geometry
+import numpy as np
+from pydantic import BaseModel, Field, PrivateAttr, conlist
 
+from fnt_auto.models.crs import EPSG2039_PROJ  # noqa: F401  re-exported for existing callers
+from fnt_auto.models.crs import ITM, LEGACY_OFFSET, WGS84, get_transformer, transform
+from fnt_auto.models.query import PropertyIndexes, Query
 
+
+# shapely and pyproj are imported on first use, keeping them out of REST-only callers and pipeline workers
 if typing.TYPE_CHECKING:
+    from pyproj import Transformer
+    from shapely import geometry as shapely_geometry
+
+    from fnt_auto.models.diff import LayerDiff
+    from fnt_auto.models.spatial import JoinPredicate, SpatialIndex
+
     Coordinates = Union[Tuple[float, float, float], Tuple[float, float]]
 else:
     Coordinates = conlist(float, min_length=2, max_length=3)
 
 
-EPSG2039_PROJ = '+proj=tmerc +lat_0=31.7343936111111 +lon_0=35.2045169444445 +k=1.0000067 +x_0=219529.584 +y_0=626907.39 +ellps=GRS80 +towgs84=-24.002400,-17.103200,-17.844400,-0.33077,-1.852690,1.669690,5.424800 +units=m +no_defs'
-
-transformer = Transformer.from_crs(CRS.from_proj4(EPSG2039_PROJ), 4326, always_xy=True)
-
 logger = logging.getLogger(__package__)
 
+CoordinateArrays = Tuple['np.ndarray', 'np.ndarray']
+
+
+def _arrays_to_2039(xs: 'np.ndarray', ys: 'np.ndarray') -> 'CoordinateArrays':
+    xs = np.array(xs, dtype=np.float64)
+    ys = np.array(ys, dtype=np.float64)
+    wgs84 = (xs > -180) & (xs < 180)
+    # Legacy grid, shifted from ITM by a fixed offset
+    legacy = ~wgs84 & (xs < 150_000)
+    if wgs84.any():
+        xs[wgs84], ys[wgs84] = transform(xs[wgs84], ys[wgs84], WGS84, ITM)
+    xs[legacy] += LEGACY_OFFSET[0]
+    ys[legacy] += LEGACY_OFFSET[1]
+    return xs, ys
+
+
+def _arrays_to_4326(xs: 'np.ndarray', ys: 'np.ndarray') -> 'CoordinateArrays':
+    xs = np.array(xs, dtype=np.float64)
+    ys = np.array(ys, dtype=np.float64)
+    itm = (ys > 360_000) | ((xs > 180) & (ys > 180))
+    if itm.any():
+        xs[itm], ys[itm] = transform(xs[itm], ys[itm], ITM, WGS84)
+    return xs, ys
+
+
+def _flatten_coordinates(coordinates: Any, depth: int, out: 'List[Coordinates]') -> None:
+    if depth == 0:
+        out.append(coordinates)
+        return
+    for item in coordinates:
+        _flatten_coordinates(item, depth - 1, out)
+
+
+def _rebuild_coordinates(coordinates: Any, depth: int, points: 'typing.Iterator[Coordinates]') -> Any:
+    if depth == 0:
+        return next(points)
+    return [_rebuild_coordinates(item, depth - 1, points) for item in coordinates]
+
+
+def _leaf_geometries(geometry: 'Union[BaseGeometry, GeometryCollection]') -> 'typing.Iterator[BaseGeometry]':
+    if isinstance(geometry, GeometryCollection):
+        for child in geometry.geometries:
+            yield from _leaf_geometries(child)
+    else:
+        yield geometry
+
+
+def _convert_geometries(
+    geometries: 'typing.Iterable[BaseGeometry]',
+    convert: typing.Callable[['np.ndarray', 'np.ndarray'], 'CoordinateArrays'],
+) -> None:
+    # Flatten every coordinate of the batch into two arrays so pyproj is called once per source CRS
+    geometries = list(geometries)
+    points: List[Coordinates] = []
+    for geometry in geometries:
+        _flatten_coordinates(geometry.coordinates, geometry._nesting, points)
+    if not points:
+        return
+    xs = np.fromiter((point[0] for point in points), dtype=np.float64, count=len(points))
+    ys = np.fromiter((point[1] for point in points), dtype=np.float64, count=len(points))
+    xs, ys = convert(xs, ys)
+    converted = iter([[x, y, *point[2:]] for x, y, point in zip(xs.tolist(), ys.tolist(), points)])
+    for geometry in geometries:
+        geometry.coordinates = _rebuild_coordinates(geometry.coordinates, geometry._nesting, converted)
+
 
 class BaseGeometry(BaseModel):
     type: str  # noqa: A003
     coordinates: Coordinates
 
+    # Levels of lists wrapping a single coordinate tuple
+    _nesting: ClassVar[int] = 0
+
+    # Derived from `coordinates` and dropped whenever it is reassigned. In-place edits of the coordinate lists are
+    # not tracked, assign a new list instead.
+    _shapely: 'typing.Union[shapely_geometry.base.BaseGeometry, None]' = PrivateAttr(default=None)
+    _bounds: 'typing.Union[Tuple[float, float, float, float], None]' = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == 'coordinates':
+            self._shapely = None
+            self._bounds = None
+        super().__setattr__(name, value)
+
+    def _build_shapely(self) -> 'shapely_geometry.base.BaseGeometry':
+        raise NotImplementedError
+
+    @property
+    def shapely(self) -> 'shapely_geometry.base.BaseGeometry':
+        if self._shapely is None:
+            self._shapely = self._build_shapely()
+        return self._shapely
+
+    @property
+    def prepared(self) -> 'shapely_geometry.base.BaseGeometry':
+        # Shapely 2 prepares geometries in place, so the cached object keeps its prepared state
+        import shapely
+
+        geometry = self.shapely
+        if not shapely.is_prepared(geometry):
+            shapely.prepare(geometry)
+        return geometry
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        if self._bounds is None:
+            self._bounds = self.shapely.bounds
+        return self._bounds
+
+    def contains(self, other: 'BaseGeometry') -> bool:
+        import shapely
+
+        return bool(shapely.contains(self.prepared, other.shapely))
+
+    def intersects(self, other: 'BaseGeometry') -> bool:
+        import shapely
+
+        return bool(shapely.intersects(self.prepared, other.shapely))
+
     @staticmethod
     def _convert_to_2039(coordinates: 'Coordinates') -> 'Coordinates':
-        x = coordinates[0]
-        y = coordinates[1]
-        if x < 180 and x > -180:
-            coordinates = transformer.transform(
-                xx=coordinates[0], yy=coordinates[1], direction=TransformDirection.FORWARD
-            )
-        elif x < 150_000:
-            coordinates = (x + 50000, y + 500000)
-        return coordinates
+        xs, ys = _arrays_to_2039([coordinates[0]], [coordinates[1]])
+        return [float(xs[0]), float(ys[0]), *coordinates[2:]]
 
     @staticmethod
     def _convert_to_4326(coordinates: 'Coordinates') -> 'Coordinates':
-        x = coordinates[0]
-        y = coordinates[1]
-        if y > 360_000:
-            transformer.transform(xx=x, yy=y, direction=TransformDirection.FORWARD)
-            return transformer.transform(xx=x, yy=y, direction=TransformDirection.FORWARD)
-        if x > 180 and y > 180:
-            # Already in 4326
-            return transformer.transform(xx=x, yy=y, direction=TransformDirection.FORWARD)
-        return coordinates
-
-        return None
+        xs, ys = _arrays_to_4326([coordinates[0]], [coordinates[1]])
+        return [float(xs[0]), float(ys[0]), *coordinates[2:]]
+
+    def convert_to_2039(self) -> None:
+        _convert_geometries([self], _arrays_to_2039)
+
+    def convert_to_4326(self) -> None:
+        _convert_geometries([self], _arrays_to_4326)
 
     @property
-    def geom(self):
-        return self.json()
+    def geom(self) -> str:
+        return self.model_dump_json()
 
     def __eq__(self, other: 'object') -> bool:
         if not isinstance(other, BaseGeometry) or self.type != other.type:
@@ -74,12 +183,13 @@ class Point(BaseGeometry):
     def y(self) -> float:
         return self.coordinates[1]
 
-    @property
-    def shapely(self) -> 'shapely_geometry.Point':
+    def _build_shapely(self) -> 'shapely_geometry.Point':
+        from shapely import geometry as shapely_geometry
+
         return shapely_geometry.Point(*self.coordinates)
 
     def within(self, other: 'Point', distance: float) -> bool:
-        return other.shapely.within(self.shapely.buffer(distance))
+        return self.distance_to(other) < distance
 
     def distance_to(self, other: 'Point') -> float:
         # This is ITM distance calculation
@@ -87,41 +197,29 @@ class Point(BaseGeometry):
             return math.sqrt(pow(self.x - other.x, 2) + pow(self.y - other.y, 2))
         return self.shapely.distance(other.shapely)
 
-    def convert_to_2039(self) -> None:
-        self.coordinates = self._convert_to_2039(self.coordinates)
-
-    def convert_to_4326(self) -> None:
-        self.coordinates = self._convert_to_4326(self.coordinates)
-
 
 class MultiPoint(BaseGeometry):
     type: Literal['MultiPoint'] = 'MultiPoint'  # noqa: A003
     coordinates: List[Coordinates]
 
-    @property
-    def shapely(self) -> 'shapely_geometry.MultiPoint':
-        return shapely_geometry.MultiPoint(self.coordinates)
+    _nesting: ClassVar[int] = 1
 
-    def convert_to_2039(self) -> None:
-        self.coordinates = [self._convert_to_2039(coordinates) for coordinates in self.coordinates]
+    def _build_shapely(self) -> 'shapely_geometry.MultiPoint':
+        from shapely import geometry as shapely_geometry
 
-    def convert_to_4326(self) -> None:
-        self.coordinates = [self._convert_to_4326(coordinates) for coordinates in self.coordinates]
+        return shapely_geometry.MultiPoint(self.coordinates)
 
 
 class LineString(BaseGeometry):
     type: Literal['LineString'] = 'LineString'  # noqa: A003
     coordinates: List[Coordinates]
 
-    @property
-    def shapely(self) -> 'shapely_geometry.LineString':
-        return shapely_geometry.LineString(self.coordinates)
+    _nesting: ClassVar[int] = 1
 
-    def convert_to_2039(self) -> None:
-        self.coordinates = [self._convert_to_2039(coordinates) for coordinates in self.coordinates]
+    def _build_shapely(self) -> 'shapely_geometry.LineString':
+        from shapely import geometry as shapely_geometry
 
-    def convert_to_4326(self) -> None:
-        self.coordinates = [self._convert_to_4326(coordinates) for coordinates in self.coordinates]
+        return shapely_geometry.LineString(self.coordinates)
 
     @property
     def length(self) -> float:
@@ -136,51 +234,38 @@ class MultiLineString(BaseGeometry):
     type: Literal['MultiLineString'] = 'MultiLineString'  # noqa: A003
     coordinates: List[List[Coordinates]]
 
-    @property
-    def shapely(self) -> 'shapely_geometry.MultiLineString':
-        return shapely_geometry.MultiLineString(self.coordinates)
+    _nesting: ClassVar[int] = 2
 
-    def convert_to_2039(self) -> None:
-        self.coordinates = [[self._convert_to_2039(coordinates) for coordinates in line] for line in self.coordinates]
+    def _build_shapely(self) -> 'shapely_geometry.MultiLineString':
+        from shapely import geometry as shapely_geometry
+
+        return shapely_geometry.MultiLineString(self.coordinates)
 
-    def convert_to_4326(self) -> None:
-        self.coordinates = [[self._convert_to_4326(coordinates) for coordinates in line] for line in self.coordinates]
 
 
 class Polygon(BaseGeometry):
     type: Literal['Polygon'] = 'Polygon'  # noqa: A003
     coordinates: List[List[Coordinates]]
 
-    @property
-    def shapely(self) -> 'shapely_geometry.Polygon':
-        return shapely_geometry.Polygon(self.coordinates)
+    _nesting: ClassVar[int] = 2
 
-    def convert_to_2039(self) -> None:
-        self.coordinates = [[self._convert_to_2039(coordinates) for coordinates in line] for line in self.coordinates]
+    def _build_shapely(self) -> 'shapely_geometry.Polygon':
+        from shapely import geometry as shapely_geometry
+
+        return shapely_geometry.Polygon(self.coordinates[0], self.coordinates[1:])
 
-    def convert_to_4326(self) -> None:
-        self.coordinates = [[self._convert_to_4326(coordinates) for coordinates in line] for line in self.coordinates]
 
 
 class MultiPolygon(BaseGeometry):
     type: Literal['MultiPolygon'] = 'MultiPolygon'  # noqa: A003
     coordinates: List[List[List[Coordinates]]]
 
-    @property
-    def shapely(self) -> 'shapely_geometry.MultiPolygon':
-        return shapely_geometry.MultiPolygon(self.coordinates)
+    _nesting: ClassVar[int] = 3
 
-    def convert_to_2039(self) -> None:
-        self.coordinates = [
-            [[self._convert_to_2039(coordinates) for coordinates in line] for line in polygon]
-            for polygon in self.coordinates
-        ]
+    def _build_shapely(self) -> 'shapely_geometry.MultiPolygon':
+        from shapely import geometry as shapely_geometry
 
-    def convert_to_4326(self) -> None:
-        self.coordinates = [
-            [[self._convert_to_4326(coordinates) for coordinates in line] for line in polygon]
-            for polygon in self.coordinates
-        ]
+        return shapely_geometry.MultiPolygon([(polygon[0], polygon[1:]) for polygon in self.coordinates])
 
 
 class GeometryCollection(BaseModel):
@@ -188,18 +273,25 @@ class GeometryCollection(BaseModel):
     geometries: List[Union[Point, MultiPoint, LineString, MultiLineString, Polygon, MultiPolygon]]
 
     @property
-    def geom(self):
-        return self.json()
+    def geom(self) -> str:
+        return self.model_dump_json()
 
     @property
     def shapely(self) -> 'shapely_geometry.GeometryCollection':
-        return shapely_geometry.GeometryCollection(self.geometries)
+        # Not cached here: members may change independently, but each member caches its own geometry
+        from shapely import geometry as shapely_geometry
+
+        return shapely_geometry.GeometryCollection([geometry.shapely for geometry in self.geometries])
+
+    @property
+    def bounds(self) -> Tuple[float, float, float, float]:
+        return self.shapely.bounds
 
     def convert_to_2039(self) -> None:
-        self.coordinates = [geometry.convert_to_2039() for geometry in self.geometries]
+        _convert_geometries(_leaf_geometries(self), _arrays_to_2039)
 
     def convert_to_4326(self) -> None:
-        self.coordinates = [geometry.convert_to_4326() for geometry in self.geometries]
+        _convert_geometries(_leaf_geometries(self), _arrays_to_4326)
 
     def __eq__(self, other: object) -> bool:
         if not isinstance(other, GeometryCollection) or len(self.geometries) != len(other.geometries):
@@ -213,22 +305,22 @@ class Feature(BaseModel):
     properties: dict[str, Any] = Field(default_factory=dict)
 
     @property
-    def geom(self):
+    def geom(self) -> str:
         return self.geometry.geom
 
     @property
     def bbox(self) -> Tuple[float, float, float, float]:
-        return self.shapely.bounds
+        return self.geometry.bounds
 
     @property
     def shapely(self) -> 'shapely_geometry.base.BaseGeometry':
         return self.geometry.shapely
 
     def convert_to_2039(self) -> None:
-        self.geometry.convert_to_2039()
+        _convert_geometries(_leaf_geometries(self.geometry), _arrays_to_2039)
 
     def convert_to_4326(self) -> None:
-        self.geometry.convert_to_4326()
+        _convert_geometries(_leaf_geometries(self.geometry), _arrays_to_4326)
 
     def add_property(self, key: str, value: Any) -> None:
         if key in self.properties and not isinstance(self.properties[key], list):
@@ -265,35 +357,150 @@ class FeatureCollection(BaseModel):
     type: Literal['FeatureCollection'] = 'FeatureCollection'  # noqa: A003
     features: 'List[Feature]' = Field(default_factory=list)
 
+    _spatial_index: 'typing.Union[SpatialIndex, None]' = PrivateAttr(default=None)
+    _index_keys: List[str] = PrivateAttr(default_factory=list)
+    _property_indexes: 'typing.Union[PropertyIndexes, None]' = PrivateAttr(default=None)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        if name == 'features':
+            self.invalidate_index()
+        super().__setattr__(name, value)
+
+    def __getstate__(self) -> Dict[Any, Any]:
+        state = super().__getstate__()
+        # Both indexes refer to the features by identity, which does not survive pickling; they are rebuilt lazily
+        state['__pydantic_private__'] = {
+            **state['__pydantic_private__'],
+            '_spatial_index': None,
+            '_property_indexes': None,
+        }
+        return state
+
+    @property
+    def spatial_index(self) -> 'SpatialIndex':
+        # The size check catches features appended to or removed from the list directly
+        if self._spatial_index is None or len(self._spatial_index) != len(self.features):
+            from fnt_auto.models.spatial import SpatialIndex
+
+            self._spatial_index = SpatialIndex(self.features)
+        return self._spatial_index
+
+    def invalidate_index(self) -> None:
+        """Drop the spatial and property indexes, to be rebuilt on next use.
+
+        Call it after editing `features` or a feature's geometry in place: the indexes only notice changes made through
+        this collection's methods, reassigning `features`, or a change in the number of features.
+        """
+        self._spatial_index = None
+        self._property_indexes = None
+
     @property
-    def geom(self):
-        return self.json(ensure_ascii=False)
+    def geom(self) -> str:
+        # pydantic-core writes non-ASCII characters as-is
+        return self.model_dump_json()
 
     @property
     def shapely(self) -> 'shapely_geometry.base.BaseGeometry':
+        from shapely import geometry as shapely_geometry
+
         return shapely_geometry.GeometryCollection([feature.shapely for feature in self.features])
 
-    def convert_to_2039(self) -> None:
+    def _leaf_geometries(self) -> 'typing.Iterator[BaseGeometry]':
         for feature in self.features:
-            feature.convert_to_2039()
+            yield from _leaf_geometries(feature.geometry)
+
+    def convert_to_2039(self) -> None:
+        _convert_geometries(self._leaf_geometries(), _arrays_to_2039)
+        self._spatial_index = None
 
     def convert_to_4326(self) -> None:
-        for feature in self.features:
-            feature.convert_to_4326()
+        _convert_geometries(self._leaf_geometries(), _arrays_to_4326)
+        self._spatial_index = None
 
     def add_feature(self, feature: Feature) -> None:
         self.features.append(feature)
+        self._spatial_index = None
+        if self._property_indexes is not None:
+            self._property_indexes.add(feature)
 
     def extend(self, other: 'FeatureCollection') -> None:
         self.features.extend(other.features)
+        self._spatial_index = None
+        if self._property_indexes is not None:
+            for feature in other.features:
+                self._property_indexes.add(feature)
+
+    def create_index(self, *keys: str) -> None:
+        """Index features by these property keys, so `query` looks them up instead of scanning.
+
+        Indexes are built on the first query and kept current by `add_feature`, `extend` and this collection's
+        `add_property`, `set_property` and `remove_property`; editing a feature directly bypasses them, call
+        `invalidate_index` after that. Reassigning `features` (or `filter(..., remove=True)`) rebuilds them lazily.
+        """
+        new_keys = [key for key in keys if key not in self._index_keys]
+        if new_keys:
+            self._index_keys.extend(new_keys)
+            self._property_indexes = None
+
+    def drop_index(self, *keys: str) -> None:
+        self._index_keys = [key for key in self._index_keys if key not in keys]
+        self._property_indexes = None
+
+    def add_property(self, feature: Feature, key: str, value: Any) -> None:
+        self._edit_property(feature, key, feature.add_property, value)
+
+    def set_property(self, feature: Feature, key: str, value: Any) -> None:
+        self._edit_property(feature, key, feature.set_property, value)
+
+    def remove_property(self, feature: Feature, key: str) -> None:
+        self._edit_property(feature, key, feature.remove_property)
+
+    def _edit_property(self, feature: Feature, key: str, edit: typing.Callable[..., None], *args: Any) -> None:
+        old = feature.properties.get(key)
+        edit(key, *args)
+        if self._property_indexes is not None:
+            self._property_indexes.update(feature, key, old, feature.properties.get(key))
 
-    def filter(self, func: typing.Callable[[Feature], bool], remove: bool = False) -> 'FeatureCollection':  # noqa: A003
-        logger.debug(f'current features: {len(self.features)}')
-        collection = FeatureCollection(features=list(filter(func, self.features)))
-        logger.debug(f'filtered features: {len(collection.features)}')
+    @property
+    def property_indexes(self) -> 'typing.Union[PropertyIndexes, None]':
+        stale = self._property_indexes is None or len(self._property_indexes) != len(self.features)
+        if stale and self._index_keys:
+            self._property_indexes = PropertyIndexes(self._index_keys, self.features)
+        return self._property_indexes
+
+    def _select(self, query: Query) -> List[bool]:
+        indexes = self.property_indexes
+        selection = indexes.select(query) if indexes is not None else None
+        if selection is None:
+            return [query.matches(feature.properties) for feature in self.features]
+        positions, exact = selection
+        mask = [False] * len(self.features)
+        for position in positions:
+            mask[position] = exact or query.matches(self.features[position].properties)
+        return mask
+
+    def query(self, query: Query, remove: bool = False) -> 'FeatureCollection':
+        """Features whose properties match `query`, e.g. `Eq('layer', 'building') & Prefix('street_en', 'Her')`.
+
+        With `remove`, matching features are also taken out of this collection.
+        """
+        return self._split(self._select(query), remove)
+
+    def filter(  # noqa: A003
+        self, func: typing.Union[typing.Callable[[Feature], bool], Query], remove: bool = False
+    ) -> 'FeatureCollection':
+        if isinstance(func, Query):
+            return self.query(func, remove)
+        # The predicate runs once per feature, also when removing
+        return self._split([bool(func(feature)) for feature in self.features], remove)
+
+    def _split(self, mask: List[bool], remove: bool) -> 'FeatureCollection':
+        logger.debug('current features: %d', len(self.features))
+        collection = FeatureCollection(features=[feature for feature, keep in zip(self.features, mask) if keep])
+        logger.debug('filtered features: %d', len(collection.features))
         if remove:
-            self.features = list(filter(lambda feature: not func(feature), self.features))
-            logger.debug(f'remaining features: {len(self.features)}')
+            self.features = [feature for feature, keep in zip(self.features, mask) if not keep]
+            logger.debug('remaining features: %d', len(self.features))
         return collection
 
     def closest(
@@ -304,19 +511,99 @@ class FeatureCollection(BaseModel):
         min_distance: typing.Union[float, None] = None,
         max_distance: typing.Union[float, None] = None,
     ) -> 'typing.Union[Feature, None]':
-        feature: 'typing.Union[Feature,None]' = None
-        lowest_distance = None
-        for _feature in self.features:
-            distance = _feature.geometry.distance_to(point)
-            if min_distance is not None and distance < min_distance:
-                continue
-            if max_distance is not None and distance > max_distance:
-                continue
-            if lowest_distance is not None and lowest_distance < distance:
+        return self.spatial_index.closest(point, min_distance=min_distance, max_distance=max_distance)
+
+    def k_nearest(
+        self,
+        point: 'Point',
+        k: int,
+        /,
+        *,
+        min_distance: typing.Union[float, None] = None,
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.List[typing.Tuple[Feature, float]]':
+        return self.spatial_index.k_nearest(point, k, min_distance=min_distance, max_distance=max_distance)
+
+    def within_distance(self, point: 'Point', distance: float, /) -> 'FeatureCollection':
+        return FeatureCollection(features=self.spatial_index.within_distance(point, distance))
+
+    def within_bbox(self, minx: float, miny: float, maxx: float, maxy: float, /) -> 'FeatureCollection':
+        return FeatureCollection(features=self.spatial_index.within_bbox(minx, miny, maxx, maxy))
+
+    def closest_many(
+        self,
+        points: 'typing.Iterable[Point]',
+        /,
+        *,
+        min_distance: typing.Union[float, None] = None,
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.List[typing.Union[Feature, None]]':
+        return self.spatial_index.closest_many(points, min_distance=min_distance, max_distance=max_distance)
+
+    def within_distance_many(
+        self, points: 'typing.Iterable[Point]', distance: float, /
+    ) -> 'typing.List[FeatureCollection]':
+        return [
+            FeatureCollection(features=features)
+            for features in self.spatial_index.within_distance_many(points, distance)
+        ]
+
+    def sjoin(
+        self,
+        other: 'FeatureCollection',
+        /,
+        *,
+        predicate: 'typing.Union[JoinPredicate, None]' = 'within',
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.List[typing.Union[Feature, None]]':
+        """For each feature, the feature of `other` it joins with (see `SpatialIndex.join_indices`), or None."""
+        from fnt_auto.models.spatial import feature_geometries
+
+        return other.spatial_index.join(
+            feature_geometries(self.features), predicate=predicate, max_distance=max_distance
+        )
+
+    def join_properties(
+        self,
+        other: 'FeatureCollection',
+        properties: typing.Mapping[str, str],
+        /,
+        *,
+        predicate: 'typing.Union[JoinPredicate, None]' = 'within',
+        max_distance: typing.Union[float, None] = None,
+    ) -> int:
+        """Copy properties of the joined feature of `other` into each feature, as {target key: source key}.
+
+        E.g. `buildings.join_properties(campuses, {'campus_elid': 'elid'})`. Unmatched features are left untouched;
+        returns how many features were matched.
+        """
+        matched = 0
+        for feature, match in zip(self.features, self.sjoin(other, predicate=predicate, max_distance=max_distance)):
+            if match is None:
                 continue
-            lowest_distance = distance
-            feature = _feature
-        return feature
+            matched += 1
+            for target, source in properties.items():
+                self._edit_property(feature, target, feature.properties.__setitem__, match.properties.get(source))
+        return matched
+
+    def annotate_itm(self, x_key: str = 'c_x', y_key: str = 'c_y') -> None:
+        """Store the ITM coordinates of each feature's anchor (the point itself, else a point inside the geometry)."""
+        anchors = [
+            feature.geometry.coordinates
+            if feature.geometry.type == 'Point'
+            else feature.shapely.representative_point().coords[0]
+            for feature in self.features
+        ]
+        xs, ys = _arrays_to_2039([anchor[0] for anchor in anchors], [anchor[1] for anchor in anchors])
+        for feature, x, y in zip(self.features, xs.tolist(), ys.tolist()):
+            self._edit_property(feature, x_key, feature.properties.__setitem__, x)
+            self._edit_property(feature, y_key, feature.properties.__setitem__, y)
+
+    def diff(self, other: 'FeatureCollection', /, **kwargs: Any) -> 'LayerDiff':
+        """Changes from this snapshot to `other`, see `fnt_auto.models.diff.diff_layers`."""
+        from fnt_auto.models.diff import diff_layers
+
+        return diff_layers(self, other, **kwargs)
 
     def __iter__(self) -> typing.Iterator[Feature]:
         return iter(self.features)
@@ -328,3 +615,11 @@ class FeatureCollection(BaseModel):
         if not isinstance(other, FeatureCollection) or len(self.features) != len(other.features):
             return False
         return self.features == other.features
+
+
+def __getattr__(name: str) -> 'Transformer':
+    # Module-level ITM -> WGS84 transformer kept for existing callers; now built on first access, per thread
+    if name == 'transformer':
+        return get_transformer(ITM, WGS84)
+    msg = f'module {__name__!r} has no attribute {name!r}'
+    raise AttributeError(msg)
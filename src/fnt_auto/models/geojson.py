@@ -0,0 +1,186 @@
+import logging
+import os
+import typing
+
+from fnt_auto.models.geo import Feature
+
+
+try:
+    import ijson
+except ImportError:  # no cov
+    ijson = None
+
+
+logger = logging.getLogger(__package__)
+
+GeoJSONSource = typing.Union[str, 'os.PathLike[str]', typing.BinaryIO, typing.Iterable[bytes]]
+PropertyFilter = typing.Mapping[str, typing.Any]
+
+CHUNK_SIZE = 64 * 1024
+FEATURES_PREFIX = 'features.item'
+
+
+def _require_ijson() -> None:
+    if ijson is None:
+        msg = 'Streaming GeoJSON requires ijson, install fnt-auto[stream]'
+        raise ImportError(msg)
+
+
+def _matches(raw: typing.Dict[str, typing.Any], where: typing.Union[PropertyFilter, None]) -> bool:
+    if not where:
+        return True
+    properties = raw.get('properties') or {}
+    for key, expected in where.items():
+        value = properties.get(key)
+        if isinstance(expected, (set, frozenset, list, tuple)):
+            if value not in expected:
+                return False
+        elif value != expected:
+            return False
+    return True
+
+
+def _read_chunks(source: GeoJSONSource) -> typing.Iterator[bytes]:
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fp:  # noqa: PTH123
+            yield from iter(lambda: fp.read(CHUNK_SIZE), b'')
+    elif hasattr(source, 'read'):
+        yield from iter(lambda: source.read(CHUNK_SIZE), b'')  # type: ignore[union-attr]
+    else:
+        yield from source  # type: ignore[misc]
+
+
+class _RawFeatureParser:
+    # Push parser: chunks go in, raw feature dicts come out as soon as each one is complete
+    def __init__(self, prefix: str = FEATURES_PREFIX) -> None:
+        _require_ijson()
+        self._events = ijson.sendable_list()
+        self._coro = ijson.items_coro(self._events, prefix, use_float=True)
+
+    def feed(self, chunk: bytes) -> typing.List[typing.Dict[str, typing.Any]]:
+        self._coro.send(chunk)
+        return self._drain()
+
+    def close(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        self._coro.close()
+        return self._drain()
+
+    def _drain(self) -> typing.List[typing.Dict[str, typing.Any]]:
+        items = list(self._events)
+        del self._events[:]
+        return items
+
+
+def iter_raw_features(
+    source: GeoJSONSource,
+    *,
+    where: typing.Union[PropertyFilter, None] = None,
+    prefix: str = FEATURES_PREFIX,
+) -> typing.Iterator[typing.Dict[str, typing.Any]]:
+    parser = _RawFeatureParser(prefix)
+    for chunk in _read_chunks(source):
+        yield from (raw for raw in parser.feed(chunk) if _matches(raw, where))
+    yield from (raw for raw in parser.close() if _matches(raw, where))
+
+
+def iter_features(
+    source: GeoJSONSource,
+    *,
+    where: typing.Union[PropertyFilter, None] = None,
+    predicate: typing.Union[typing.Callable[[typing.Dict[str, typing.Any]], bool], None] = None,
+    prefix: str = FEATURES_PREFIX,
+) -> typing.Iterator[Feature]:
+    """Yield validated features from a GeoJSON file, path or byte stream without loading it whole.
+
+    `where` keeps features whose properties equal the given values (or belong to them, for a list/set/tuple);
+    `predicate` gets the raw feature dict. Both run before any pydantic model is built.
+    """
+    for raw in iter_raw_features(source, where=where, prefix=prefix):
+        if predicate is None or predicate(raw):
+            yield Feature.model_validate(raw)
+
+
+def iter_feature_batches(
+    source: GeoJSONSource,
+    batch_size: int = 1000,
+    **kwargs: typing.Any,
+) -> typing.Iterator[typing.List[Feature]]:
+    batch: typing.List[Feature] = []
+    for feature in iter_features(source, **kwargs):
+        batch.append(feature)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+async def aiter_features(
+    chunks: typing.AsyncIterable[bytes],
+    *,
+    where: typing.Union[PropertyFilter, None] = None,
+    predicate: typing.Union[typing.Callable[[typing.Dict[str, typing.Any]], bool], None] = None,
+    prefix: str = FEATURES_PREFIX,
+) -> typing.AsyncIterator[Feature]:
+    parser = _RawFeatureParser(prefix)
+    async for chunk in chunks:
+        for raw in parser.feed(chunk):
+            if _matches(raw, where) and (predicate is None or predicate(raw)):
+                yield Feature.model_validate(raw)
+    for raw in parser.close():
+        if _matches(raw, where) and (predicate is None or predicate(raw)):
+            yield Feature.model_validate(raw)
+
+
+class FeatureCollectionWriter:
+    """Writes a GeoJSON FeatureCollection one feature at a time, so exports never hold the whole layer."""
+
+    _header = b'{"type":"FeatureCollection","features":['
+    _footer = b']}'
+
+    def __init__(self, target: typing.Union[str, 'os.PathLike[str]', typing.BinaryIO]) -> None:
+        self._owns_file = isinstance(target, (str, os.PathLike))
+        self._fp: typing.BinaryIO
+        if isinstance(target, (str, os.PathLike)):
+            self._fp = open(target, 'wb')  # noqa: SIM115, PTH123
+        else:
+            self._fp = target
+        self._count = 0
+        self._closed = False
+        self._fp.write(self._header)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def write(self, feature: Feature) -> None:
+        if self._count:
+            self._fp.write(b',')
+        self._fp.write(feature.__pydantic_serializer__.to_json(feature))
+        self._count += 1
+
+    def write_many(self, features: typing.Iterable[Feature]) -> None:
+        for feature in features:
+            self.write(feature)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._fp.write(self._footer)
+        if self._owns_file:
+            self._fp.close()
+
+    def __enter__(self) -> 'FeatureCollectionWriter':
+        return self
+
+    def __exit__(self, *exc_info: typing.Any) -> None:
+        self.close()
+
+
+def write_features(
+    features: typing.Iterable[Feature], target: typing.Union[str, 'os.PathLike[str]', typing.BinaryIO]
+) -> int:
+    with FeatureCollectionWriter(target) as writer:
+        writer.write_many(features)
+    return writer.count
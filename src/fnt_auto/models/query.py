@@ -0,0 +1,311 @@
+import bisect
+import typing
+from collections import defaultdict
+
+
+if typing.TYPE_CHECKING:
+    from fnt_auto.models.geo import Feature
+
+    # Positions matched by a query and whether they are exact (False: candidates still to be checked)
+    Selection = typing.Union[typing.Tuple[typing.Set[int], bool], None]
+
+Properties = typing.Mapping[str, typing.Any]
+
+_NUMBER = 'number'
+_STRING = 'string'
+# Sorts after every other character, so [prefix, prefix + _MAX_CHAR) covers all strings starting with prefix
+_MAX_CHAR = '\U0010ffff'
+
+
+def _kind(value: typing.Any) -> typing.Union[str, None]:
+    # Range and prefix lookups only compare like with like; bool is an int but not a quantity
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return _NUMBER
+    if isinstance(value, str):
+        return _STRING
+    return None
+
+
+def _hashable(value: typing.Any) -> bool:
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+class Query:
+    """Declarative condition on feature properties; combine with `&` and `|`.
+
+    Missing properties read as None, so `Eq('entry', None)` also matches features without an `entry` property.
+    """
+
+    def matches(self, properties: Properties) -> bool:
+        raise NotImplementedError
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        return None
+
+    def __and__(self, other: 'Query') -> 'And':
+        return And(*(self.queries if isinstance(self, And) else (self,)), other)
+
+    def __or__(self, other: 'Query') -> 'Or':
+        return Or(*(self.queries if isinstance(self, Or) else (self,)), other)
+
+    def __call__(self, feature: 'Feature') -> bool:
+        return self.matches(feature.properties)
+
+
+class Eq(Query):
+    def __init__(self, key: str, value: typing.Any) -> None:
+        self.key = key
+        self.value = value
+
+    def matches(self, properties: Properties) -> bool:
+        return properties.get(self.key) == self.value
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        index = indexes.get(self.key)
+        if index is None or not _hashable(self.value):
+            return None
+        return set(index.eq(self.value)), True
+
+    def __repr__(self) -> str:
+        return f'Eq({self.key!r}, {self.value!r})'
+
+
+class In(Query):
+    def __init__(self, key: str, values: typing.Iterable[typing.Any]) -> None:
+        self.key = key
+        self.values = list(values)
+        self._lookup = frozenset(self.values) if all(_hashable(value) for value in self.values) else None
+
+    def matches(self, properties: Properties) -> bool:
+        value = properties.get(self.key)
+        if self._lookup is not None and _hashable(value):
+            return value in self._lookup
+        return value in self.values
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        index = indexes.get(self.key)
+        if index is None or self._lookup is None:
+            return None
+        positions: typing.Set[int] = set()
+        for value in self._lookup:
+            positions.update(index.eq(value))
+        return positions, True
+
+    def __repr__(self) -> str:
+        return f'In({self.key!r}, {self.values!r})'
+
+
+class Range(Query):
+    """`low <= value <= high` (bounds optional, inclusive unless told otherwise) among values of the bounds' kind:
+    numbers for numeric bounds, strings for string bounds."""
+
+    def __init__(
+        self,
+        key: str,
+        low: typing.Any = None,
+        high: typing.Any = None,
+        *,
+        include_low: bool = True,
+        include_high: bool = True,
+    ) -> None:
+        kinds = {_kind(bound) for bound in (low, high) if bound is not None}
+        if len(kinds) != 1 or None in kinds:
+            msg = f'Range bounds must be numbers or strings of the same kind, got {low!r} and {high!r}'
+            raise ValueError(msg)
+        self.key = key
+        self.low = low
+        self.high = high
+        self.include_low = include_low
+        self.include_high = include_high
+        self._kind = kinds.pop()
+
+    def matches(self, properties: Properties) -> bool:
+        value = properties.get(self.key)
+        if _kind(value) != self._kind:
+            return False
+        if self.low is not None and (value < self.low or (value == self.low and not self.include_low)):
+            return False
+        return self.high is None or value < self.high or (value == self.high and self.include_high)
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        index = indexes.get(self.key)
+        if index is None:
+            return None
+        values = index.sorted_values(self._kind)
+        start = 0
+        if self.low is not None:
+            start = (bisect.bisect_left if self.include_low else bisect.bisect_right)(values, self.low)
+        end = len(values)
+        if self.high is not None:
+            end = (bisect.bisect_right if self.include_high else bisect.bisect_left)(values, self.high)
+        return index.union(values[start:end]), True
+
+    def __repr__(self) -> str:
+        return f'Range({self.key!r}, {self.low!r}, {self.high!r})'
+
+
+class Prefix(Query):
+    def __init__(self, key: str, prefix: str) -> None:
+        self.key = key
+        self.prefix = prefix
+
+    def matches(self, properties: Properties) -> bool:
+        value = properties.get(self.key)
+        return isinstance(value, str) and value.startswith(self.prefix)
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        index = indexes.get(self.key)
+        if index is None:
+            return None
+        values = index.sorted_values(_STRING)
+        start = bisect.bisect_left(values, self.prefix)
+        end = bisect.bisect_left(values, self.prefix + _MAX_CHAR)
+        return index.union(values[start:end]), True
+
+    def __repr__(self) -> str:
+        return f'Prefix({self.key!r}, {self.prefix!r})'
+
+
+class And(Query):
+    def __init__(self, *queries: Query) -> None:
+        if not queries:
+            msg = 'And needs at least one query'
+            raise ValueError(msg)
+        self.queries = queries
+
+    def matches(self, properties: Properties) -> bool:
+        return all(query.matches(properties) for query in self.queries)
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        positions: typing.Union[typing.Set[int], None] = None
+        exact = True
+        for query in self.queries:
+            selection = query._select(indexes)
+            if selection is None:
+                # Answered by checking the candidates of the indexed parts
+                exact = False
+                continue
+            positions = selection[0] if positions is None else positions & selection[0]
+            exact = exact and selection[1]
+        return None if positions is None else (positions, exact)
+
+    def __repr__(self) -> str:
+        return f'And({", ".join(map(repr, self.queries))})'
+
+
+class Or(Query):
+    def __init__(self, *queries: Query) -> None:
+        if not queries:
+            msg = 'Or needs at least one query'
+            raise ValueError(msg)
+        self.queries = queries
+
+    def matches(self, properties: Properties) -> bool:
+        return any(query.matches(properties) for query in self.queries)
+
+    def _select(self, indexes: 'PropertyIndexes') -> 'Selection':
+        positions: typing.Set[int] = set()
+        exact = True
+        for query in self.queries:
+            selection = query._select(indexes)
+            if selection is None:
+                # One unindexed branch can match anything, so nothing is ruled out
+                return None
+            positions |= selection[0]
+            exact = exact and selection[1]
+        return positions, exact
+
+    def __repr__(self) -> str:
+        return f'Or({", ".join(map(repr, self.queries))})'
+
+
+class PropertyIndex:
+    """Positions of features by the value of one property: a hash map, plus sorted views for ranges and prefixes.
+
+    Unhashable values (lists, dicts) are not indexed; no Eq/In/Range/Prefix can match them anyway.
+    """
+
+    def __init__(self, key: str) -> None:
+        self.key = key
+        self._positions: typing.DefaultDict[typing.Any, typing.Set[int]] = defaultdict(set)
+        self._sorted: typing.Dict[str, typing.List[typing.Any]] = {}
+
+    def add(self, position: int, value: typing.Any) -> None:
+        if not _hashable(value):
+            return
+        positions = self._positions[value]
+        if not positions:
+            self._sorted.pop(_kind(value), None)  # type: ignore[arg-type]
+        positions.add(position)
+
+    def remove(self, position: int, value: typing.Any) -> None:
+        if not _hashable(value):
+            return
+        positions = self._positions.get(value)
+        if positions is None:
+            return
+        positions.discard(position)
+        if not positions:
+            del self._positions[value]
+            self._sorted.pop(_kind(value), None)  # type: ignore[arg-type]
+
+    def eq(self, value: typing.Any) -> typing.Set[int]:
+        return self._positions.get(value, set())
+
+    def union(self, values: typing.Iterable[typing.Any]) -> typing.Set[int]:
+        positions: typing.Set[int] = set()
+        for value in values:
+            positions.update(self._positions[value])
+        return positions
+
+    def sorted_values(self, kind: str) -> typing.List[typing.Any]:
+        # Built on demand and dropped whenever a value of that kind appears or disappears
+        values = self._sorted.get(kind)
+        if values is None:
+            values = self._sorted[kind] = sorted(value for value in self._positions if _kind(value) == kind)
+        return values
+
+
+class PropertyIndexes:
+    """Property indexes over the features of one collection, kept current by the collection's property methods."""
+
+    def __init__(self, keys: typing.Iterable[str], features: typing.Iterable['Feature'] = ()) -> None:
+        self._indexes = {key: PropertyIndex(key) for key in keys}
+        self._positions: typing.DefaultDict[int, typing.List[int]] = defaultdict(list)
+        self._count = 0
+        for feature in features:
+            self.add(feature)
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def keys(self) -> typing.List[str]:
+        return list(self._indexes)
+
+    def get(self, key: str) -> typing.Union[PropertyIndex, None]:
+        return self._indexes.get(key)
+
+    def add(self, feature: 'Feature') -> None:
+        position = self._count
+        self._count += 1
+        self._positions[id(feature)].append(position)
+        for key, index in self._indexes.items():
+            index.add(position, feature.properties.get(key))
+
+    def update(self, feature: 'Feature', key: str, old: typing.Any, new: typing.Any) -> None:
+        index = self._indexes.get(key)
+        if index is None:
+            return
+        for position in self._positions.get(id(feature), ()):
+            index.remove(position, old)
+            index.add(position, new)
+
+    def select(self, query: Query) -> 'Selection':
+        return query._select(self)
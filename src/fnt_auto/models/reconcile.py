@@ -0,0 +1,140 @@
+import logging
+import math
+import typing
+from collections import Counter
+from enum import Enum, auto
+
+from fnt_auto.models.base import ItemCreate
+
+
+logger = logging.getLogger(__name__)
+
+ItemT = typing.TypeVar('ItemT', bound=ItemCreate)
+
+# Links are set on create and identify the parent the existing items were queried under
+LINK_PREFIX = 'createLink'
+
+
+class SyncActionOpt(Enum):
+    CREATE = auto()
+    UPDATE = auto()
+    NOOP = auto()
+
+
+def _values_equal(desired: typing.Any, current: typing.Any) -> bool:
+    if desired == current:
+        return True
+    if isinstance(desired, (int, float)) and not isinstance(desired, bool) and current is not None:
+        try:
+            return math.isclose(float(desired), float(current), rel_tol=1e-9, abs_tol=1e-9)
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def diff_attributes(
+    desired: typing.Mapping[str, typing.Any], current: typing.Mapping[str, typing.Any]
+) -> typing.Dict[str, typing.Any]:
+    # FNT returns attribute names in its own casing, so they are matched case-insensitively
+    current_by_key = {key.lower(): value for key, value in current.items()}
+    return {
+        key: value
+        for key, value in desired.items()
+        if not key.startswith(LINK_PREFIX) and not _values_equal(value, current_by_key.get(key.lower()))
+    }
+
+
+class PlanItem(typing.Generic[ItemT]):
+    def __init__(
+        self,
+        item: ItemT,
+        action: SyncActionOpt,
+        elid: typing.Union[str, None] = None,
+        changes: typing.Union[typing.Dict[str, typing.Any], None] = None,
+    ) -> None:
+        self.item = item
+        self.action = action
+        self.elid = elid
+        self.changes = changes or {}
+
+    def __repr__(self) -> str:
+        return f'{type(self).__name__}(action={self.action.name}, elid={self.elid!r}, changes={self.changes!r})'
+
+
+class SyncPlan(typing.Generic[ItemT]):
+    def __init__(self, items: typing.List[PlanItem[ItemT]]) -> None:
+        self.items = items
+
+    def __iter__(self) -> typing.Iterator[PlanItem[ItemT]]:
+        return iter(self.items)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def counts(self) -> typing.Counter[SyncActionOpt]:
+        return Counter(plan_item.action for plan_item in self.items)
+
+    @property
+    def pending(self) -> typing.List[PlanItem[ItemT]]:
+        return [plan_item for plan_item in self.items if plan_item.action != SyncActionOpt.NOOP]
+
+    def summary(self) -> str:
+        counts = self.counts
+        return (
+            f'{len(self.items)} items: {counts[SyncActionOpt.CREATE]} to create, '
+            f'{counts[SyncActionOpt.UPDATE]} to update, {counts[SyncActionOpt.NOOP]} unchanged'
+        )
+
+    def report(self, key: str = 'name') -> str:
+        # The summary followed by one line per pending item
+        lines = [self.summary()]
+        for plan_item in self.pending:
+            label = getattr(plan_item.item, key, None)
+            if plan_item.action == SyncActionOpt.CREATE:
+                lines.append(f'\tCREATE {label}')
+            else:
+                changes = ', '.join(f'{name}={value!r}' for name, value in plan_item.changes.items())
+                lines.append(f'\tUPDATE {label} [{plan_item.elid}]: {changes}')
+        return '\n'.join(lines)
+
+
+def build_plan(
+    items: typing.Iterable[ItemT],
+    existing: typing.Iterable[typing.Mapping[str, typing.Any]],
+    key: str = 'name',
+) -> SyncPlan[ItemT]:
+    """Match desired items to existing FNT objects by `key` and decide what each one needs.
+
+    The item's `key` attribute is looked up in the existing objects case-insensitively; unmatched items are created,
+    matched ones are updated with only their changed attributes, or left alone. Of several items with the same key only
+    the first is planned. Items are not changed, so planning is safe for a dry run.
+    """
+    index: typing.Dict[typing.Any, typing.Mapping[str, typing.Any]] = {}
+    for current in existing:
+        value = next((v for k, v in current.items() if k.lower() == key.lower()), None)
+        if value is None:
+            continue
+        if value in index:
+            logger.warning('Duplicate existing %s [%s], keeping the first one', key, value)
+            continue
+        index[value] = current
+
+    plan_items: typing.List[PlanItem[ItemT]] = []
+    planned: typing.Set[typing.Any] = set()
+    for item in items:
+        value = getattr(item, key)
+        if value is not None:
+            # Two updates of the same object would race, with the last writer winning
+            if value in planned:
+                logger.warning('Duplicate desired %s [%s], keeping the first one', key, value)
+                continue
+            planned.add(value)
+        current = index.get(value)
+        if current is None:
+            plan_items.append(PlanItem(item, SyncActionOpt.CREATE))
+            continue
+        elid = next((v for k, v in current.items() if k.lower() == 'elid'), None)
+        changes = diff_attributes(item.to_rest_request(), current)
+        plan_items.append(PlanItem(item, SyncActionOpt.UPDATE if changes else SyncActionOpt.NOOP, elid, changes))
+    return SyncPlan(plan_items)
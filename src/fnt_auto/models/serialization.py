@@ -0,0 +1,38 @@
+import functools
+import json
+import typing
+
+from pydantic import BaseModel, TypeAdapter
+
+
+try:
+    import orjson
+except ImportError:  # no cov
+    orjson = None
+
+
+JSON_CONTENT_TYPE = 'application/json'
+
+
+@functools.lru_cache(maxsize=None)
+def type_adapter(tp: typing.Any) -> TypeAdapter:
+    return TypeAdapter(tp)
+
+
+def dumps(value: typing.Any) -> bytes:
+    if isinstance(value, BaseModel):
+        return value.__pydantic_serializer__.to_json(value)
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def dump_json(value: typing.Any, tp: typing.Any = None, **kwargs: typing.Any) -> bytes:
+    # Validated serialization of non-model values (lists of models, unions...) through a cached TypeAdapter
+    return type_adapter(tp if tp is not None else type(value)).dump_json(value, **kwargs)
+
+
+def loads(data: typing.Union[bytes, str]) -> typing.Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
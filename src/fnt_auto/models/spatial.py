@@ -0,0 +1,213 @@
+import logging
+import typing
+
+import numpy as np
+import shapely
+from shapely import STRtree
+
+
+if typing.TYPE_CHECKING:
+    from shapely.geometry.base import BaseGeometry as ShapelyGeometry
+
+    from fnt_auto.models.geo import Feature, Point
+
+    QueryPoint = typing.Union[Point, ShapelyGeometry]
+
+
+logger = logging.getLogger(__package__)
+
+
+JoinPredicate = typing.Literal['within', 'intersects', 'covered_by', 'contains']
+
+
+def _as_shapely(point: 'QueryPoint') -> 'ShapelyGeometry':
+    return point.shapely if hasattr(point, 'shapely') else point
+
+
+def feature_geometries(features: typing.Sequence['Feature']) -> 'np.ndarray':
+    # Point layers are built with one vectorized call instead of a shapely object per feature
+    if len(features) and all(feature.geometry.type == 'Point' for feature in features):
+        coordinates = np.array([feature.geometry.coordinates[:2] for feature in features], dtype=np.float64)
+        return shapely.points(coordinates)
+    return np.array([feature.shapely for feature in features], dtype=object)
+
+
+class SpatialIndex:
+    """STRtree over the geometries of a fixed sequence of features.
+
+    Distances are planar, in the units of the feature coordinates, and `min_distance`/`max_distance` bounds are
+    inclusive like `FeatureCollection.closest`.
+    """
+
+    def __init__(
+        self, features: typing.Sequence['Feature'], geometries: 'typing.Union[np.ndarray, None]' = None
+    ) -> None:
+        # With precomputed geometries the features are only indexed into, so a lazy sequence works too
+        self._features = list(features) if geometries is None else features
+        if geometries is None:
+            geometries = np.array([feature.shapely for feature in self._features], dtype=object)
+        self._geometries = geometries
+        self._tree = STRtree(self._geometries)
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def closest(
+        self,
+        point: 'QueryPoint',
+        /,
+        *,
+        min_distance: typing.Union[float, None] = None,
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.Union[Feature, None]':
+        geometry = _as_shapely(point)
+        if min_distance is None:
+            indices = self._tree.query_nearest(geometry, max_distance=max_distance, all_matches=False)
+            return self._features[indices[0]] if len(indices) else None
+        indices, distances = self._candidates(geometry, min_distance, max_distance)
+        if not len(indices):
+            return None
+        return self._features[indices[np.argmin(distances)]]
+
+    def k_nearest(
+        self,
+        point: 'QueryPoint',
+        k: int,
+        /,
+        *,
+        min_distance: typing.Union[float, None] = None,
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.List[typing.Tuple[Feature, float]]':
+        geometry = _as_shapely(point)
+        if max_distance is not None:
+            indices, distances = self._candidates(geometry, min_distance, max_distance)
+        else:
+            indices, distances = self._expanding_candidates(geometry, k, min_distance)
+        order = np.argsort(distances, kind='stable')[:k]
+        return [(self._features[indices[i]], float(distances[i])) for i in order]
+
+    def within_distance(self, point: 'QueryPoint', distance: float, /) -> 'typing.List[Feature]':
+        indices = self._tree.query(_as_shapely(point), predicate='dwithin', distance=distance)
+        return [self._features[i] for i in np.sort(indices)]
+
+    def within_bbox(self, minx: float, miny: float, maxx: float, maxy: float, /) -> 'typing.List[Feature]':
+        indices = self._tree.query(shapely.box(minx, miny, maxx, maxy), predicate='intersects')
+        return [self._features[i] for i in np.sort(indices)]
+
+    def closest_many(
+        self,
+        points: 'typing.Iterable[QueryPoint]',
+        /,
+        *,
+        min_distance: typing.Union[float, None] = None,
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.List[typing.Union[Feature, None]]':
+        geometries = np.array([_as_shapely(point) for point in points], dtype=object)
+        if min_distance is not None:
+            return [
+                self.closest(geometry, min_distance=min_distance, max_distance=max_distance) for geometry in geometries
+            ]
+        result: 'typing.List[typing.Union[Feature, None]]' = [None] * len(geometries)
+        if len(geometries) and len(self._features):
+            input_indices, tree_indices = self._tree.query_nearest(
+                geometries, max_distance=max_distance, all_matches=False
+            )
+            for input_index, tree_index in zip(input_indices.tolist(), tree_indices.tolist()):
+                result[input_index] = self._features[tree_index]
+        return result
+
+    def within_distance_many(
+        self, points: 'typing.Iterable[QueryPoint]', distance: float, /
+    ) -> 'typing.List[typing.List[Feature]]':
+        geometries = np.array([_as_shapely(point) for point in points], dtype=object)
+        result: 'typing.List[typing.List[Feature]]' = [[] for _ in range(len(geometries))]
+        if len(geometries) and len(self._features):
+            pairs = self._tree.query(geometries, predicate='dwithin', distance=distance)
+            # Sort by input, then by feature position, to keep collection order within each result
+            order = np.lexsort((pairs[1], pairs[0]))
+            for input_index, tree_index in zip(pairs[0][order].tolist(), pairs[1][order].tolist()):
+                result[input_index].append(self._features[tree_index])
+        return result
+
+    def join(
+        self,
+        geometries: 'typing.Union[typing.Iterable[QueryPoint], np.ndarray]',
+        /,
+        *,
+        predicate: typing.Union[JoinPredicate, None] = 'within',
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'typing.List[typing.Union[Feature, None]]':
+        indices = self.join_indices(geometries, predicate=predicate, max_distance=max_distance)
+        return [None if index < 0 else self._features[index] for index in indices.tolist()]
+
+    def join_indices(
+        self,
+        geometries: 'typing.Union[typing.Iterable[QueryPoint], np.ndarray]',
+        /,
+        *,
+        predicate: typing.Union[JoinPredicate, None] = 'within',
+        max_distance: typing.Union[float, None] = None,
+    ) -> 'np.ndarray':
+        """Position of the indexed feature matched by each geometry, -1 where there is none.
+
+        A geometry matches the first feature (in index order) it satisfies `predicate` with, e.g. a building point
+        `within` a campus polygon. With `max_distance`, geometries left unmatched fall back to the nearest feature
+        within that distance; `predicate=None` joins on nearest only.
+        """
+        if not isinstance(geometries, np.ndarray):
+            geometries = np.array([_as_shapely(geometry) for geometry in geometries], dtype=object)
+        result = np.full(len(geometries), -1, dtype=np.intp)
+        if not len(geometries) or not len(self._features):
+            return result
+        if predicate is not None:
+            input_indices, tree_indices = self._tree.query(geometries, predicate=predicate)
+            # Overlapping features: keep the first one for each input
+            order = np.lexsort((tree_indices, input_indices))
+            inputs, first = np.unique(input_indices[order], return_index=True)
+            result[inputs] = tree_indices[order][first]
+        if predicate is None or max_distance is not None:
+            unmatched = np.flatnonzero(result < 0)
+            if len(unmatched):
+                input_indices, tree_indices = self._tree.query_nearest(
+                    geometries[unmatched], max_distance=max_distance, all_matches=False
+                )
+                result[unmatched[input_indices]] = tree_indices
+        return result
+
+    def _candidates(
+        self,
+        geometry: 'ShapelyGeometry',
+        min_distance: typing.Union[float, None],
+        max_distance: typing.Union[float, None],
+    ) -> typing.Tuple['np.ndarray', 'np.ndarray']:
+        if max_distance is not None:
+            indices = np.sort(self._tree.query(geometry, predicate='dwithin', distance=max_distance))
+        else:
+            indices = np.arange(len(self._features))
+        distances = shapely.distance(self._geometries[indices], geometry)
+        mask = np.ones(len(indices), dtype=bool)
+        if min_distance is not None:
+            mask &= distances >= min_distance
+        if max_distance is not None:
+            mask &= distances <= max_distance
+        return indices[mask], distances[mask]
+
+    def _expanding_candidates(
+        self, geometry: 'ShapelyGeometry', k: int, min_distance: typing.Union[float, None]
+    ) -> typing.Tuple['np.ndarray', 'np.ndarray']:
+        # Grow the search radius until it holds k matches, starting from the nearest neighbour distance
+        if not len(self._features):
+            return np.empty(0, dtype=np.intp), np.empty(0)
+        _, nearest = self._tree.query_nearest(geometry, return_distance=True, all_matches=False)
+        radius = max(float(nearest[0]), min_distance or 0.0)
+        max_extent = self._max_extent(geometry)
+        while True:
+            indices, distances = self._candidates(geometry, min_distance, radius)
+            if len(indices) >= k or radius >= max_extent:
+                return indices, distances
+            radius = radius * 2 if radius > 0 else 1.0
+
+    def _max_extent(self, geometry: 'ShapelyGeometry') -> float:
+        minx, miny, maxx, maxy = shapely.total_bounds(self._geometries)
+        gminx, gminy, gmaxx, gmaxy = geometry.bounds
+        return float(np.hypot(max(maxx, gmaxx) - min(minx, gminx), max(maxy, gmaxy) - min(miny, gminy)))
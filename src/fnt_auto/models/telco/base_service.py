@@ -1,6 +1,8 @@
 from enum import Enum
 
-from fnt_auto.models import base
+from pydantic import Field
+
+from fnt_auto.models import RWModel
 
 
 class DirectionOpt(str, Enum):
@@ -21,6 +23,5 @@ class ServiceCategoryOpt(str, Enum):
 
 class TelcoMasterData(RWModel):
     elid: str
-    service_category: str = Field(alias='serviceCategory')
     transmission_technology: TransmissionTechnologyOpt = Field(alias='transmissionTechnology')
     service_category: ServiceCategoryOpt = Field(alias='serviceCategory')
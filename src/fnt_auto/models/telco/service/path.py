@@ -1,62 +1,97 @@
-from fnt_auto.models.base import RWModel
+import logging
+import typing as t
+
+from pydantic import Field, computed_field, field_validator
+
+from fnt_auto.exceptions import RouteMissing
+from fnt_auto.models.base import ItemCreate, Link, RWModel
+from fnt_auto.models.serialization import type_adapter
+from fnt_auto.models.telco.base_service import (
+    DirectionOpt,
+    ServiceCategoryOpt,
+    TelcoMasterData,
+    TransmissionTechnologyOpt,
+)
+
+
+logger = logging.getLogger(__name__)
 
 
 class PathRoute(RWModel):
-    ser_elid: str = Field(rest_name='linkedElid')
-    direction: DirectionOpt = Field(rest_name='direction')
-    start_device: t.Optional[str] = Field(rest_name='multipointStartDeviceElid')
-    end_device: t.Optional[str] = Field(rest_name='multipointEndDeviceElid')
-    sequence_no: t.Optional[int] = Field(rest_name='sequenceNo')
+    ser_elid: str = Field(serialization_alias='linkedElid')
+    direction: DirectionOpt = Field(serialization_alias='direction')
+    start_device: t.Optional[str] = Field(None, serialization_alias='multipointStartDeviceElid')
+    end_device: t.Optional[str] = Field(None, serialization_alias='multipointEndDeviceElid')
+    sequence_no: t.Optional[int] = Field(None, serialization_alias='sequenceNo')
 
 class PathAttr(RWModel):
-    id: t.Optional[str] = Field(rest_name='id')
-    visible_id: t.Optional[str] = Field(rest_name='cServiceName')
-    output_port_a: t.Optional[str] = Field(rest_name='createLinkLogicalPortOutputStart')
-    output_port_z: t.Optional[str] = Field(rest_name='createLinkLogicalPortOutputEnd')
+    id: t.Optional[str] = Field(None, serialization_alias='id')
+    visible_id: t.Optional[str] = Field(None, serialization_alias='cServiceName')
+    output_port_a: t.Optional[Link] = Field(None, serialization_alias='createLinkLogicalPortOutputStart')
+    output_port_z: t.Optional[Link] = Field(None, serialization_alias='createLinkLogicalPortOutputEnd')
+
+    @field_validator('output_port_a', 'output_port_z', mode='before')
+    @classmethod
+    def port_link_validator(cls, value: t.Any) -> t.Any:
+        # Ports are given as plain elids and sent as links
+        return Link(linked_elid=value) if isinstance(value, str) else value
 
 class PathCreate(ItemCreate, PathAttr):
-    _route_over_multipoint: bool = Field(default=False)
-    _master_data: t.Optional[TelcoMasterData]
-    _start_port: t.Optional[str]
-    type: str
-    _type_elid: t.Optional[str] = Field(rest_name='createLinkServiceTypeDefinition')
-    overbooking: bool = Field(rest_name='overbooking', default=True)
-    route: t.List[PathRoute] = Field(rest_name='addRoute')
-
-
-    @validator('type')
-    def type_validator(cls, type:str, values:t.Dict[str, t.Any]):
-        print(values)
-        if type is not None:
-            values['_master_data'] = TelcoMasterData(**globals.get_type_master_data(type))
-            print(values['_master_data'])
-            values['type_elid'] = values['_master_data'].elid
-            if values['type_elid'] is None:
-                msg = f'type [{type}] not found FNT.'
-                raise ValueError(msg)
-        return type
-
-    @validator('route')
-    def route_validator(cls, route:t.List[PathRoute], values:t.Dict[str, t.Any]) -> t.List[PathRoute]:
-        if route:
-            route_info, err = fntapi.get_services_infos([hop.ser_elid for hop in route])
-            if err:
-                logger.error(err)
-                raise ApiError(err)
-            for i, hop in enumerate(route):
-                if hop.ser_elid not in route_info:
-                    msg = f'\tRouted Service [{hop.ser_elid}] not found in FNT'
-                    raise RouteMissing(msg)
-                if hop.sequence_no is None:
-                    hop.sequence_no = i+1
-                if i == 0 and values.get('_start_port') == route_info[hop.ser_elid][0]['lp_z']:
-                    hop.direction = 'BA'
-                if route_info[hop.ser_elid][0]['serviceCategory'] == ServiceCategoryOpt.MULTIPOINT:
-                    values['_route_over_multipoint'] = True
-        return route
-
-    def prepare_request(self) -> t.Dict[str, t.Any]:
-        return super().prepare_request()
+    """Structural model of a path; validating it never touches the network.
+
+    The type master data and the routed services are resolved afterwards, for a whole batch at once, by
+    `PathAPI.enrich_paths`, which then calls `apply_lookups` on every path.
+    """
+
+    _route_over_multipoint: bool = False
+    _master_data: t.Optional[TelcoMasterData] = None
+    _start_port: t.Optional[str] = None
+    type: str = Field(exclude=True)
+    overbooking: bool = Field(True, serialization_alias='overbooking')
+    route: t.List[PathRoute] = Field(default_factory=list, serialization_alias='addRoute')
+
+    def apply_lookups(
+        self,
+        master_data: t.Optional[t.Dict[str, t.Any]],
+        route_info: t.Mapping[str, t.List[t.Dict[str, t.Any]]],
+    ) -> None:
+        if master_data is None or master_data.get('elid') is None:
+            msg = f'type [{self.type}] not found FNT.'
+            raise ValueError(msg)
+        self._master_data = TelcoMasterData(**master_data)
+        route_over_multipoint = False
+        for i, hop in enumerate(self.route):
+            if hop.ser_elid not in route_info:
+                msg = f'\tRouted Service [{hop.ser_elid}] not found in FNT'
+                raise RouteMissing(msg)
+            if hop.sequence_no is None:
+                hop.sequence_no = i+1
+            if i == 0 and self._start_port is not None and self._start_port == route_info[hop.ser_elid][0].get('lp_z'):
+                hop.direction = DirectionOpt.BA
+            if route_info[hop.ser_elid][0].get('serviceCategory') == ServiceCategoryOpt.MULTIPOINT:
+                route_over_multipoint = True
+        self._route_over_multipoint = route_over_multipoint
+
+    @computed_field  # type: ignore[misc]
+    @property
+    def create_link_service_type_definition(self) -> t.Optional[Link]:
+        return Link(linked_elid=self.type_elid) if self.type_elid is not None else None
+
+    @property
+    def master_data(self) -> t.Optional[TelcoMasterData]:
+        return self._master_data
+
+    @property
+    def type_elid(self) -> t.Optional[str]:
+        return self._master_data.elid if self._master_data is not None else None
+
+    @property
+    def start_port(self) -> t.Optional[str]:
+        return self._start_port
+
+    @start_port.setter
+    def start_port(self, value: t.Optional[str]):
+        self._start_port = value
 
     @property
     def route_over_multipoint(self) -> bool:
@@ -64,14 +99,21 @@ class PathCreate(ItemCreate, PathAttr):
 
     @property
     def rest_entity(self) -> t.Optional[str]:
-        if self._master_data.service_category == ServiceCategoryOpt.PATH:
+        if self._master_data is not None and self._master_data.service_category == ServiceCategoryOpt.PATH:
             return 'serviceTelcoPath'
         return None
 
     @property
     def rest_operation(self) -> t.Optional[str]:
+        if self._master_data is None:
+            return None
         if self._master_data.transmission_technology == TransmissionTechnologyOpt.PACKET_DATA:
             return 'createPacketData'
         elif self._master_data.transmission_technology == TransmissionTechnologyOpt.CIRCUIT_SWITCHED:
             return 'create'
         return None
+
+
+def validate_paths(data: t.Iterable[t.Mapping[str, t.Any]]) -> t.List[PathCreate]:
+    # Structural validation only, one pydantic-core call for the whole batch
+    return type_adapter(t.List[PathCreate]).validate_python(list(data))
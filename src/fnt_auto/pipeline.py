@@ -0,0 +1,229 @@
+import asyncio
+import concurrent.futures
+import contextlib
+import itertools
+import logging
+import os
+import typing
+
+import numpy as np
+from pydantic import ValidationError
+
+from fnt_auto.models.geo import Feature, FeatureCollection, _arrays_to_2039
+from fnt_auto.models.zones.building import BuildingCreate
+
+
+logger = logging.getLogger(__package__)
+
+DEFAULT_CHUNK_SIZE = 1000
+
+RawFeature = typing.Dict[str, typing.Any]
+FeatureSource = typing.Union[FeatureCollection, typing.Iterable[Feature], typing.Iterable[RawFeature]]
+
+# Workers send fields back as plain tuples in this order: much cheaper to pickle than models or dicts
+_FIELDS = (
+    'name',
+    'campus_elid',
+    'c_x',
+    'c_y',
+    'c_floors_num',
+    'c_business_num',
+    'c_residential_num',
+    'description',
+    'remark',
+)
+
+
+class BuildingMapping(typing.NamedTuple):
+    """Feature property feeding each `BuildingCreate` field; None leaves the field unset."""
+
+    name: str = 'id'
+    campus_elid: typing.Union[str, None] = 'campus_elid'
+    floors: typing.Union[str, None] = 'floors'
+    business: typing.Union[str, None] = 'businesses'
+    residential: typing.Union[str, None] = 'apartments'
+    description: typing.Union[str, None] = None
+    remark: typing.Union[str, None] = None
+    default_campus_elid: typing.Union[str, None] = None
+
+
+class ChunkResult(typing.NamedTuple):
+    values: typing.List[typing.Tuple[typing.Any, ...]]
+    rejected: typing.List[typing.Tuple[int, str]]
+
+
+def _property(properties: typing.Mapping[str, typing.Any], key: typing.Union[str, None]) -> typing.Any:
+    if key is None:
+        return None
+    value = properties.get(key)
+    # GIS exports use empty strings for missing attributes
+    return None if value == '' else value
+
+
+def _describe(exc: ValidationError) -> str:
+    return '; '.join(f"{'.'.join(map(str, error['loc']))}: {error['msg']}" for error in exc.errors())
+
+
+def _anchor(raw: RawFeature) -> typing.Tuple[float, float]:
+    geometry = raw.get('geometry') or {}
+    if geometry.get('type') == 'Point':
+        x, y = geometry['coordinates'][:2]
+        return float(x), float(y)
+    point = Feature.model_validate(raw).shapely.representative_point()
+    return point.x, point.y
+
+
+def convert_chunk(features: typing.List[RawFeature], mapping: BuildingMapping, start: int = 0) -> ChunkResult:
+    """Validate a chunk of raw features as buildings located at their ITM anchor point.
+
+    Runs in pipeline worker processes, so it only takes and returns picklable plain data. Rejected features are
+    reported by their position in the whole input (`start` is the position of the chunk).
+    """
+    rejected: typing.List[typing.Tuple[int, str]] = []
+    rows: typing.List[typing.Tuple[int, typing.Mapping[str, typing.Any]]] = []
+    anchors: typing.List[typing.Tuple[float, float]] = []
+    for index, raw in enumerate(features, start):
+        try:
+            anchors.append(_anchor(raw))
+        except (KeyError, TypeError, ValueError) as exc:
+            rejected.append((index, f'invalid geometry: {exc}'))
+            continue
+        rows.append((index, raw.get('properties') or {}))
+
+    # One pyproj call for the whole chunk
+    xs, ys = _arrays_to_2039(
+        np.array([x for x, _ in anchors], dtype=np.float64), np.array([y for _, y in anchors], dtype=np.float64)
+    )
+    values = []
+    for (index, properties), x, y in zip(rows, xs.tolist(), ys.tolist()):
+        name = _property(properties, mapping.name)
+        try:
+            building = BuildingCreate(
+                name=str(name) if name is not None else None,
+                campus_elid=_property(properties, mapping.campus_elid) or mapping.default_campus_elid,
+                c_x=x,
+                c_y=y,
+                c_floors_num=_property(properties, mapping.floors),
+                c_business_num=_property(properties, mapping.business),
+                c_residential_num=_property(properties, mapping.residential),
+                description=_property(properties, mapping.description),
+                remark=_property(properties, mapping.remark),
+            )
+        except ValidationError as exc:
+            rejected.append((index, _describe(exc)))
+            continue
+        values.append(tuple(getattr(building, field) for field in _FIELDS))
+    # Geometry and validation errors are found in two passes, report them in input order
+    rejected.sort()
+    return ChunkResult(values, rejected)
+
+
+def _raw_chunks(features: FeatureSource, size: int) -> typing.Iterator[typing.List[RawFeature]]:
+    iterator = iter(features.features if isinstance(features, FeatureCollection) else features)
+    while True:
+        chunk = [
+            feature.model_dump() if isinstance(feature, Feature) else feature
+            for feature in itertools.islice(iterator, size)
+        ]
+        if not chunk:
+            return
+        yield chunk
+
+
+class BuildingPipeline:
+    """Converts features to `BuildingCreate` items in worker processes while the caller consumes them.
+
+    Chunks of `chunk_size` features are reprojected and validated in a `ProcessPoolExecutor`, with at most
+    `max_pending` chunks queued, so a slow consumer (e.g. `create_buildings`) holds back the reader instead of the
+    whole layer piling up in memory. Items come out in input order. Features that cannot be converted are logged
+    and collected in `rejected` as (position, error) pairs.
+    """
+
+    def __init__(
+        self,
+        features: FeatureSource,
+        mapping: typing.Union[BuildingMapping, None] = None,
+        *,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        workers: typing.Union[int, None] = None,
+        max_pending: typing.Union[int, None] = None,
+        executor: typing.Union[concurrent.futures.Executor, None] = None,
+    ) -> None:
+        if chunk_size < 1:
+            msg = f'chunk_size must be at least 1, got {chunk_size}'
+            raise ValueError(msg)
+        self._features = features
+        self.mapping = mapping or BuildingMapping()
+        self.chunk_size = chunk_size
+        self.workers = workers or os.cpu_count() or 1
+        self.max_pending = max_pending or 2 * self.workers
+        self._executor = executor
+        self._started = False
+        self.converted = 0
+        self.rejected: typing.List[typing.Tuple[int, str]] = []
+
+    def __aiter__(self) -> typing.AsyncIterator[BuildingCreate]:
+        if self._started:
+            msg = 'BuildingPipeline can only be iterated once'
+            raise RuntimeError(msg)
+        self._started = True
+        return self._run()
+
+    async def collect(self) -> typing.List[BuildingCreate]:
+        return [building async for building in self]
+
+    async def _run(self) -> typing.AsyncIterator[BuildingCreate]:
+        executor = self._executor or concurrent.futures.ProcessPoolExecutor(max_workers=self.workers)
+        queue: 'asyncio.Queue[typing.Union[asyncio.Future[ChunkResult], None]]' = asyncio.Queue(self.max_pending)
+        producer = asyncio.ensure_future(self._produce(executor, queue))
+        try:
+            while True:
+                future = await queue.get()
+                if future is None:
+                    break
+                result = await future
+                for index, error in result.rejected:
+                    logger.debug('Feature %d was not converted to a building: %s', index, error)
+                self.rejected.extend(result.rejected)
+                self.converted += len(result.values)
+                for values in result.values:
+                    # Already validated in the worker
+                    yield BuildingCreate.model_construct(
+                        **{field: value for field, value in zip(_FIELDS, values) if value is not None}
+                    )
+            await producer
+        finally:
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError, Exception):
+                await producer
+            while not queue.empty():
+                future = queue.get_nowait()
+                if future is not None:
+                    future.cancel()
+            if self._executor is None:
+                executor.shutdown(wait=False, cancel_futures=True)
+            if self.rejected:
+                logger.warning('Building pipeline rejected %d features, see `rejected`', len(self.rejected))
+            logger.info('Building pipeline converted %d features', self.converted)
+
+    async def _produce(
+        self,
+        executor: concurrent.futures.Executor,
+        queue: 'asyncio.Queue[typing.Union[asyncio.Future[ChunkResult], None]]',
+    ) -> None:
+        loop = asyncio.get_running_loop()
+        chunks = _raw_chunks(self._features, self.chunk_size)
+        start = 0
+        try:
+            while True:
+                # Reading may mean parsing a streamed file, so keep it off the event loop too
+                chunk = await loop.run_in_executor(None, next, chunks, None)
+                if chunk is None:
+                    break
+                await queue.put(loop.run_in_executor(executor, convert_chunk, chunk, self.mapping, start))
+                start += len(chunk)
+        except Exception:
+            # Wake the consumer, which then re-raises the error by awaiting this task
+            await queue.put(None)
+            raise
+        await queue.put(None)
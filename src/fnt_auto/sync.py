@@ -0,0 +1,3 @@
+from fnt_auto._sync_api import SyncFntAPI, ThreadedBulkJob
+
+__all__ = ['SyncFntAPI', 'ThreadedBulkJob']
@@ -0,0 +1,49 @@
+import typing
+
+import pytest
+
+from benchmarks.fake_fnt import FakeFNT
+from fnt_auto._async_api import AsyncFntAPI
+from fnt_auto.models.zones.building import BuildingCreate
+from fnt_auto.sync import SyncFntAPI
+
+
+BASE_URL = 'http://fnt.test'
+
+BuildingFactory = typing.Callable[..., typing.List[BuildingCreate]]
+
+
+@pytest.fixture
+def server() -> FakeFNT:
+    """In-process FNT gateway; tests adjust its public options (latency, error_rate, ...) as needed."""
+    return FakeFNT()
+
+
+@pytest.fixture
+def buildings() -> BuildingFactory:
+    """Builds `B<i>` buildings in a campus, with `c_x` set to `i`."""
+
+    def make(indices: typing.Iterable[int], campus_elid: str = 'C1') -> typing.List[BuildingCreate]:
+        return [BuildingCreate(name=f'B{i}', campus_elid=campus_elid, c_x=float(i)) for i in indices]
+
+    return make
+
+
+@pytest.fixture
+def client(server: FakeFNT) -> typing.Callable[..., AsyncFntAPI]:
+    """Opens a new async client on `server`; keyword arguments go to `AsyncFntAPI`."""
+
+    def make(**kwargs: typing.Any) -> AsyncFntAPI:
+        return AsyncFntAPI(BASE_URL, 'user', 'password', transport=server.async_transport(), **kwargs)
+
+    return make
+
+
+@pytest.fixture
+def sync_client(server: FakeFNT) -> typing.Callable[..., SyncFntAPI]:
+    """Opens a new sync client on `server`; keyword arguments go to `SyncFntAPI`."""
+
+    def make(**kwargs: typing.Any) -> SyncFntAPI:
+        return SyncFntAPI(BASE_URL, 'user', 'password', transport=server.sync_transport(), **kwargs)
+
+    return make
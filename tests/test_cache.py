@@ -0,0 +1,41 @@
+import asyncio
+import typing
+
+import pytest
+
+from fnt_auto._async_api.cache import CachedLookup
+
+
+def test_misses_are_loaded_in_one_batch() -> None:
+    batches: typing.List[typing.List[int]] = []
+
+    async def load_many(keys: typing.List[int]) -> typing.Dict[int, int]:
+        batches.append(keys)
+        return {key: key * 2 for key in keys if key != 3}
+
+    async def main() -> typing.List[typing.Union[int, None]]:
+        lookup = CachedLookup(load_many, batch_window=0.01)
+        values = await asyncio.gather(*(lookup.get(key) for key in range(5)))
+        await lookup.get(1)
+        return values
+
+    assert asyncio.run(main()) == [0, 2, 4, None, 8]
+    assert batches == [[0, 1, 2, 3, 4]]
+
+
+def test_aclose_cancels_pending_loads() -> None:
+    async def load_many(_keys: typing.List[int]) -> typing.Dict[int, int]:
+        await asyncio.sleep(60)
+        return {}
+
+    async def main() -> None:
+        running = CachedLookup(load_many, batch_window=0)
+        queued = CachedLookup(load_many, batch_window=60)
+        waiters = [asyncio.ensure_future(running.get(1)), asyncio.ensure_future(queued.get(2))]
+        await asyncio.sleep(0.01)
+        await asyncio.wait_for(asyncio.gather(running.aclose(), queued.aclose()), 1)
+        for waiter in waiters:
+            with pytest.raises(asyncio.CancelledError):
+                await asyncio.wait_for(waiter, 1)
+
+    asyncio.run(main())
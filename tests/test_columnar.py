@@ -0,0 +1,20 @@
+import typing
+
+import shapely
+
+from fnt_auto.models.columnar import ColumnarFeatureCollection
+
+
+def test_to_shapely_keeps_feature_dimensions() -> None:
+    raw: typing.List[typing.Dict[str, typing.Any]] = [
+        {'geometry': {'type': 'Point', 'coordinates': [1.0, 2.0]}, 'properties': {}},
+        {'geometry': {'type': 'Point', 'coordinates': [3.0, 4.0, 5.0]}, 'properties': {}},
+        {'geometry': {'type': 'LineString', 'coordinates': [[0.0, 0.0], [1.0, 1.0]]}, 'properties': {}},
+        {'geometry': {'type': 'LineString', 'coordinates': [[0.0, 0.0, 1.0], [1.0, 1.0, 2.0]]}, 'properties': {}},
+    ]
+    collection = ColumnarFeatureCollection.from_raw(raw)
+    geometries = collection.to_shapely()
+    assert shapely.has_z(geometries).tolist() == [False, True, False, True]
+    for geometry, feature in zip(geometries, collection):
+        assert geometry.equals_exact(feature.shapely, 0)
+        assert shapely.has_z(geometry) == shapely.has_z(feature.shapely)
@@ -0,0 +1,27 @@
+import typing
+
+import pytest
+
+from fnt_auto.models.dag import DependencyCycleError, DependencyGraph
+
+
+def _graph(edges: typing.Dict[str, typing.List[str]]) -> 'DependencyGraph[str]':
+    return DependencyGraph(edges, key=lambda name: name, references=lambda name: edges[name])
+
+
+def test_levels_follow_dependencies() -> None:
+    # A diamond, plus a reference outside the batch that is ignored
+    graph = _graph({'d': ['b', 'c'], 'b': ['a'], 'c': ['a', 'existing'], 'a': [], 'e': []})
+    assert graph.levels() == [['a', 'e'], ['b', 'c'], ['d']]
+    assert graph.parents(0) == ['b', 'c']
+
+
+def test_cycle_is_rejected() -> None:
+    graph = _graph({'a': ['c'], 'b': ['a'], 'c': ['b'], 'd': []})
+    with pytest.raises(DependencyCycleError, match=r'\[0, 1, 2\]'):
+        graph.levels()
+
+
+def test_duplicate_key_is_rejected() -> None:
+    with pytest.raises(ValueError, match='duplicate key'):
+        DependencyGraph(['a', 'a'], key=lambda name: name, references=lambda _name: [])
@@ -0,0 +1,33 @@
+import typing
+
+from fnt_auto.models.diff import diff_layers
+from fnt_auto.models.geo import Feature, FeatureCollection
+
+
+def _layer(points: typing.Sequence[typing.Tuple[float, float]], **properties: typing.Any) -> FeatureCollection:
+    return FeatureCollection(
+        features=[
+            Feature(geometry={'type': 'Point', 'coordinates': [x, y]}, properties={'n': i, **properties})
+            for i, (x, y) in enumerate(points)
+        ]
+    )
+
+
+def test_unchanged_changed_added_removed() -> None:
+    old = _layer([(0, 0), (10, 0), (20, 0)])
+    new = _layer([(0, 0), (10, 0), (30, 0)])
+    new.features[1].properties['name'] = 'x'
+    diff = diff_layers(old, new, key='n')
+    assert (len(diff.added), len(diff.removed), len(diff.moved), len(diff.changed), diff.unchanged) == (0, 0, 1, 1, 1)
+    assert diff.changed[0].changes == {'name': (None, 'x')}
+    assert diff.moved[0].new.geometry.coordinates == [30, 0]
+
+
+def test_nearest_pairing_falls_back_to_the_next_closest_old_feature() -> None:
+    # Both new features are closest to the old one at 0; the one at 1.4 still has the old one at 3 within reach
+    old = _layer([(0, 0), (3, 0)], kind='old')
+    new = _layer([(0.5, 0), (1.4, 0)], kind='new')
+    diff = diff_layers(old, new, properties=['kind'], match_distance=2)
+    assert not diff.added and not diff.removed
+    pairs = sorted((change.old.geometry.coordinates[0], change.new.geometry.coordinates[0]) for change in diff.moved)
+    assert pairs == [(0, 0.5), (3, 1.4)]
@@ -0,0 +1,72 @@
+import typing
+
+import pytest
+
+from fnt_auto.models.columnar import ColumnarFeatureCollection
+from fnt_auto.models.geo import Feature, FeatureCollection, Point
+from fnt_auto.models.query import Eq
+
+
+# A point in Tel Aviv in WGS84, EPSG:2039 (ITM) and the legacy grid (ITM minus a fixed offset)
+WGS84_POINT = (34.78, 32.08)
+ITM_POINT = (179384.794, 665267.782)
+LEGACY_POINT = (ITM_POINT[0] - 50000, ITM_POINT[1] - 500000)
+
+MIXED_FEATURES: typing.List[typing.Dict[str, typing.Any]] = [
+    {'geometry': {'type': 'Point', 'coordinates': [*WGS84_POINT, 5.0]}, 'properties': {}},
+    {'geometry': {'type': 'LineString', 'coordinates': [list(WGS84_POINT), [*ITM_POINT, 7.0]]}, 'properties': {}},
+    {'geometry': {'type': 'Point', 'coordinates': list(LEGACY_POINT)}, 'properties': {}},
+]
+
+
+def _point(x: float, y: float, **properties: object) -> Feature:
+    return Feature(geometry={'type': 'Point', 'coordinates': [x, y]}, properties=properties)
+
+
+def test_spatial_index_notices_direct_list_edits() -> None:
+    collection = FeatureCollection(features=[_point(0, 0, name='a'), _point(10, 10, name='b')])
+    assert collection.closest(Point(coordinates=[0.5, 0.5])) is collection.features[0]
+    appended = _point(0.5, 0.5, name='c')
+    collection.features.append(appended)
+    assert collection.closest(Point(coordinates=[0.5, 0.5])) is appended
+
+
+def test_invalidate_index_after_in_place_edits() -> None:
+    collection = FeatureCollection(features=[_point(0, 0, layer='road'), _point(10, 10, layer='road')])
+    collection.create_index('layer')
+    assert len(collection.query(Eq('layer', 'road'))) == 2
+    collection.closest(Point(coordinates=[9, 9]))
+    collection.features[1] = _point(1, 1, layer='building')
+    collection.invalidate_index()
+    assert collection.closest(Point(coordinates=[9, 9])) is collection.features[1]
+    assert len(collection.query(Eq('layer', 'road'))) == 1
+
+
+def _points(collection: typing.Iterable[Feature]) -> typing.List[typing.List[float]]:
+    points: typing.List[typing.List[float]] = []
+    for feature in collection:
+        coordinates: typing.Any = feature.geometry.coordinates  # type: ignore[union-attr]
+        points.extend(coordinates if feature.geometry.type == 'LineString' else [coordinates])
+    return points
+
+
+@pytest.mark.parametrize('columnar', [False, True])
+def test_convert_mixed_crs_collection(columnar: bool) -> None:
+    raw = [{'type': 'Feature', **feature} for feature in MIXED_FEATURES]
+    collection: typing.Union[FeatureCollection, ColumnarFeatureCollection]
+    if columnar:
+        collection = ColumnarFeatureCollection.from_raw(raw)
+    else:
+        collection = FeatureCollection.model_validate({'type': 'FeatureCollection', 'features': raw})
+
+    # The WGS84 and legacy coordinates are converted, the ITM one is left alone and z values are kept
+    collection.convert_to_2039()
+    points = _points(collection)
+    assert len(points) == 4
+    for point, itm in zip(points, [[*ITM_POINT, 5.0], list(ITM_POINT), [*ITM_POINT, 7.0], list(ITM_POINT)]):
+        assert point == pytest.approx(itm, abs=1e-3)
+
+    collection.convert_to_4326()
+    points = _points(collection)
+    for point, wgs84 in zip(points, [[*WGS84_POINT, 5.0], list(WGS84_POINT), [*WGS84_POINT, 7.0], list(WGS84_POINT)]):
+        assert point == pytest.approx(wgs84, abs=1e-6)
@@ -0,0 +1,38 @@
+import asyncio
+import pathlib
+import typing
+
+from benchmarks.fake_fnt import FakeFNT
+from fnt_auto._async_api import AsyncFntAPI, JobJournal
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.models.zones.building import BuildingCreate
+from tests.conftest import BuildingFactory
+
+
+def test_resume_skips_completed_items(
+    tmp_path: pathlib.Path,
+    server: FakeFNT,
+    client: typing.Callable[..., AsyncFntAPI],
+    buildings: BuildingFactory,
+) -> None:
+    path = tmp_path / 'job.jsonl'
+
+    async def create(items: typing.List[BuildingCreate]) -> int:
+        async with client() as api:
+            job = api.create_buildings(items, concurrency=4, journal=JobJournal(path))
+            await job.run()
+        return job.resumed
+
+    first = buildings(range(6))
+    assert asyncio.run(create(first)) == 0
+    # The process died while writing the next record
+    with path.open('ab') as fp:
+        fp.write(b'{"fingerprint": "')
+
+    resumed = buildings(range(10))
+    assert asyncio.run(create(resumed)) == len(first)
+    assert server.calls['building.create'] == 10
+    assert all(building.status == ItemStatusOpt.SUCCESS for building in resumed)
+    assert [building.elid for building in resumed[:6]] == [building.elid for building in first]
+    assert len({building.elid for building in resumed}) == 10
+    assert len(JobJournal(path).records) == 10
@@ -0,0 +1,45 @@
+import asyncio
+import typing
+
+from benchmarks.fake_fnt import FakeFNT
+from fnt_auto._async_api import AsyncFntAPI
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.models.telco.service.path import PathCreate, validate_paths
+
+
+def _path(path_id: str, *route: str) -> typing.Dict[str, typing.Any]:
+    return {'id': path_id, 'type': 'ETH', 'route': [{'ser_elid': elid, 'direction': 'AB'} for elid in route]}
+
+
+def test_provision_paths_in_route_order(server: FakeFNT, client: typing.Callable[..., AsyncFntAPI]) -> None:
+    server.entities['TD1'] = {
+        'elid': 'TD1',
+        'name': 'ETH',
+        'serviceCategory': 'PATH',
+        'transmissionTechnology': 'PACKET_DATA',
+    }
+    server.entities['S1'] = {'elid': 'S1', 'serviceCategory': 'BEARER'}
+    # B runs over A; X is routed over a missing service, so Y over X and Z over Y and A are never attempted
+    paths = validate_paths(
+        [_path('Z', 'Y', 'A'), _path('B', 'A'), _path('A', 'S1'), _path('Y', 'X'), _path('X', 'MISSING')]
+    )
+    by_id: typing.Dict[typing.Any, PathCreate] = {path.id: path for path in paths}
+
+    async def run() -> None:
+        async with client() as api:
+            stats = await api.provision_paths(paths)
+        assert stats.statuses == {ItemStatusOpt.SUCCESS: 2, ItemStatusOpt.FAILED: 1, ItemStatusOpt.SKIPPED: 2}
+
+    asyncio.run(run())
+    assert server.calls['serviceTelcoPath.createPacketData'] == 2
+    assert [by_id[path_id].status for path_id in 'ABXYZ'] == [
+        ItemStatusOpt.SUCCESS,
+        ItemStatusOpt.SUCCESS,
+        ItemStatusOpt.FAILED,
+        ItemStatusOpt.SKIPPED,
+        ItemStatusOpt.SKIPPED,
+    ]
+    # B's hop was rewritten to the elid A got, and sent that way
+    a_elid = by_id['A'].elid
+    assert [hop.ser_elid for hop in by_id['B'].route] == [a_elid]
+    assert server.entities[typing.cast(str, by_id['B'].elid)]['addRoute'][0]['linkedElid'] == a_elid
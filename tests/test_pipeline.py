@@ -0,0 +1,62 @@
+import asyncio
+import concurrent.futures
+import typing
+
+import pytest
+
+from fnt_auto.models.zones.building import BuildingCreate
+from fnt_auto.pipeline import _FIELDS, BuildingMapping, BuildingPipeline, convert_chunk
+
+
+MAPPING = BuildingMapping(default_campus_elid='C1', remark='note')
+
+
+def _raw(index: int) -> typing.Dict[str, typing.Any]:
+    # Every fourth feature has no geometry and every fifth no name, so both are rejected
+    geometry = None if index % 4 == 3 else {'type': 'Point', 'coordinates': [34.78 + index / 1000, 32.08]}
+    properties = {'id': None if index % 5 == 4 else f'B{index}', 'floors': index, 'note': ''}
+    return {'type': 'Feature', 'geometry': geometry, 'properties': properties}
+
+
+def test_convert_chunk_reports_positions_in_the_whole_input() -> None:
+    polygon = {
+        'type': 'Feature',
+        'geometry': {
+            'type': 'Polygon',
+            'coordinates': [[[34.78, 32.08], [34.79, 32.08], [34.79, 32.09], [34.78, 32.08]]],
+        },
+        'properties': {'id': 'P', 'campus_elid': 'C2', 'apartments': '12'},
+    }
+    result = convert_chunk([_raw(0), _raw(3), _raw(4), polygon], MAPPING, start=100)
+    assert [index for index, _ in result.rejected] == [101, 102]
+    assert result.rejected[0][1].startswith('invalid geometry')
+    assert result.rejected[1][1].startswith('name')
+    rows = [dict(zip(_FIELDS, values)) for values in result.values]
+    assert [(row['name'], row['campus_elid'], row['remark']) for row in rows] == [('B0', 'C1', None), ('P', 'C2', None)]
+    assert (rows[0]['c_x'], rows[0]['c_y']) == pytest.approx((179384.794, 665267.782), abs=1e-3)
+    assert rows[1]['c_residential_num'] == 12
+
+
+def test_constructed_buildings_match_validated_ones() -> None:
+    values = convert_chunk([_raw(1)], MAPPING).values[0]
+    constructed = BuildingCreate.model_construct(
+        **{field: value for field, value in zip(_FIELDS, values) if value is not None}
+    )
+    validated = BuildingCreate(**dict(zip(_FIELDS, values)))
+    assert constructed.to_rest_request_bytes() == validated.to_rest_request_bytes()
+
+
+def test_pipeline_keeps_input_order_across_chunks() -> None:
+    async def run(pipeline: BuildingPipeline) -> typing.List[BuildingCreate]:
+        return await pipeline.collect()
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        pipeline = BuildingPipeline(
+            (_raw(index) for index in range(20)), MAPPING, chunk_size=3, max_pending=2, executor=executor
+        )
+        buildings = asyncio.run(run(pipeline))
+
+    rejected = [index for index in range(20) if index % 4 == 3 or index % 5 == 4]
+    assert [index for index, _ in pipeline.rejected] == rejected
+    assert [building.name for building in buildings] == [f'B{i}' for i in range(20) if i not in rejected]
+    assert pipeline.converted == len(buildings)
@@ -0,0 +1,53 @@
+import pickle
+import typing
+
+from fnt_auto.models.geo import Feature, FeatureCollection
+from fnt_auto.models.query import Eq, Prefix, Range
+
+
+def _collection() -> FeatureCollection:
+    return FeatureCollection(
+        features=[
+            Feature(
+                geometry={'type': 'Point', 'coordinates': [34.8 + i / 1000, 32.0]},
+                properties={'layer': 'building' if i % 2 else 'road', 'street_en': f'Herzl {i}', 'number': i},
+            )
+            for i in range(10)
+        ]
+    )
+
+
+def _numbers(collection: FeatureCollection) -> typing.List[int]:
+    return [feature.properties['number'] for feature in collection]
+
+
+def test_indexed_query_matches_scan() -> None:
+    collection = _collection()
+    query = Eq('layer', 'building') & Range('number', 3, 7) | Prefix('street_en', 'Herzl 0')
+    expected = _numbers(collection.filter(lambda feature: query.matches(feature.properties)))
+    collection.create_index('layer', 'number', 'street_en')
+    assert _numbers(collection.query(query)) == expected == [0, 3, 5, 7]
+
+
+def test_collection_property_methods_keep_indexes_current() -> None:
+    collection = _collection()
+    collection.create_index('layer', 'number')
+    assert _numbers(collection.query(Eq('layer', 'building'))) == [1, 3, 5, 7, 9]
+    collection.set_property(collection.features[0], 'layer', 'building')
+    collection.remove_property(collection.features[1], 'layer')
+    collection.add_property(collection.features[1], 'flag', True)
+    assert _numbers(collection.query(Eq('layer', 'building'))) == [0, 3, 5, 7, 9]
+    assert _numbers(collection.query(Eq('layer', None))) == [1]
+
+
+def test_indexed_collection_pickles() -> None:
+    collection = _collection()
+    collection.create_index('layer')
+    collection.query(Eq('layer', 'road'))
+    collection.spatial_index  # noqa: B018
+    restored = pickle.loads(pickle.dumps(collection))  # noqa: S301
+    pickle.dumps(collection.features[0])
+    # Rebuilt for the restored features, not carried over from the originals
+    restored.set_property(restored.features[1], 'layer', 'road')
+    assert _numbers(restored.query(Eq('layer', 'road'))) == [0, 1, 2, 4, 6, 8]
+    assert _numbers(collection.query(Eq('layer', 'road'))) == [0, 2, 4, 6, 8]
@@ -0,0 +1,81 @@
+import asyncio
+import typing
+
+import pytest
+
+from benchmarks.fake_fnt import FakeFNT
+from fnt_auto._async_api import AsyncFntAPI
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.models.reconcile import SyncActionOpt, SyncPlan
+from fnt_auto.models.zones.building import BuildingCreate
+from tests.conftest import BuildingFactory
+
+
+@pytest.fixture
+def sync(
+    server: FakeFNT, client: typing.Callable[..., AsyncFntAPI]
+) -> typing.Callable[..., 'SyncPlan[BuildingCreate]']:
+    """Runs `sync_buildings` against a campus C1 holding B1 and B2, and a campus C2 that also has a B1."""
+    server.entities['E1'] = {'elid': 'E1', 'name': 'B1', 'campusElid': 'C1', 'cX': 1.0}
+    server.entities['E2'] = {'elid': 'E2', 'name': 'B2', 'campusElid': 'C1', 'cX': 5.0}
+    server.entities['E3'] = {'elid': 'E3', 'name': 'B1', 'campusElid': 'C2', 'cX': 9.0}
+
+    def run(buildings: typing.List[BuildingCreate], **kwargs: typing.Any) -> 'SyncPlan[BuildingCreate]':
+        async def send() -> 'SyncPlan[BuildingCreate]':
+            async with client() as api:
+                return await api.sync_buildings(buildings, **kwargs)
+
+        return asyncio.run(send())
+
+    return run
+
+
+def _actions(plan: 'SyncPlan[BuildingCreate]') -> typing.List[typing.Tuple[str, SyncActionOpt, typing.Any]]:
+    return [(plan_item.item.name, plan_item.action, plan_item.elid) for plan_item in plan]
+
+
+@pytest.mark.parametrize('dry_run', [True, False])
+def test_sync_buildings_plan(
+    server: FakeFNT,
+    sync: typing.Callable[..., 'SyncPlan[BuildingCreate]'],
+    buildings: BuildingFactory,
+    dry_run: bool,
+) -> None:
+    plan = sync(buildings([1, 2, 3]), dry_run=dry_run)
+    assert _actions(plan) == [
+        ('B1', SyncActionOpt.NOOP, 'E1'),
+        ('B2', SyncActionOpt.UPDATE, 'E2'),
+        ('B3', SyncActionOpt.CREATE, None),
+    ]
+    assert plan.items[1].changes == {'cX': 2.0}
+    assert server.calls['building.query'] == 1
+    if dry_run:
+        assert server.calls['building.create'] == server.calls['building.update'] == 0
+        return
+    assert server.calls['building.create'] == server.calls['building.update'] == 1
+    assert [plan_item.item.status for plan_item in plan] == [
+        ItemStatusOpt.UNCHANGED,
+        ItemStatusOpt.UPDATED,
+        ItemStatusOpt.SUCCESS,
+    ]
+
+
+def test_dry_run_leaves_items_unchanged(
+    sync: typing.Callable[..., 'SyncPlan[BuildingCreate]'], buildings: BuildingFactory
+) -> None:
+    items = buildings([1, 2, 3])
+    sync(items, dry_run=True)
+    assert [building.elid for building in items] == [None, None, None]
+    assert all(building.status == ItemStatusOpt.INIT for building in items)
+
+
+def test_duplicate_desired_buildings_keep_the_first(
+    server: FakeFNT, sync: typing.Callable[..., 'SyncPlan[BuildingCreate]'], buildings: BuildingFactory
+) -> None:
+    first, duplicate = buildings([2, 3])
+    duplicate.name = 'B2'
+    plan = sync([first, duplicate])
+    assert _actions(plan) == [('B2', SyncActionOpt.UPDATE, 'E2')]
+    assert server.calls['building.update'] == 1
+    assert first.status == ItemStatusOpt.UPDATED
+    assert duplicate.status == ItemStatusOpt.SKIPPED
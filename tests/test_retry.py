@@ -0,0 +1,50 @@
+import asyncio
+import typing
+
+import pytest
+
+from benchmarks.fake_fnt import FakeFNT
+from fnt_auto._async_api import AsyncFntAPI, RequestScheduler, RetryPolicy
+from fnt_auto.models.api import RestResponse
+from tests.conftest import BuildingFactory
+
+
+MAX_ATTEMPTS = 3
+
+
+@pytest.fixture
+def request_once(
+    server: FakeFNT, client: typing.Callable[..., AsyncFntAPI], buildings: BuildingFactory
+) -> typing.Callable[[str, int], RestResponse]:
+    """Sends one create or query while every entity request fails with the given status."""
+
+    def run(operation: str, status: int) -> RestResponse:
+        server.error_rate, server.error_status = 1.0, status
+        scheduler = RequestScheduler(retry=RetryPolicy(max_attempts=MAX_ATTEMPTS, backoff_base=0.0, jitter=False))
+
+        async def send() -> RestResponse:
+            async with client(scheduler=scheduler) as api:
+                if operation == 'create':
+                    return await api.create_building(buildings([1])[0])
+                return await api.rest_request('building', 'query', {'restrictions': {}})
+
+        return asyncio.run(send())
+
+    return run
+
+
+@pytest.mark.parametrize('status', [502, 504])
+def test_create_is_not_retried_on_gateway_errors(
+    server: FakeFNT, request_once: typing.Callable[[str, int], RestResponse], status: int
+) -> None:
+    # The gateway may have processed the create before failing, a retry could create a duplicate
+    assert request_once('create', status).status_code == status
+    assert server.calls['injected_error'] == 1
+
+
+@pytest.mark.parametrize(('operation', 'status'), [('create', 503), ('query', 502), ('query', 504)])
+def test_retried_until_attempts_run_out(
+    server: FakeFNT, request_once: typing.Callable[[str, int], RestResponse], operation: str, status: int
+) -> None:
+    assert request_once(operation, status).status_code == status
+    assert server.calls['injected_error'] == MAX_ATTEMPTS
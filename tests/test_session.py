@@ -0,0 +1,80 @@
+import asyncio
+import typing
+
+import httpx
+
+from benchmarks.fake_fnt import FakeFNT
+from fnt_auto._async_api import AsyncFntAPI
+from fnt_auto._core import is_session_expired
+from fnt_auto.models.base import ItemStatusOpt
+from fnt_auto.sync import SyncFntAPI
+from tests.conftest import BuildingFactory
+
+
+# Long enough for a batch of requests to be in flight on the same session when it expires
+LATENCY = 0.01
+
+
+def test_async_session_is_renewed_once(
+    server: FakeFNT, client: typing.Callable[..., AsyncFntAPI], buildings: BuildingFactory
+) -> None:
+    server.latency = LATENCY
+    first, second = buildings(range(10)), buildings(range(10, 20))
+
+    async def run() -> None:
+        async with client() as api:
+            await api.create_buildings(first, concurrency=10).run()
+            assert server.calls['login'] == 1
+            server.expire_session()
+            await api.create_buildings(second, concurrency=10).run()
+
+    asyncio.run(run())
+    assert server.calls['expired'] == 10
+    assert server.calls['login'] == 2
+    assert all(building.status == ItemStatusOpt.SUCCESS for building in first + second)
+
+
+def test_sync_session_is_renewed_once(
+    server: FakeFNT, sync_client: typing.Callable[..., SyncFntAPI], buildings: BuildingFactory
+) -> None:
+    server.latency = LATENCY
+    first, second = buildings(range(10)), buildings(range(10, 20))
+    with sync_client() as api:
+        api.create_buildings(first, concurrency=10).run()
+        assert server.calls['login'] == 1
+        server.expire_session()
+        api.create_buildings(second, concurrency=10).run()
+    assert server.calls['expired'] == 10
+    assert server.calls['login'] == 2
+    assert all(building.status == ItemStatusOpt.SUCCESS for building in first + second)
+
+
+def test_explicit_session_is_never_renewed(server: FakeFNT, client: typing.Callable[..., AsyncFntAPI]) -> None:
+    async def run() -> int:
+        async with client() as api:
+            response = await api.rest_request('building', 'query', {'restrictions': {}}, session_id='stale')
+        return response.status_code
+
+    assert asyncio.run(run()) == 401
+    assert server.calls['expired'] == 1
+    assert server.calls['login'] == 0
+
+
+def test_forbidden_is_not_an_expired_session(server: FakeFNT, client: typing.Callable[..., AsyncFntAPI]) -> None:
+    async def run() -> int:
+        async with client() as api:
+            await api.login()
+            server.error_rate, server.error_status = 1.0, 403
+            response = await api.rest_request('building', 'query', {'restrictions': {}})
+        return response.status_code
+
+    assert asyncio.run(run()) == 403
+    assert server.calls['injected_error'] == 1
+    assert server.calls['login'] == 1
+
+
+def test_forbidden_with_session_message_is_expired() -> None:
+    expired = httpx.Response(403, json={'status': {'message': 'Session expired'}})
+    forbidden = httpx.Response(403, json={'status': {'message': 'No permission for campus C1'}})
+    assert is_session_expired(expired)
+    assert not is_session_expired(forbidden)
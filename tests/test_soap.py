@@ -0,0 +1,74 @@
+import typing
+
+import pytest
+
+from fnt_auto._common.soap import SoapResponseParser, SoapTemplate, parse_soap_response
+from fnt_auto.models.api import SoapResponse
+
+
+ENVELOPE = (
+    '<soapenv:Envelope xmlns:soapenv="http://schemas.xmlsoap.org/soap/envelope/"><soapenv:Body>{}</soapenv:Body>'
+    '</soapenv:Envelope>'
+)
+
+
+def _chunked(content: bytes, size: int) -> SoapResponse:
+    parser = SoapResponseParser(200)
+    for start in range(0, len(content), size):
+        parser.feed(content[start : start + size])
+    return parser.close()
+
+
+def test_render_escapes_parameters() -> None:
+    template = SoapTemplate('<update><sid>{sid}</sid><remark a="{{x}}">{remark}</remark></update>')
+    assert template.fields == frozenset({'remark'})
+    rendered = template.render('S1', {'remark': '<b> & "quoted" \'single\''})
+    assert rendered == (
+        b'<update><sid>S1</sid><remark a="{x}">&lt;b&gt; &amp; &quot;quoted&quot; &apos;single&apos;</remark></update>'
+    )
+
+
+def test_render_missing_parameter() -> None:
+    with pytest.raises(KeyError, match='Missing SOAP template parameter: remark'):
+        SoapTemplate('<update>{sid}{remark}</update>').render('S1', {})
+
+
+def test_template_rejects_format_specs() -> None:
+    with pytest.raises(ValueError, match='only plain names'):
+        SoapTemplate('<update>{count:d}</update>')
+
+
+@pytest.mark.parametrize('size', [1, 7, 10_000])
+def test_values_from_chunked_input(size: int) -> None:
+    body = '<response><elid>E1</elid><port>P1</port><port>P2</port><status> OK </status></response>'
+    response = _chunked(ENVELOPE.format(body).encode('utf-8'), size)
+    assert response.message is None
+    assert response.values == {'elid': 'E1', 'port': ['P1', 'P2'], 'status': 'OK'}
+
+
+@pytest.mark.parametrize('size', [1, 7, 10_000])
+def test_exception_message_from_chunked_input(size: int) -> None:
+    body = '<response><exception_msgtxt>Campus C1 not found</exception_msgtxt><elid/></response>'
+    response = _chunked(ENVELOPE.format(body).encode('utf-8'), size)
+    assert response.message == 'Campus C1 not found'
+    assert response.fault_code is None
+
+
+@pytest.mark.parametrize('size', [1, 7, 10_000])
+def test_fault_from_chunked_input(size: int) -> None:
+    body = '<soapenv:Fault><faultcode>Server</faultcode><faultstring>session expired</faultstring></soapenv:Fault>'
+    response = _chunked(ENVELOPE.format(body).encode('utf-8'), size)
+    assert (response.fault_code, response.message) == ('Server', 'session expired')
+    assert response.values == {}
+
+
+@pytest.mark.parametrize(
+    ('content', 'status_code', 'message'),
+    [
+        (b'<soapenv:Envelope', 200, 'Invalid SOAP response'),
+        (b'', 500, 'SOAP request failed with status 500'),
+    ],
+)
+def test_unparsable_responses_carry_a_message(content: bytes, status_code: int, message: str) -> None:
+    response: typing.Any = parse_soap_response(content, status_code)
+    assert response.message.startswith(message)